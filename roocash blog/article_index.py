@@ -0,0 +1,329 @@
+"""
+部落格文章的全文索引（SQLite FTS5）與查詢。
+
+FTS5 內建的 unicode61 斷詞會把整段中文當成一個詞，因此寫入前先在 Python
+斷詞：連續的中日韓文字切成重疊的二字詞（「信用卡」→「信用 用卡」），英數字
+以單字為單位並轉小寫，再交給 FTS5 以空白分隔建立索引。查詢字串以相同方式
+斷詞後組成片語，二字詞相鄰即代表原文相連，所以任意長度的中文詞都能查到。
+只有單一個中文字的查詢改用字首比對，只會命中以該字開頭的二字詞。
+
+爬蟲（scrape_article_details）與 ArticleAnalyzer 處理文章時都會寫入索引：
+爬蟲提供內文與提到的信用卡，分析器提供主題；兩邊以相同方式組成內文，
+內容未變動的文章不重新斷詞。
+
+查詢範例：
+    python article_index.py search --card 玉山 --since 2025-01-01
+    python article_index.py search --merchant 威秀 --topic 電影娛樂
+    python article_index.py search "LINE Pay 回饋" --limit 5 --json
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+import unicodedata
+from contextlib import contextmanager
+from datetime import datetime
+
+DEFAULT_DATA_DIR = "../money101_cal/roocash_data"
+INDEX_NAME = "roocash_articles_index.db"
+INDEX_PATH = os.path.join(DEFAULT_DATA_DIR, INDEX_NAME)
+
+# 內容檔中內文開始的標記（見 roocash_blog.build_article_detail）
+CONTENT_MARKER = "完整內容:\n\n"
+
+# 索引欄位與 bm25 權重：標題命中比內文命中重要
+FTS_COLUMNS = ("title", "categories", "cards", "topics", "body")
+BM25_WEIGHTS = (8.0, 3.0, 4.0, 3.0, 1.0)
+
+# 各查詢條件比對的欄位
+FILTER_COLUMNS = {
+    "card": ("title", "cards", "body"),
+    "merchant": ("title", "body"),
+    "topic": ("topics", "categories", "title"),
+}
+
+CJK_CHARS = "\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff"  # 中日韓統一表意文字（含擴充 A 與相容字）
+TOKEN_RE = re.compile(f"[{CJK_CHARS}]+|[a-z0-9]+")
+CJK_RE = re.compile(f"[{CJK_CHARS}]")
+DATE_RE = re.compile(r"(\d{4})\s*[-/.年]\s*(\d{1,2})\s*[-/.月]\s*(\d{1,2})")
+TOPIC_COUNT_RE = re.compile(r"\(\d+\)$")
+
+
+def tokenize(text):
+    """回傳斷詞結果列表：中文切成二字詞（單字保留），英數字轉小寫"""
+    tokens = []
+    for run in TOKEN_RE.findall(unicodedata.normalize("NFKC", text or "").lower()):
+        if len(run) > 1 and CJK_RE.match(run):
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            tokens.append(run)
+    return tokens
+
+
+def phrase(text):
+    """將查詢字串轉為 FTS5 片語；只有一個中文字時以字首比對"""
+    tokens = tokenize(text)
+    if not tokens:
+        raise ValueError(f"查詢字串沒有可搜尋的文字: {text!r}")
+    quoted = '"' + " ".join(tokens) + '"'
+    if len(tokens) == 1 and len(tokens[0]) == 1 and CJK_RE.match(tokens[0]):
+        quoted += "*"
+    return quoted
+
+
+def normalize_date(value):
+    """轉為 YYYY-MM-DD；無法解析時回傳空字串"""
+    match = DATE_RE.search(value or "")
+    if not match:
+        return ""
+    year, month, day = (int(part) for part in match.groups())
+    try:
+        return datetime(year, month, day).date().isoformat()
+    except ValueError:
+        return ""
+
+
+def normalize_categories(categories):
+    if isinstance(categories, str):
+        categories = categories.split(",")
+    return ", ".join(category.strip() for category in categories if category.strip())
+
+
+def topic_names(topics):
+    """["電影娛樂(5)", ...] -> "電影娛樂 ..."，去掉分析器附加的次數"""
+    return " ".join(TOPIC_COUNT_RE.sub("", topic) for topic in topics)
+
+
+def article_body(full_content, tables_text=""):
+    """爬蟲與分析器共用的內文組成方式，兩邊的內容指紋因此一致"""
+    return full_content + ("\n" + tables_text if tables_text else "")
+
+
+def body_from_content_file(content):
+    """從 article_N_content.txt 取出內文（略過標題、連結等檔頭）"""
+    _, marker, body = content.partition(CONTENT_MARKER)
+    return body if marker else content
+
+
+def hash_text(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class ArticleIndex:
+    def __init__(self, path=INDEX_PATH):
+        self.path = str(path)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self.connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS articles ("
+                " id INTEGER PRIMARY KEY,"
+                " url TEXT NOT NULL UNIQUE,"
+                " title TEXT NOT NULL DEFAULT '',"
+                " publish_date TEXT NOT NULL DEFAULT '',"
+                " categories TEXT NOT NULL DEFAULT '',"
+                " cards TEXT NOT NULL DEFAULT '',"
+                " topics TEXT NOT NULL DEFAULT '',"
+                " body_hash TEXT NOT NULL DEFAULT '',"
+                " indexed_at TEXT NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_articles_publish_date ON articles (publish_date)")
+            conn.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5({', '.join(FTS_COLUMNS)})"
+            )
+
+    @contextmanager
+    def connect(self):
+        # 與 ProductStore 相同：每次操作使用獨立連線並以單一交易提交
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def indexed_urls(self):
+        with self.connect() as conn:
+            return {row["url"] for row in conn.execute("SELECT url FROM articles")}
+
+    def index_articles(self, articles):
+        """
+        以單一交易寫入多篇文章，回傳 (重新索引的篇數, 未變動而略過的篇數)。
+
+        每篇為 dict：url 必填；title、publish_date、categories、cards、topics、body
+        為 None 或未提供時沿用索引中的值（分析器不提供信用卡，爬蟲不提供主題）。
+        """
+        indexed = skipped = 0
+        now = datetime.now().isoformat(timespec="seconds")
+        with self.connect() as conn:
+            for article in articles:
+                if self._upsert(conn, article, now):
+                    indexed += 1
+                else:
+                    skipped += 1
+        return indexed, skipped
+
+    def _upsert(self, conn, article, now):
+        existing = conn.execute("SELECT * FROM articles WHERE url = ?", (article["url"],)).fetchone()
+        row = dict(existing) if existing is not None else {
+            "id": None, "url": article["url"], "title": "", "publish_date": "",
+            "categories": "", "cards": "", "topics": "", "body_hash": "",
+        }
+        updates = {
+            "title": article["title"].strip() if article.get("title") is not None else None,
+            "publish_date": normalize_date(article["publish_date"]) if article.get("publish_date") else None,
+            "categories": normalize_categories(article["categories"]) if article.get("categories") else None,
+            "cards": article.get("cards"),
+            "topics": article.get("topics"),
+        }
+        body = article.get("body")
+        if body is not None:
+            updates["body_hash"] = hash_text(body)
+        updates = {key: value for key, value in updates.items() if value is not None}
+        if existing is not None and all(row[key] == value for key, value in updates.items()):
+            return False
+        row.update(updates)
+
+        if existing is None:
+            row["id"] = conn.execute(
+                "INSERT INTO articles (url, indexed_at) VALUES (?, ?)", (row["url"], now)
+            ).lastrowid
+            body_tokens = ""
+        else:
+            fts_row = conn.execute("SELECT body FROM articles_fts WHERE rowid = ?", (row["id"],)).fetchone()
+            body_tokens = fts_row["body"] if fts_row is not None else ""
+            conn.execute("DELETE FROM articles_fts WHERE rowid = ?", (row["id"],))
+        if body is not None:
+            body_tokens = " ".join(tokenize(body))
+
+        conn.execute(
+            "UPDATE articles SET title = ?, publish_date = ?, categories = ?, cards = ?, topics = ?,"
+            " body_hash = ?, indexed_at = ? WHERE id = ?",
+            (row["title"], row["publish_date"], row["categories"], row["cards"], row["topics"],
+             row["body_hash"], now, row["id"]),
+        )
+        conn.execute(
+            f"INSERT INTO articles_fts (rowid, {', '.join(FTS_COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?)",
+            (row["id"], " ".join(tokenize(row["title"])), " ".join(tokenize(row["categories"])),
+             " ".join(tokenize(row["cards"])), " ".join(tokenize(row["topics"])), body_tokens),
+        )
+        return True
+
+    def remove_missing(self, urls):
+        """移除不在 urls 中的文章，回傳移除的篇數"""
+        keep = set(urls)
+        with self.connect() as conn:
+            stale = [row["id"] for row in conn.execute("SELECT id, url FROM articles") if row["url"] not in keep]
+            for article_id in stale:
+                conn.execute("DELETE FROM articles_fts WHERE rowid = ?", (article_id,))
+                conn.execute("DELETE FROM articles WHERE id = ?", (article_id,))
+        return len(stale)
+
+    def search(self, query=None, card=None, merchant=None, topic=None, since=None, limit=20):
+        """
+        回傳符合所有條件的文章，依 bm25 相關度排序（只指定日期時依日期新到舊）。
+
+        query 比對所有欄位；card、merchant、topic 只比對 FILTER_COLUMNS 中的欄位；
+        since 為 YYYY-MM-DD（或其他可解析的日期），只保留該日以後發布的文章。
+        """
+        terms = [phrase(query)] if query else []
+        for name, value in (("card", card), ("merchant", merchant), ("topic", topic)):
+            if value:
+                terms.append(f"{{{' '.join(FILTER_COLUMNS[name])}}} : {phrase(value)}")
+
+        conditions, params = [], []
+        if since:
+            since_date = normalize_date(since)
+            if not since_date:
+                raise ValueError(f"無法解析日期: {since}")
+            conditions.append("a.publish_date >= ?")
+            params.append(since_date)
+
+        if terms:
+            conditions.insert(0, "articles_fts MATCH ?")
+            params.insert(0, " AND ".join(terms))
+            weights = ", ".join(str(weight) for weight in BM25_WEIGHTS)
+            sql = (
+                f"SELECT a.url, a.title, a.publish_date, a.categories, a.cards, a.topics,"
+                f" bm25(articles_fts, {weights}) AS score"
+                f" FROM articles_fts JOIN articles a ON a.id = articles_fts.rowid"
+                f" WHERE {' AND '.join(conditions)} ORDER BY score LIMIT ?"
+            )
+        else:
+            where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+            sql = (
+                "SELECT a.url, a.title, a.publish_date, a.categories, a.cards, a.topics, 0.0 AS score"
+                f" FROM articles a{where} ORDER BY a.publish_date DESC, a.id LIMIT ?"
+            )
+        params.append(limit)
+
+        with self.connect() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        # bm25 分數越小越相關，輸出時取負值讓分數越大越相關
+        return [dict(row, score=round(-row["score"], 3) + 0.0) for row in rows]
+
+    def stats(self):
+        with self.connect() as conn:
+            row = conn.execute(
+                "SELECT COUNT(*) AS articles, MIN(publish_date) AS oldest, MAX(publish_date) AS newest,"
+                " MAX(indexed_at) AS last_indexed FROM articles"
+            ).fetchone()
+        return dict(row)
+
+
+def print_results(results, elapsed_ms):
+    print(f"找到 {len(results)} 篇文章（{elapsed_ms:.1f} ms）")
+    for rank, result in enumerate(results, start=1):
+        print(f"{rank:>3}. [{result['score']:.2f}] {result['publish_date'] or '----------'} {result['title']}")
+        print(f"     {result['url']}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="查詢部落格文章全文索引")
+    parser.add_argument("--db", default=INDEX_PATH, help="索引檔路徑")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    search = sub.add_parser("search", help="搜尋文章")
+    search.add_argument("query", nargs="?", help="比對所有欄位的關鍵字")
+    search.add_argument("--card", help="提到的信用卡（比對標題、信用卡與內文）")
+    search.add_argument("--merchant", help="提到的商家（比對標題與內文）")
+    search.add_argument("--topic", help="主題或分類")
+    search.add_argument("--since", help="只列出此日期（YYYY-MM-DD）以後發布的文章")
+    search.add_argument("--limit", type=int, default=20, help="最多列出的篇數")
+    search.add_argument("--json", action="store_true", help="以 JSON 輸出")
+
+    sub.add_parser("stats", help="索引的文章數與日期範圍")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if not os.path.exists(args.db):
+        print(f"找不到索引 {args.db}，請先執行部落格爬蟲或 text.py")
+        return 1
+    index = ArticleIndex(args.db)
+
+    if args.command == "stats":
+        print(json.dumps(index.stats(), ensure_ascii=False, indent=2))
+        return 0
+
+    start = time.perf_counter()
+    try:
+        results = index.search(args.query, args.card, args.merchant, args.topic, args.since, args.limit)
+    except ValueError as e:
+        print(e)
+        return 2
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+    else:
+        print_results(results, elapsed_ms)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
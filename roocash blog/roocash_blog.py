@@ -1,499 +1,1127 @@
-from selenium import webdriver
-from selenium.webdriver.common.by import By
 import time
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-import pandas as pd
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
+import csv
 import re
 import os
+import sys
+import json
+import hashlib
+import xml.etree.ElementTree as ET
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse, urljoin
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from article_index import INDEX_NAME, ArticleIndex, article_body
+
+# 與產品爬蟲共用 sracper_automation 的 HTML 解析、日誌與瀏覽器設定
+SCRAPER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "sracper_automation")
+if SCRAPER_DIR not in sys.path:
+    sys.path.append(SCRAPER_DIR)
+from src.utils.html_parser import element_text, make_soup
+from src.utils.journal import CrawlJournal
+
+# selenium 只在 selenium 模式或 HTTP 結果需要瀏覽器備援時才載入
 
 # 建立用於儲存結果的目錄
 output_dir = "../money101_cal/roocash_data"
 os.makedirs(output_dir, exist_ok=True)
 
+# 部落格網址與各分類代稱（可將 BLOG_BASE_URL 換成本機伺服器以離線測試）
+BLOG_BASE_URL = "https://roo.cash/blog"
+CATEGORY_SLUGS = [
+    "roo-creditcard",
+    "roo-loan",
+    "roo-insurance",
+    "roo-investment",
+    "roo-news",
+    "roo-life-discount",
+]
+
 
-# 抓取所有文章連結
+# 以瀏覽器逐頁抓取分類下的文章連結（沒有頁數上限），等待文章卡片出現而不是固定等待
 def get_all_articles(driver, base_url):
-    articles = []
-    page_num = 1
-    max_pages = 10  # 設定最大頁數限制，避免無限循環
-    current_url = base_url  # 記錄當前URL，方便翻頁
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.common.exceptions import TimeoutException
 
-    while page_num <= max_pages:
+    category = base_url.split("/category/")[1].strip("/")
+    articles = {}  # 連結 -> 文章，O(1) 去重
+
+    page_num = 0
+    while True:
+        page_num += 1
         print(f"正在獲取第 {page_num} 頁的文章...")
-        # 找出所有文章卡片
-        article_elements = driver.find_elements(
-            By.CSS_SELECTOR, "div.elementor-post__card"
+        page_url = base_url if page_num == 1 else f"{base_url.rstrip('/')}/page/{page_num}/"
+        driver.get(page_url)
+        try:
+            WebDriverWait(driver, ARTICLE_LOAD_TIMEOUT).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, LISTING_SELECTOR))
+            )
+        except TimeoutException:
+            print("已到達最後一頁")
+            break
+
+        new_count = 0
+        for title, href in parse_article_links(driver.page_source, page_url):
+            if href not in articles:
+                articles[href] = {"標題": title, "連結": href, "分類": category}
+                new_count += 1
+                print(f"找到文章: {title} - {href} (分類: {category})")
+        if new_count == 0:
+            break
+
+    print(f"從 {base_url} 成功獲取 {len(articles)} 篇文章")
+    return list(articles.values())
+
+
+# 文章詳情的平行抓取設定
+DETAIL_CONCURRENCY = 4  # 同時抓取文章詳情的瀏覽器數量
+MIN_REQUEST_INTERVAL = 1.0  # 對同一主機兩次請求之間的最短間隔（秒）
+ARTICLE_LOAD_TIMEOUT = 10  # 等待文章內容出現的最長秒數
+
+
+class HostRateLimiter:
+    """依主機限制請求頻率，平行抓取時仍保持禮貌的存取速度"""
+
+    def __init__(self, min_interval=MIN_REQUEST_INTERVAL):
+        self.min_interval = min_interval
+        self._next_allowed = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            scheduled = max(now, self._next_allowed.get(host, now))
+            self._next_allowed[host] = scheduled + self.min_interval
+        if scheduled > now:
+            time.sleep(scheduled - now)
+
+
+def create_driver(profile=None):
+    """建立新的 Chrome WebDriver，與產品爬蟲相同套用 lean 設定檔（封鎖圖片、字型與追蹤腳本）"""
+    from src.utils.browser import initialize_web_driver
+
+    return initialize_web_driver(profile=profile)
+
+
+# 從目前載入的文章頁面提取各欄位
+def extract_article_fields(driver):
+    from selenium.webdriver.common.by import By
+
+    # 嘗試找到文章內容 - 使用更多選擇器來提高命中率
+    content = ""
+    try:
+        # 首先嘗試找到文章元素
+        article_element = driver.find_element(
+            By.CSS_SELECTOR, "article.bam-single-post, article.post"
         )
 
-        # 如果沒有找到任何文章，可能是頁面結構不同或已到最後一頁
-        if not article_elements:
-            article_elements = driver.find_elements(
-                By.CSS_SELECTOR, "h2.elementor-heading-title a"
+        # 從文章元素中獲取內容
+        try:
+            content_element = article_element.find_element(
+                By.CSS_SELECTOR,
+                "div.entry-content, div.elementor-widget-theme-post-content",
             )
-            if not article_elements:
-                print("找不到更多文章，結束爬取")
-                break
+            content = content_element.text
+        except:
+            # 如果找不到特定內容區域，就獲取整個文章的文本
+            content = article_element.text
+    except Exception as e:
+        print(f"提取文章內容時出錯: {e}")
+        content = "無法獲取內容"
 
-        # 獲取當前頁面的所有文章
-        for element in article_elements:
-            try:
-                # 嘗試不同的方式獲取文章標題和連結
-                if element.tag_name == "a":
-                    title = element.text.strip()
-                    href = element.get_attribute("href")
+    # 提取發佈日期
+    publish_date = "未知日期"
+    try:
+        date_elements = driver.find_elements(
+            By.CSS_SELECTOR,
+            "span.elementor-post-info__item--type-date, time.entry-date, meta[property='article:published_time']",
+        )
+        if date_elements:
+            for date_element in date_elements:
+                if date_element.tag_name == "meta":
+                    publish_date = date_element.get_attribute("content").split(
+                        "T"
+                    )[0]
+                else:
+                    publish_date = date_element.text
+                if publish_date and publish_date != "未知日期":
+                    break
+    except Exception as e:
+        print(f"提取發佈日期時出錯: {e}")
+
+    # 提取文章分類
+    categories = "未分類"
+    try:
+        category_elements = driver.find_elements(
+            By.CSS_SELECTOR,
+            "span.elementor-post-info__terms-list a, span.cat-links a, div.category-list a",
+        )
+        if category_elements:
+            categories = ", ".join([cat.text for cat in category_elements])
+    except Exception as e:
+        print(f"提取文章分類時出錯: {e}")
+
+    # 提取圖片
+    image_url = "無圖片"
+    try:
+        # 嘗試多種可能的圖片選擇器
+        image_elements = driver.find_elements(
+            By.CSS_SELECTOR,
+            "div.elementor-featured-image img, div.post-thumbnail img, img.wp-post-image",
+        )
+        if image_elements:
+            image_url = image_elements[0].get_attribute("src")
+    except Exception as e:
+        print(f"提取圖片時出錯: {e}")
+
+    # 提取文章中的段落
+    paragraphs = []
+    try:
+        paragraph_elements = driver.find_elements(
+            By.CSS_SELECTOR,
+            "div.entry-content p, div.elementor-widget-theme-post-content p",
+        )
+        paragraphs = [p.text for p in paragraph_elements if p.text.strip()]
+    except Exception as e:
+        print(f"提取段落時出錯: {e}")
+
+    # 提取標題
+    headings = []
+    try:
+        heading_elements = driver.find_elements(
+            By.CSS_SELECTOR,
+            "div.entry-content h1, div.entry-content h2, div.entry-content h3, div.entry-content h4, div.entry-content h5, div.entry-content h6, div.elementor-widget-theme-post-content h1, div.elementor-widget-theme-post-content h2, div.elementor-widget-theme-post-content h3, div.elementor-widget-theme-post-content h4, div.elementor-widget-theme-post-content h5, div.elementor-widget-theme-post-content h6",
+        )
+        headings = [h.text for h in heading_elements if h.text.strip()]
+    except Exception as e:
+        print(f"提取標題時出錯: {e}")
+
+    # 提取列表項
+    list_items = []
+    try:
+        list_item_elements = driver.find_elements(
+            By.CSS_SELECTOR,
+            "div.entry-content li, div.elementor-widget-theme-post-content li",
+        )
+        list_items = [li.text for li in list_item_elements if li.text.strip()]
+    except Exception as e:
+        print(f"提取列表項時出錯: {e}")
+
+    # 提取表格
+    tables = []
+    try:
+        table_elements = driver.find_elements(
+            By.CSS_SELECTOR,
+            "div.entry-content table, div.elementor-widget-theme-post-content table",
+        )
+        for table in table_elements:
+            table_rows = table.find_elements(By.CSS_SELECTOR, "tr")
+            table_data = []
+            for row in table_rows:
+                cells = row.find_elements(By.CSS_SELECTOR, "td, th")
+                row_data = [cell.text for cell in cells]
+                if row_data:
+                    table_data.append(row_data)
+            if table_data:
+                tables.append(table_data)
+    except Exception as e:
+        print(f"提取表格時出錯: {e}")
+
+    return {
+        "content": content,
+        "publish_date": publish_date,
+        "categories": categories,
+        "image_url": image_url,
+        "paragraphs": paragraphs,
+        "headings": headings,
+        "list_items": list_items,
+        "tables": tables,
+    }
+
+
+# 內容與表格檔案以文章網址的雜湊命名，新文章不會改變其他文章的檔名
+def article_file(url, kind):
+    key = hashlib.sha1(url.encode("utf-8")).hexdigest()[:12]
+    return os.path.join(output_dir, f"article_{key}_{kind}.txt")
+
+
+# 由提取結果組成文章詳情，並寫出內容與表格檔案
+def build_article_detail(article, fields, write_files=True):
+    content = fields["content"]
+    publish_date = fields["publish_date"]
+    categories = fields["categories"]
+    paragraphs = fields["paragraphs"]
+    headings = fields["headings"]
+    list_items = fields["list_items"]
+    tables = fields["tables"]
+
+    # 尋找文章中提到的信用卡
+    credit_cards = []
+    card_patterns = [
+        r"(\w+)信用卡",
+        r"(\w+)卡",
+        r"(\w+)(現金|鑽石|御璽|白金|鈦金|金)卡",
+    ]
+
+    for pattern in card_patterns:
+        matches = re.findall(pattern, content)
+        if matches:
+            for match in matches:
+                if isinstance(match, tuple):
+                    card = "".join(match)
                 else:
-                    # 在卡片中尋找標題和連結
-                    title_element = element.find_element(
-                        By.CSS_SELECTOR,
-                        "h3.elementor-post__title a, h2.elementor-heading-title a",
-                    )
-                    title = title_element.text.strip()
-                    href = title_element.get_attribute("href")
-
-                if title and href:
-                    # 檢查連結是否已存在，避免重複收集
-                    if not any(article["連結"] == href for article in articles):
-                        category = base_url.split("/category/")[1].strip("/")
-                        articles.append(
-                            {
-                                "標題": title,
-                                "連結": href,
-                                "分類": category,  # 將分類資訊直接添加到文章數據
-                            }
-                        )
-                        print(f"找到文章: {title} - {href} (分類: {category})")
+                    card = match + "信用卡"
+                credit_cards.append(card)
+
+    # 去重
+    credit_cards = list(set(credit_cards))
+
+    # 合併為完整內容
+    full_content = "\n\n".join(
+        [
+            (
+                "## 文章標題\n" + "\n".join(headings)
+                if headings
+                else "## 文章標題\n無標題"
+            ),
+            (
+                "## 文章段落\n" + "\n\n".join(paragraphs)
+                if paragraphs
+                else "## 文章段落\n無段落內容"
+            ),
+            (
+                "## 文章列表\n" + "\n".join(list_items)
+                if list_items
+                else "## 文章列表\n無列表內容"
+            ),
+        ]
+    )
+
+    # 創建豐富的文章詳情
+    article_detail = {
+        "標題": article["標題"],
+        "連結": article["連結"],
+        "發佈日期": publish_date,
+        "分類": categories,
+        "圖片連結": fields["image_url"],
+        "提到的信用卡": (
+            ", ".join(credit_cards) if credit_cards else "無提及信用卡"
+        ),
+        "標題數量": len(headings),
+        "段落數量": len(paragraphs),
+        "列表項數量": len(list_items),
+        "表格數量": len(tables),
+        "完整內容": full_content,
+        "原始內容": content,
+        "段落內容": paragraphs,
+        "標題內容": headings,
+        "列表內容": list_items,
+    }
+
+    # 保存表格數據（如果有）
+    # 文章未變動且檔案已存在時（write_files=False）不重寫檔案
+    if tables:
+        table_file = article_file(article["連結"], "tables")
+        if write_files:
+            with open(table_file, "w", encoding="utf-8") as f:
+                for t_idx, table in enumerate(tables):
+                    f.write(f"表格 {t_idx+1}:\n")
+                    for row in table:
+                        f.write(" | ".join(row) + "\n")
+                    f.write("\n\n")
+        article_detail["表格檔案"] = table_file
+
+    # 將每篇文章內容單獨保存為文本文件
+    content_file = article_file(article["連結"], "content")
+    if write_files:
+        with open(content_file, "w", encoding="utf-8") as f:
+            f.write(f"標題: {article['標題']}\n\n")
+            f.write(f"連結: {article['連結']}\n\n")
+            f.write(f"發布日期: {publish_date}\n\n")
+            f.write(f"分類: {categories}\n\n")
+            f.write("完整內容:\n\n")
+            f.write(full_content)
+
+    article_detail["內容檔案"] = content_file
+    return article_detail
+
+
+# 載入單篇文章並提取詳細資訊
+def fetch_article_detail(driver, article, rate_limiter=None):
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.common.exceptions import TimeoutException
+
+    if rate_limiter is not None:
+        rate_limiter.wait(article["連結"])
+    driver.get(article["連結"])
+    try:
+        # 等待文章內容出現，而不是固定等待
+        WebDriverWait(driver, ARTICLE_LOAD_TIMEOUT).until(
+            EC.presence_of_element_located(
+                (By.CSS_SELECTOR, "article.bam-single-post, article.post")
+            )
+        )
+    except TimeoutException:
+        print(f"等待文章內容逾時: {article['連結']}")
+
+    fields = extract_article_fields(driver)
+    return build_article_detail(article, fields)
+
+
+# ====== 文章詳情日誌 ======
+# 每完成一篇文章就以 CrawlJournal 在 JSONL 檔尾追加一行（鍵為文章連結），取代每 5 篇重寫一次的暫存 CSV；
+# 中斷後以 resume 模式重跑時，日誌中已有的文章直接沿用，不再重新抓取。
+# 完成後日誌保留下來，作為包含列表欄位的完整詳情。
+DETAILS_JOURNAL = os.path.join(output_dir, "roocash_article_details.journal.jsonl")
+
+
+def pending_articles(journal, articles):
+    """回傳尚未完成的 (原始索引, 文章)"""
+    return [(i, article) for i, article in enumerate(articles) if article["連結"] not in journal]
+
+
+def journaled_details(journal, articles):
+    """依文章列表順序從日誌取出詳情"""
+    return [journal.get(article["連結"]) for article in articles if article["連結"] in journal]
+
+
+# 多個瀏覽器 session 平行抓取文章詳情，完成的文章寫入日誌
+def scrape_details_concurrently(driver, pending, total, concurrency, journal, driver_pool=None,
+                                rate_limiter=None):
+    from selenium.common.exceptions import WebDriverException
+
+    work = queue.Queue()
+    for i, article in pending:
+        work.put((i, article))
+
+    def worker(worker_driver):
+        """回傳 (此 session 載入的頁數, session 是否損壞)；session 出錯時停止此 worker"""
+        pages = 0
+        while True:
+            try:
+                i, article = work.get_nowait()
+            except queue.Empty:
+                return pages, False
+            try:
+                print(f"正在訪問第 {i+1}/{total} 篇文章: {article['標題']}")
+                pages += 1
+                detail = fetch_article_detail(worker_driver, article, rate_limiter)
+            except WebDriverException as e:
+                print(f"處理文章 {article['標題']} 時瀏覽器出錯，停止此 session: {e}")
+                return pages, True
             except Exception as e:
-                print(f"處理文章時出錯: {e}")
+                import traceback
+
+                print(f"處理文章 {article['標題']} 時出錯: {str(e)}")
+                print(traceback.format_exc())
                 continue
+            journal.append(article["連結"], detail)
 
-        # 處理分頁 - 使用更穩健的方法
+    def extra_worker():
+        # 額外的 worker 自行取得瀏覽器 session，結束後歸還或關閉
+        try:
+            extra_driver = driver_pool.acquire() if driver_pool is not None else create_driver()
+        except Exception as e:
+            print(f"建立額外的瀏覽器 session 失敗: {e}")
+            return
+        pages, broken = 0, True
         try:
-            # 方法一：使用 JavaScript 捲動頁面到底部，讓分頁按鈕可見
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(1)
+            pages, broken = worker(extra_driver)
+        finally:
+            if driver_pool is not None:
+                driver_pool.release(extra_driver, pages=pages, broken=broken)
+            else:
+                extra_driver.quit()
+
+    threads = [threading.Thread(target=extra_worker) for _ in range(concurrency - 1)]
+    for thread in threads:
+        thread.start()
+    # 呼叫端傳入的 driver 也作為其中一個 worker
+    worker(driver)
+    for thread in threads:
+        thread.join()
 
-            # 方法二：使用 JavaScript 直接點擊下一頁按鈕，避免元素不可點擊問題
-            next_page_found = False
 
-            # 先嘗試找具體頁碼
-            page_buttons = driver.find_elements(
-                By.CSS_SELECTOR, "a.page-numbers:not(.next):not(.prev)"
+# 訪問每個文章頁面並提取詳細資訊
+def scrape_article_details(driver, articles, concurrency=1, driver_pool=None, rate_limiter=None,
+                           journal=None, index=None):
+    if journal is None:
+        journal = CrawlJournal(DETAILS_JOURNAL)
+    pending = pending_articles(journal, articles)
+    if len(pending) < len(articles):
+        print(f"略過日誌中已完成的 {len(articles) - len(pending)} 篇文章")
+
+    try:
+        if concurrency > 1 and len(pending) > 1:
+            if rate_limiter is None:
+                rate_limiter = HostRateLimiter()
+            scrape_details_concurrently(
+                driver, pending, len(articles), min(concurrency, len(pending)), journal,
+                driver_pool, rate_limiter
             )
-            for button in page_buttons:
+        else:
+            for i, article in pending:
                 try:
-                    button_text = button.text.strip()
-                    if button_text.isdigit() and int(button_text) == page_num + 1:
-                        print(f"找到下一頁按鈕: {button_text}")
-                        # 使用 JavaScript 點擊
-                        driver.execute_script(
-                            "arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});",
-                            button,
-                        )
-                        time.sleep(1)
-                        driver.execute_script("arguments[0].click();", button)
-                        next_page_found = True
-                        time.sleep(3)
-                        page_num += 1
-                        break
+                    print(f"正在訪問第 {i+1}/{len(articles)} 篇文章: {article['標題']}")
+                    journal.append(article["連結"], fetch_article_detail(driver, article, rate_limiter))
                 except Exception as e:
-                    print(f"解析頁碼按鈕時出錯: {e}")
+                    import traceback
+
+                    print(f"處理文章 {article['標題']} 時出錯: {str(e)}")
+                    print(traceback.format_exc())
                     continue
+    finally:
+        journal.close()
 
-            # 如果找不到具體頁碼，嘗試 'next' 按鈕
-            if not next_page_found:
-                next_buttons = driver.find_elements(
-                    By.CSS_SELECTOR, "a.page-numbers.next"
-                )
-                if next_buttons:
-                    print("找到 'next' 按鈕")
-                    # 使用 JavaScript 點擊
-                    driver.execute_script(
-                        "arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});",
-                        next_buttons[0],
-                    )
-                    time.sleep(1)
-                    driver.execute_script("arguments[0].click();", next_buttons[0])
-                    time.sleep(3)
-                    page_num += 1
-                    next_page_found = True
-
-            # 方法三：如果 JavaScript 點擊失敗，嘗試直接修改 URL
-            if not next_page_found:
-                # 根據當前URL構建下一頁URL
-                next_page_url = base_url
-                if next_page_url.endswith("/"):
-                    next_page_url = f"{next_page_url}page/{page_num + 1}/"
-                else:
-                    next_page_url = f"{next_page_url}/page/{page_num + 1}/"
-
-                print(f"嘗試直接訪問下一頁: {next_page_url}")
-                driver.get(next_page_url)
-                time.sleep(3)
-
-                # 檢查頁面是否有效
-                if (
-                    len(
-                        driver.find_elements(
-                            By.CSS_SELECTOR,
-                            "div.elementor-post__card, h2.elementor-heading-title a",
-                        )
-                    )
-                    > 0
-                ):
-                    page_num += 1
-                    print(f"成功透過URL訪問第 {page_num} 頁")
-                else:
-                    print("已到達最後一頁")
-                    break
+    # 最終輸出一律由日誌產生
+    article_details = journaled_details(journal, articles)
+    save_article_details(article_details)
+    if index is not None:
+        index_article_details(article_details, index)
+    return article_details
+
+
+ARTICLE_FIELDS = ["標題", "連結", "分類"]
+
+
+def write_csv(path, rows, fieldnames=None, mode="w"):
+    """
+    逐列寫出 CSV（utf-8-sig），不經過 DataFrame。
+    未指定欄位時以各列欄位的聯集為準（依第一次出現的順序），缺少的欄位留空。
+    """
+    if fieldnames is None:
+        fieldnames = {}
+        for row in rows:
+            fieldnames.update(dict.fromkeys(row))
+        fieldnames = list(fieldnames)
+    write_header = mode == "w" or not os.path.exists(path)
+    with open(path, mode, encoding="utf-8-sig" if write_header else "utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction="ignore")
+        if write_header:
+            writer.writeheader()
+        writer.writerows(rows)
+
+
+def save_article_details(article_details):
+    """儲存所有文章詳細資訊"""
+    # 移除不適合存入CSV的欄位
+    simplified_details = [
+        {
+            k: v
+            for k, v in detail.items()
+            if not isinstance(v, list) and k not in ["完整內容", "原始內容"]
+        }
+        for detail in article_details
+    ]
+
+    details_file = os.path.join(output_dir, "roocash_article_details.csv")
+    write_csv(details_file, simplified_details)
+    print(f"成功獲取 {len(article_details)} 篇文章的詳細資訊，已儲存至 {details_file}")
+
+
+# ====== 全文索引 ======
+# 每次爬取後將文章寫入 SQLite FTS5 索引（見 article_index.py），內容未變動的文章略過。
+
+ARTICLE_INDEX_PATH = os.path.join(output_dir, INDEX_NAME)
+
+
+def index_article_details(article_details, index):
+    documents = []
+    for detail in article_details:
+        tables_text = ""
+        table_file = detail.get("表格檔案")
+        if table_file and os.path.exists(table_file):
+            with open(table_file, "r", encoding="utf-8") as f:
+                tables_text = f.read()
+        cards = detail.get("提到的信用卡", "")
+        documents.append({
+            "url": detail["連結"],
+            "title": detail["標題"],
+            "publish_date": detail["發佈日期"],
+            "categories": detail["分類"],
+            # 信用卡名稱來自 set，排序後才不會每次爬取都被視為變動
+            "cards": ", ".join(sorted(cards.split(", "))) if cards != "無提及信用卡" else "",
+            "body": article_body(detail["完整內容"], tables_text),
+        })
+    indexed, skipped = index.index_articles(documents)
+    print(f"全文索引: 更新 {indexed} 篇、未變動 {skipped} 篇，索引檔 {index.path}")
+
+
+# ====== HTTP 抓取（不啟動瀏覽器）======
+# 部落格是伺服器端渲染的 WordPress/Elementor 頁面，大部分情況直接抓 HTML 即可，
+# 只有在抓回的 HTML 缺少預期結構時才改用 Selenium。
+
+HTTP_TIMEOUT = 15  # 秒
+USER_AGENT = (
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+)
+
+ARTICLE_SELECTOR = "article.bam-single-post, article.post"
+
+
+class HttpFetcher:
+    """以 keep-alive 連線池抓取頁面 HTML"""
+
+    def __init__(self, pool_size=DETAIL_CONCURRENCY, timeout=HTTP_TIMEOUT, rate_limiter=None):
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=Retry(total=2, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504]),
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["User-Agent"] = USER_AGENT
+
+    def fetch(self, url):
+        """回傳頁面 HTML，頁面不存在時回傳 None"""
+        status, text, _ = self.fetch_conditional(url)
+        return text if status != 404 else None
+
+    def fetch_conditional(self, url, headers=None):
+        """
+        發出（條件式）GET，回傳 (狀態碼, 內容, 回應標頭)。
+        304 Not Modified 與 404 時內容為 None。
+        """
+        if self.rate_limiter is not None:
+            self.rate_limiter.wait(url)
+        response = self.session.get(url, timeout=self.timeout, headers=headers)
+        if response.status_code in (304, 404):
+            return response.status_code, None, response.headers
+        response.raise_for_status()
+        if not response.encoding or response.encoding.lower() == "iso-8859-1":
+            response.encoding = "utf-8"
+        return response.status_code, response.text, response.headers
+
+    def close(self):
+        self.session.close()
+
+
+class BrowserFallback:
+    """HTTP 結果不完整時才啟動的瀏覽器 session，多執行緒間依序共用"""
+
+    def __init__(self, driver_pool=None):
+        self.driver_pool = driver_pool
+        self.driver = None
+        self.pages = 0
+        self.lock = threading.RLock()
+
+    def get(self):
+        if self.driver is None:
+            print("啟動瀏覽器作為備援")
+            self.driver = (
+                self.driver_pool.acquire() if self.driver_pool is not None else create_driver()
+            )
+        self.pages += 1
+        return self.driver
+
+    def close(self):
+        if self.driver is None:
+            return
+        if self.driver_pool is not None:
+            self.driver_pool.release(self.driver, pages=self.pages)
+        else:
+            self.driver.quit()
+        self.driver = None
+
+
+# 列表頁的文章卡片（舊版版面為標題連結）
+LISTING_SELECTOR = "div.elementor-post__card, h2.elementor-heading-title a"
+
+
+# 從列表頁 HTML 解析文章標題與連結
+def parse_article_links(html, page_url):
+    soup = make_soup(html)
+    links = []
+    cards = soup.select("div.elementor-post__card")
+    if cards:
+        anchors = [
+            card.select_one("h3.elementor-post__title a, h2.elementor-heading-title a")
+            for card in cards
+        ]
+    else:
+        anchors = soup.select("h2.elementor-heading-title a")
+
+    for anchor in anchors:
+        if anchor is None:
+            continue
+        title = element_text(anchor)
+        href = anchor.get("href")
+        if title and href:
+            links.append((title, urljoin(page_url, href)))
+    return links
+
+
+# 以 HTTP 逐頁抓取分類下的文章連結，第一頁就解析不到時改用瀏覽器
+def get_all_articles_http(fetcher, base_url, fallback=None, max_pages=None):
+    category = base_url.split("/category/")[1].strip("/")
+    articles = {}  # 連結 -> 文章，O(1) 去重
+
+    page_num = 0
+    while max_pages is None or page_num < max_pages:
+        page_num += 1
+        print(f"正在獲取第 {page_num} 頁的文章...")
+        page_url = base_url if page_num == 1 else f"{base_url.rstrip('/')}/page/{page_num}/"
+        try:
+            html = fetcher.fetch(page_url)
         except Exception as e:
-            import traceback
+            print(f"抓取列表頁時出錯: {e}")
+            html = None
 
-            print(f"翻頁過程中出錯: {e}")
-            print(traceback.format_exc())
+        links = parse_article_links(html, page_url) if html else []
+        if not links:
+            if page_num == 1 and fallback is not None:
+                print("HTTP 結果缺少文章列表，改用瀏覽器")
+                with fallback.lock:
+                    return get_all_articles(fallback.get(), base_url)
+            print("已到達最後一頁")
+            break
 
-            # 嘗試最後一招：直接跳到下一頁
-            try:
-                # 根據當前URL構建下一頁URL
-                next_page_url = base_url
-                if next_page_url.endswith("/"):
-                    next_page_url = f"{next_page_url}page/{page_num + 1}/"
-                else:
-                    next_page_url = f"{next_page_url}/page/{page_num + 1}/"
-
-                print(f"意外錯誤後嘗試直接訪問: {next_page_url}")
-                driver.get(next_page_url)
-                time.sleep(3)
-
-                if (
-                    "Page not found" not in driver.title
-                    and len(
-                        driver.find_elements(
-                            By.CSS_SELECTOR,
-                            "div.elementor-post__card, h2.elementor-heading-title a",
-                        )
-                    )
-                    > 0
-                ):
-                    page_num += 1
-                    print(f"成功訪問第 {page_num} 頁")
-                else:
-                    print("已到達最後一頁")
-                    break
-            except Exception as final_e:
-                print(f"最終翻頁嘗試失敗: {final_e}")
-                break
+        new_count = 0
+        for title, href in links:
+            if href not in articles:
+                articles[href] = {"標題": title, "連結": href, "分類": category}
+                new_count += 1
+                print(f"找到文章: {title} - {href} (分類: {category})")
+        if new_count == 0:
+            break
 
     print(f"從 {base_url} 成功獲取 {len(articles)} 篇文章")
-    return articles
+    return list(articles.values())
 
 
-# 訪問每個文章頁面並提取詳細資訊
-def scrape_article_details(driver, articles):
-    article_details = []
+# ====== WordPress REST API 文章探索 ======
+# 以 /wp-json/wp/v2/posts 每次取 100 篇，少量請求即可列出所有分類的文章，
+# 不需逐頁點擊分頁按鈕，也沒有頁數上限。
+
+REST_PER_PAGE = 100
+
+
+def fetch_json(fetcher, url, params=None):
+    """回傳 (JSON 內容, 回應標頭)"""
+    if fetcher.rate_limiter is not None:
+        fetcher.rate_limiter.wait(url)
+    response = fetcher.session.get(url, params=params, timeout=fetcher.timeout)
+    response.raise_for_status()
+    return response.json(), response.headers
+
+
+def rendered_text(value):
+    """將 REST API 的 rendered HTML（含實體字元）轉為純文字"""
+    return make_soup(value or "").get_text().strip()
+
+
+def discover_articles_rest(fetcher, base_url, category_slugs):
+    """
+    以 REST API 一次取得各分類的文章，回傳 {分類代稱: [文章, ...]}。
+    API 無法使用時回傳 None；API 中找不到的分類不會出現在結果中，
+    兩種情況都由呼叫端改用列表頁抓取。
+    """
+    api_root = f"{base_url.rstrip('/')}/wp-json/wp/v2"
+    try:
+        categories, _ = fetch_json(
+            fetcher,
+            f"{api_root}/categories",
+            {"slug": ",".join(category_slugs), "per_page": REST_PER_PAGE, "_fields": "id,slug"},
+        )
+    except Exception as e:
+        print(f"REST API 無法使用，改用列表頁抓取: {e}")
+        return None
+
+    slug_by_id = {category["id"]: category["slug"] for category in categories}
+    if not slug_by_id:
+        print("REST API 找不到指定分類，改用列表頁抓取")
+        return None
+    missing = [slug for slug in category_slugs if slug not in slug_by_id.values()]
+    if missing:
+        print(f"REST API 找不到分類 {', '.join(missing)}，這些分類改用列表頁抓取")
+
+    articles = {slug: {} for slug in category_slugs if slug not in missing}  # 分類 -> {連結: 文章}
+    page, total_pages = 1, 1
+    try:
+        while page <= total_pages:
+            print(f"正在以 REST API 獲取第 {page}/{total_pages} 頁的文章...")
+            posts, headers = fetch_json(
+                fetcher,
+                f"{api_root}/posts",
+                {
+                    "categories": ",".join(str(category_id) for category_id in slug_by_id),
+                    "per_page": REST_PER_PAGE,
+                    "page": page,
+                    "_fields": "link,title,categories",
+                },
+            )
+            total_pages = int(headers.get("X-WP-TotalPages", total_pages))
+            for post in posts:
+                title = rendered_text(post.get("title", {}).get("rendered"))
+                href = post.get("link")
+                if not title or not href:
+                    continue
+                for category_id in post.get("categories", []):
+                    slug = slug_by_id.get(category_id)
+                    if slug in articles and href not in articles[slug]:
+                        articles[slug][href] = {"標題": title, "連結": href, "分類": slug}
+            page += 1
+    except Exception as e:
+        print(f"REST API 抓取文章失敗，改用列表頁抓取: {e}")
+        return None
+
+    for slug, found in articles.items():
+        print(f"分類 {slug} 共 {len(found)} 篇文章")
+    return {slug: list(found.values()) for slug, found in articles.items()}
+
+
+# 從文章頁 HTML 提取各欄位，缺少文章主體時回傳 None
+def extract_article_fields_from_html(html, page_url):
+    soup = make_soup(html)
+    article_element = soup.select_one(ARTICLE_SELECTOR)
+    if article_element is None:
+        return None
+
+    content_element = article_element.select_one(
+        "div.entry-content, div.elementor-widget-theme-post-content"
+    )
+    content = element_text(content_element if content_element is not None else article_element)
+
+    publish_date = "未知日期"
+    for date_element in soup.select(
+        "span.elementor-post-info__item--type-date, time.entry-date, meta[property='article:published_time']"
+    ):
+        if date_element.name == "meta":
+            publish_date = (date_element.get("content") or "").split("T")[0]
+        else:
+            publish_date = element_text(date_element)
+        if publish_date and publish_date != "未知日期":
+            break
+
+    categories = "未分類"
+    category_elements = soup.select(
+        "span.elementor-post-info__terms-list a, span.cat-links a, div.category-list a"
+    )
+    if category_elements:
+        categories = ", ".join(element_text(cat) for cat in category_elements)
+
+    image_url = "無圖片"
+    image_elements = soup.select(
+        "div.elementor-featured-image img, div.post-thumbnail img, img.wp-post-image"
+    )
+    if image_elements and image_elements[0].get("src"):
+        image_url = urljoin(page_url, image_elements[0]["src"])
+
+    content_roots = "div.entry-content, div.elementor-widget-theme-post-content"
+
+    def texts(tag_selector):
+        selector = ", ".join(
+            f"{root} {tag}"
+            for root in content_roots.split(", ")
+            for tag in tag_selector.split(", ")
+        )
+        return [text for text in (element_text(el) for el in soup.select(selector)) if text]
+
+    tables = []
+    for table in soup.select("div.entry-content table, div.elementor-widget-theme-post-content table"):
+        table_data = []
+        for row in table.select("tr"):
+            row_data = [element_text(cell) for cell in row.select("td, th")]
+            if row_data:
+                table_data.append(row_data)
+        if table_data:
+            tables.append(table_data)
+
+    return {
+        "content": content,
+        "publish_date": publish_date,
+        "categories": categories,
+        "image_url": image_url,
+        "paragraphs": texts("p"),
+        "headings": texts("h1, h2, h3, h4, h5, h6"),
+        "list_items": texts("li"),
+        "tables": tables,
+    }
+
 
-    for i, article in enumerate(articles):
+# ====== 文章 HTTP 快取 ======
+# 記錄每篇文章的 ETag / Last-Modified / sitemap lastmod 與上次提取的欄位，
+# 未變動的文章不重新下載、不重新解析，也不重寫內容檔案。
+
+HTTP_CACHE_DIR = os.path.join(output_dir, "http_cache")
+HTTP_CACHE_MAX_BYTES = 200 * 1024 * 1024  # 超過時依最近使用時間淘汰
+SITEMAP_NS = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+
+
+class ArticleCache:
+    def __init__(self, cache_dir=HTTP_CACHE_DIR, max_bytes=HTTP_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.entries_dir = os.path.join(cache_dir, "entries")
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self.max_bytes = max_bytes
+        self.sitemap_lastmod = {}  # 網址 -> 本次 sitemap 的 lastmod
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.entries_dir, exist_ok=True)
+
+        self.index = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                self.index = json.load(f)
+
+    def _entry_path(self, url):
+        return os.path.join(self.entries_dir, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".json")
+
+    def get(self, url):
+        """回傳 (索引資訊, 上次提取的欄位)，沒有快取時回傳 (None, None)"""
+        with self.lock:
+            meta = self.index.get(url)
+        if meta is None:
+            return None, None
         try:
-            print(f"正在訪問第 {i+1}/{len(articles)} 篇文章: {article['標題']}")
-            driver.get(article["連結"])
-            time.sleep(3)  # 等待頁面加載
+            with open(self._entry_path(url), "r", encoding="utf-8") as f:
+                return meta, json.load(f)
+        except (OSError, ValueError):
+            return None, None
 
-            # 嘗試找到文章內容 - 使用更多選擇器來提高命中率
-            content = ""
-            try:
-                # 首先嘗試找到文章元素
-                article_element = driver.find_element(
-                    By.CSS_SELECTOR, "article.bam-single-post, article.post"
-                )
+    def is_fresh(self, url, meta):
+        """sitemap 的 lastmod 與上次相同時，連條件式請求都不需要"""
+        lastmod = self.sitemap_lastmod.get(url)
+        return bool(lastmod) and lastmod == meta.get("lastmod")
+
+    def conditional_headers(self, meta):
+        headers = {}
+        if meta and meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta and meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
 
-                # 從文章元素中獲取內容
+    def put(self, url, fields, response_headers):
+        """儲存重新抓取的文章欄位（計為未命中）"""
+        body = json.dumps(fields, ensure_ascii=False)
+        with open(self._entry_path(url), "w", encoding="utf-8") as f:
+            f.write(body)
+        with self.lock:
+            self.misses += 1
+            self.index[url] = {
+                "etag": response_headers.get("ETag", "") if response_headers else "",
+                "last_modified": response_headers.get("Last-Modified", "") if response_headers else "",
+                "lastmod": self.sitemap_lastmod.get(url, ""),
+                "size": len(body.encode("utf-8")),
+                "accessed": time.time(),
+            }
+
+    def touch(self, url):
+        """沿用快取的文章（計為命中），更新其使用時間"""
+        with self.lock:
+            self.hits += 1
+            meta = self.index.get(url)
+            if meta is not None:
+                meta["accessed"] = time.time()
+                meta["lastmod"] = self.sitemap_lastmod.get(url, meta.get("lastmod", ""))
+
+    def evict(self):
+        """總大小超過上限時，從最久未使用的項目開始刪除"""
+        with self.lock:
+            total = sum(meta.get("size", 0) for meta in self.index.values())
+            for url, meta in sorted(self.index.items(), key=lambda item: item[1].get("accessed", 0)):
+                if total <= self.max_bytes:
+                    break
+                total -= meta.get("size", 0)
+                del self.index[url]
                 try:
-                    content_element = article_element.find_element(
-                        By.CSS_SELECTOR,
-                        "div.entry-content, div.elementor-widget-theme-post-content",
-                    )
-                    content = content_element.text
-                except:
-                    # 如果找不到特定內容區域，就獲取整個文章的文本
-                    content = article_element.text
-            except Exception as e:
-                print(f"提取文章內容時出錯: {e}")
-                content = "無法獲取內容"
+                    os.remove(self._entry_path(url))
+                except OSError:
+                    pass
 
-            # 提取發佈日期
-            publish_date = "未知日期"
-            try:
-                date_elements = driver.find_elements(
-                    By.CSS_SELECTOR,
-                    "span.elementor-post-info__item--type-date, time.entry-date, meta[property='article:published_time']",
-                )
-                if date_elements:
-                    for date_element in date_elements:
-                        if date_element.tag_name == "meta":
-                            publish_date = date_element.get_attribute("content").split(
-                                "T"
-                            )[0]
-                        else:
-                            publish_date = date_element.text
-                        if publish_date and publish_date != "未知日期":
-                            break
-            except Exception as e:
-                print(f"提取發佈日期時出錯: {e}")
+    def save(self):
+        self.evict()
+        tmp_path = self.index_path + ".tmp"
+        with self.lock:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.index, f, ensure_ascii=False)
+        os.replace(tmp_path, self.index_path)
+        print(f"HTTP 快取: 命中 {self.hits} 篇、重新抓取 {self.misses} 篇")
 
-            # 提取文章分類
-            categories = "未分類"
-            try:
-                category_elements = driver.find_elements(
-                    By.CSS_SELECTOR,
-                    "span.elementor-post-info__terms-list a, span.cat-links a, div.category-list a",
-                )
-                if category_elements:
-                    categories = ", ".join([cat.text for cat in category_elements])
-            except Exception as e:
-                print(f"提取文章分類時出錯: {e}")
 
-            # 提取圖片
-            image_url = "無圖片"
-            try:
-                # 嘗試多種可能的圖片選擇器
-                image_elements = driver.find_elements(
-                    By.CSS_SELECTOR,
-                    "div.elementor-featured-image img, div.post-thumbnail img, img.wp-post-image",
-                )
-                if image_elements:
-                    image_url = image_elements[0].get_attribute("src")
-            except Exception as e:
-                print(f"提取圖片時出錯: {e}")
+def fetch_sitemap_lastmod(fetcher, sitemap_url):
+    """讀取 sitemap（可為 sitemap index），回傳 {網址: lastmod}"""
+    try:
+        xml = fetcher.fetch(sitemap_url)
+    except Exception as e:
+        print(f"讀取 sitemap 失敗: {e}")
+        return {}
+    if not xml:
+        return {}
 
-            # 提取文章中的段落
-            paragraphs = []
-            try:
-                paragraph_elements = driver.find_elements(
-                    By.CSS_SELECTOR,
-                    "div.entry-content p, div.elementor-widget-theme-post-content p",
-                )
-                paragraphs = [p.text for p in paragraph_elements if p.text.strip()]
-            except Exception as e:
-                print(f"提取段落時出錯: {e}")
+    try:
+        root = ET.fromstring(xml.encode("utf-8"))
+    except ET.ParseError as e:
+        print(f"解析 sitemap 失敗: {e}")
+        return {}
 
-            # 提取標題
-            headings = []
-            try:
-                heading_elements = driver.find_elements(
-                    By.CSS_SELECTOR,
-                    "div.entry-content h1, div.entry-content h2, div.entry-content h3, div.entry-content h4, div.entry-content h5, div.entry-content h6, div.elementor-widget-theme-post-content h1, div.elementor-widget-theme-post-content h2, div.elementor-widget-theme-post-content h3, div.elementor-widget-theme-post-content h4, div.elementor-widget-theme-post-content h5, div.elementor-widget-theme-post-content h6",
-                )
-                headings = [h.text for h in heading_elements if h.text.strip()]
-            except Exception as e:
-                print(f"提取標題時出錯: {e}")
+    lastmods = {}
+    if root.tag == f"{SITEMAP_NS}sitemapindex":
+        for sitemap in root.findall(f"{SITEMAP_NS}sitemap"):
+            loc = sitemap.findtext(f"{SITEMAP_NS}loc", "").strip()
+            if loc:
+                lastmods.update(fetch_sitemap_lastmod(fetcher, loc))
+    else:
+        for url in root.findall(f"{SITEMAP_NS}url"):
+            loc = url.findtext(f"{SITEMAP_NS}loc", "").strip()
+            if loc:
+                lastmods[loc] = url.findtext(f"{SITEMAP_NS}lastmod", "").strip()
+    return lastmods
 
-            # 提取列表項
-            list_items = []
-            try:
-                list_item_elements = driver.find_elements(
-                    By.CSS_SELECTOR,
-                    "div.entry-content li, div.elementor-widget-theme-post-content li",
-                )
-                list_items = [li.text for li in list_item_elements if li.text.strip()]
-            except Exception as e:
-                print(f"提取列表項時出錯: {e}")
 
-            # 提取表格
-            tables = []
+# 以 HTTP 抓取單篇文章，HTML 不完整時改用瀏覽器；有快取時先以條件式請求確認是否變動
+def fetch_article_detail_http(fetcher, article, fallback=None, cache=None):
+    url = article["連結"]
+    meta, cached_fields = cache.get(url) if cache is not None else (None, None)
+
+    if cached_fields is not None:
+        unchanged = cache.is_fresh(url, meta)
+        if not unchanged:
             try:
-                table_elements = driver.find_elements(
-                    By.CSS_SELECTOR,
-                    "div.entry-content table, div.elementor-widget-theme-post-content table",
-                )
-                for table in table_elements:
-                    table_rows = table.find_elements(By.CSS_SELECTOR, "tr")
-                    table_data = []
-                    for row in table_rows:
-                        cells = row.find_elements(By.CSS_SELECTOR, "td, th")
-                        row_data = [cell.text for cell in cells]
-                        if row_data:
-                            table_data.append(row_data)
-                    if table_data:
-                        tables.append(table_data)
+                status, html, headers = fetcher.fetch_conditional(url, cache.conditional_headers(meta))
+                unchanged = status == 304
             except Exception as e:
-                print(f"提取表格時出錯: {e}")
-
-            # 尋找文章中提到的信用卡
-            credit_cards = []
-            card_patterns = [
-                r"(\w+)信用卡",
-                r"(\w+)卡",
-                r"(\w+)(現金|鑽石|御璽|白金|鈦金|金)卡",
-            ]
-
-            for pattern in card_patterns:
-                matches = re.findall(pattern, content)
-                if matches:
-                    for match in matches:
-                        if isinstance(match, tuple):
-                            card = "".join(match)
-                        else:
-                            card = match + "信用卡"
-                        credit_cards.append(card)
-
-            # 去重
-            credit_cards = list(set(credit_cards))
-
-            # 合併為完整內容
-            full_content = "\n\n".join(
-                [
-                    (
-                        "## 文章標題\n" + "\n".join(headings)
-                        if headings
-                        else "## 文章標題\n無標題"
-                    ),
-                    (
-                        "## 文章段落\n" + "\n\n".join(paragraphs)
-                        if paragraphs
-                        else "## 文章段落\n無段落內容"
-                    ),
-                    (
-                        "## 文章列表\n" + "\n".join(list_items)
-                        if list_items
-                        else "## 文章列表\n無列表內容"
-                    ),
-                ]
-            )
+                print(f"HTTP 抓取文章失敗: {e}")
+                status, html, headers = None, None, None
+        if unchanged:
+            write_files = not os.path.exists(article_file(url, "content"))
+            cache.touch(url)
+            return build_article_detail(article, cached_fields, write_files=write_files)
+    else:
+        html, headers = None, None
+        try:
+            _, html, headers = fetcher.fetch_conditional(url)
+        except Exception as e:
+            print(f"HTTP 抓取文章失敗: {e}")
 
-            # 創建豐富的文章詳情
-            article_detail = {
-                "標題": article["標題"],
-                "連結": article["連結"],
-                "發佈日期": publish_date,
-                "分類": categories,
-                "圖片連結": image_url,
-                "提到的信用卡": (
-                    ", ".join(credit_cards) if credit_cards else "無提及信用卡"
-                ),
-                "標題數量": len(headings),
-                "段落數量": len(paragraphs),
-                "列表項數量": len(list_items),
-                "表格數量": len(tables),
-                "完整內容": full_content,
-                "原始內容": content,
-                "段落內容": paragraphs,
-                "標題內容": headings,
-                "列表內容": list_items,
-            }
+    fields = extract_article_fields_from_html(html, url) if html else None
+    if fields is not None:
+        if cache is not None:
+            cache.put(url, fields, headers)
+        return build_article_detail(article, fields)
 
-            # 保存表格數據（如果有）
-            if tables:
-                table_file = os.path.join(output_dir, f"article_{i+1}_tables.txt")
-                with open(table_file, "w", encoding="utf-8") as f:
-                    for t_idx, table in enumerate(tables):
-                        f.write(f"表格 {t_idx+1}:\n")
-                        for row in table:
-                            f.write(" | ".join(row) + "\n")
-                        f.write("\n\n")
-                article_detail["表格檔案"] = table_file
-
-            # 將每篇文章內容單獨保存為文本文件
-            content_file = os.path.join(output_dir, f"article_{i+1}_content.txt")
-            with open(content_file, "w", encoding="utf-8") as f:
-                f.write(f"標題: {article['標題']}\n\n")
-                f.write(f"連結: {article['連結']}\n\n")
-                f.write(f"發布日期: {publish_date}\n\n")
-                f.write(f"分類: {categories}\n\n")
-                f.write("完整內容:\n\n")
-                f.write(full_content)
-
-            article_detail["內容檔案"] = content_file
-            article_details.append(article_detail)
-
-            # 每5篇文章儲存一次，避免中途出錯損失數據
-            if (i + 1) % 5 == 0 or i == len(articles) - 1:
-                temp_df = pd.DataFrame(
-                    [
-                        {k: v for k, v in detail.items() if not isinstance(v, list)}
-                        for detail in article_details
-                    ]
-                )
-                temp_file = os.path.join(output_dir, "roocash_article_details_temp.csv")
-                temp_df.to_csv(temp_file, index=False, encoding="utf-8-sig")
-                print(f"已臨時保存 {len(article_details)} 篇文章細節")
+    if fallback is None:
+        raise RuntimeError(f"無法從 HTML 解析文章: {article['連結']}")
+    print(f"HTTP 結果缺少文章內容，改用瀏覽器: {article['連結']}")
+    with fallback.lock:
+        return fetch_article_detail(fallback.get(), article)
 
-        except Exception as e:
-            import traceback
 
-            print(f"處理文章 {article['標題']} 時出錯: {str(e)}")
-            print(traceback.format_exc())
-            continue
-
-    # 儲存所有文章詳細資訊
-    # 移除不適合存入CSV的欄位
-    simplified_details = []
-    for detail in article_details:
-        simplified = {
-            k: v
-            for k, v in detail.items()
-            if not isinstance(v, list) and k not in ["完整內容", "原始內容"]
-        }
-        simplified_details.append(simplified)
+# 以 HTTP 平行抓取所有文章詳情
+def scrape_article_details_http(fetcher, articles, concurrency=DETAIL_CONCURRENCY, fallback=None, cache=None,
+                                journal=None, index=None):
+    if journal is None:
+        journal = CrawlJournal(DETAILS_JOURNAL)
+    pending = pending_articles(journal, articles)
+    if len(pending) < len(articles):
+        print(f"略過日誌中已完成的 {len(articles) - len(pending)} 篇文章")
 
-    df_details = pd.DataFrame(simplified_details)
-    details_file = os.path.join(output_dir, "roocash_article_details.csv")
-    df_details.to_csv(details_file, index=False, encoding="utf-8-sig")
-    print(f"成功獲取 {len(article_details)} 篇文章的詳細資訊，已儲存至 {details_file}")
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+            futures = {
+                executor.submit(fetch_article_detail_http, fetcher, article, fallback, cache): (i, article)
+                for i, article in pending
+            }
+            for future in as_completed(futures):
+                i, article = futures[future]
+                try:
+                    journal.append(article["連結"], future.result())
+                    print(f"已完成第 {i+1}/{len(articles)} 篇文章: {article['標題']}")
+                except Exception as e:
+                    print(f"處理文章 {article['標題']} 時出錯: {str(e)}")
+    finally:
+        journal.close()
+        if cache is not None:
+            cache.save()
 
+    # 最終輸出一律由日誌產生
+    article_details = journaled_details(journal, articles)
+    save_article_details(article_details)
+    if index is not None:
+        index_article_details(article_details, index)
     return article_details
 
 
-def main():
+def main(driver_pool=None, concurrency=DETAIL_CONCURRENCY, backend="http", base_url=BLOG_BASE_URL,
+         use_cache=True, resume=False, min_interval=MIN_REQUEST_INTERVAL, build_index=True):
     # 要爬取的URL列表
-    url_list = [
-        "https://roo.cash/blog/category/roo-creditcard/",
-        "https://roo.cash/blog/category/roo-loan/",
-        "https://roo.cash/blog/category/roo-insurance/",
-        "https://roo.cash/blog/category/roo-investment/",
-        "https://roo.cash/blog/category/roo-news/",
-        "https://roo.cash/blog/category/roo-life-discount/",
-    ]
-    # 初始化 WebDriver
-    # macOS 版本
-    service = Service(ChromeDriverManager().install())
-    # win --version
-    #service = Service(executable_path="chromedriver.exe")
-    driver = webdriver.Chrome(service=service)
+    url_list = [f"{base_url.rstrip('/')}/category/{slug}/" for slug in CATEGORY_SLUGS]
 
+    # http: 以 HTTP 抓取、必要時才啟動瀏覽器；selenium: 全程使用瀏覽器
+    fallback = BrowserFallback(driver_pool)
+    fetcher = None
+    cache = None
+    if backend == "http":
+        # min_interval 可在對本機伺服器測試時設為 0
+        fetcher = HttpFetcher(pool_size=concurrency, rate_limiter=HostRateLimiter(min_interval))
+        if use_cache:
+            cache = ArticleCache()
+            cache.sitemap_lastmod = fetch_sitemap_lastmod(
+                fetcher, f"{base_url.rstrip('/')}/sitemap_index.xml"
+            )
 
     all_articles = []
+    journal = CrawlJournal(DETAILS_JOURNAL, resume=resume)
+    index = ArticleIndex(ARTICLE_INDEX_PATH) if build_index else None
 
     try:
+        # 優先以 REST API 一次探索所有分類的文章，失敗時才逐頁抓取列表頁
+        discovered = None
+        if fetcher is not None:
+            discovered = discover_articles_rest(fetcher, base_url, CATEGORY_SLUGS)
+
         # 處理每個URL
-        for url in url_list:
+        temp_mode = "w"
+        for slug, url in zip(CATEGORY_SLUGS, url_list):
             print(f"\n====== 開始爬取: {url} ======")
-            driver.get(url)
-            time.sleep(3)  # 等待頁面載入
-
-            # 獲取這個分類的所有文章
-            articles = get_all_articles(driver, url)
+            if discovered is not None and slug in discovered:
+                articles = discovered[slug]
+            elif fetcher is not None:
+                articles = get_all_articles_http(fetcher, url, fallback)
+            else:
+                articles = get_all_articles(fallback.get(), url)
             all_articles.extend(articles)
 
-            # 每個分類完成後保存一次，以防萬一
-            df_temp = pd.DataFrame(all_articles)
+            # 每個分類完成後將該分類的文章附加到暫存檔，以防萬一
             temp_file = os.path.join(
                 output_dir, "roocash_all_articles_temp.csv"
             )
-            df_temp.to_csv(temp_file, index=False, encoding="utf-8-sig")
+            write_csv(temp_file, articles, ARTICLE_FIELDS, mode=temp_mode)
+            temp_mode = "a"
             print(f"已臨時保存 {len(all_articles)} 篇文章連結")
 
         # 保存所有文章的連結
-        df_articles = pd.DataFrame(all_articles)
         articles_file = os.path.join(output_dir, "roocash_all_articles.csv")
-        df_articles.to_csv(articles_file, index=False, encoding="utf-8-sig")
+        write_csv(articles_file, all_articles, ARTICLE_FIELDS)
         print(f"成功獲取總共 {len(all_articles)} 篇文章，已儲存至 {articles_file}")
 
-        # 爬取文章詳情，將 driver 作為參數傳入
+        # 爬取文章詳情
         print("\n====== 開始爬取文章詳細內容 ======")
-        article_details = scrape_article_details(driver, all_articles)
+        if fetcher is not None:
+            article_details = scrape_article_details_http(
+                fetcher, all_articles, concurrency=concurrency, fallback=fallback, cache=cache,
+                journal=journal, index=index,
+            )
+        else:
+            article_details = scrape_article_details(
+                fallback.get(), all_articles, concurrency=concurrency, driver_pool=driver_pool,
+                journal=journal, index=index,
+            )
+            fallback.pages += len(all_articles)
 
         print("爬蟲完成！")
         print(f"總共爬取了 {len(all_articles)} 篇文章")
@@ -501,9 +1129,29 @@ def main():
         print(f"數據已儲存到目錄: {output_dir}")
 
     finally:
-        # 關閉瀏覽器
-        driver.quit()
+        # 關閉瀏覽器，或將 session 歸還連線池（依造訪頁數決定是否回收）
+        fallback.close()
+        if fetcher is not None:
+            fetcher.close()
+
+    return article_details
 
 
 if __name__ == "__main__":
-    main()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="爬取 roo.cash 部落格文章")
+    parser.add_argument("--backend", default="http", choices=["http", "selenium"], help="抓取方式")
+    parser.add_argument("--concurrency", type=int, default=DETAIL_CONCURRENCY, help="同時抓取的文章數")
+    parser.add_argument("--no-cache", action="store_true", help="不使用 HTTP 文章快取")
+    parser.add_argument("--resume", action="store_true",
+                        help="從上次中斷的日誌繼續，已完成的文章不再抓取")
+    parser.add_argument("--no-index", action="store_true", help="不更新全文索引")
+    args = parser.parse_args()
+    main(
+        concurrency=args.concurrency,
+        backend=args.backend,
+        use_cache=not args.no_cache,
+        resume=args.resume,
+        build_index=not args.no_index,
+    )
@@ -1,30 +1,313 @@
 import os
 import re
+import json
+import hashlib
 from pathlib import Path
 
+from article_index import INDEX_NAME, ArticleIndex, article_body, body_from_content_file, topic_names
+
+# 主題關鍵字映射；可用 JSON 檔（{"主題": ["關鍵字", ...]}）覆寫，見 load_topic_keywords
+DEFAULT_TOPIC_KEYWORDS = {
+    "信用卡優惠": ["折扣", "優惠", "回饋", "紅利", "積分", "現金回饋"],
+    "電影娛樂": ["威秀", "電影", "影城", "IMAX", "TITAN", "購票"],
+    "餐飲美食": ["王品", "餐廳", "美食", "生日", "買一送一", "用餐"],
+    "旅遊消費": ["KKday", "旅遊", "訂房", "機票", "行程"],
+    "銀行服務": ["年費", "免年費", "申請", "核卡", "帳單"],
+    "支付方式": ["APP", "電子支付", "行動支付", "瘋Pay", "刷卡"],
+    "會員權益": ["會員", "VIP", "專屬", "特權", "升等"],
+    "消費分析": ["評價", "心得", "推薦", "比較", "適合"],
+    "促銷活動": ["限時", "期間限定", "活動", "特價", "折扣碼"]
+}
+
+TOPIC_MIN_COUNT = 2  # 至少出現2次相關關鍵字才列為主題
+
+# 內容檔以文章網址的雜湊命名（見 roocash_blog.article_file）
+ARTICLE_FILE_RE = re.compile(r'article_([0-9a-f]{12})_content\.txt$')
+HEADER_FIELDS = ('標題:', '連結:', '發布日期:', '分類:')
+HEADER_READ_CHARS = 4096  # 只需檔頭時讀取的字元數
+PARALLEL_MIN_ARTICLES = 200  # 少於此篇數時不啟動行程池
+
+# 字數統計：排除的格式標記與計入的字元（中文、英文、數字）
+FILEPATH_LINE_RE = re.compile(r'// filepath:.*\n')
+HEADER_LINE_RE = re.compile(r'^(?:標題|連結|發布日期|分類|完整內容):.*\n', re.MULTILINE)
+COUNTED_RUN_RE = re.compile(r'[\u4e00-\u9fa5a-zA-Z0-9]+')
+
+ANALYSIS_CACHE_NAME = "analysis_cache.json"
+ANALYSIS_VERSION = 1  # 分析邏輯改變、結果不同時遞增，使舊快取失效
+
+
+def load_topic_keywords(path):
+    """讀取主題關鍵字設定檔（JSON），保持檔案中的主題順序"""
+    with open(path, 'r', encoding='utf-8') as f:
+        topic_keywords = json.load(f)
+    for topic, keywords in topic_keywords.items():
+        if not isinstance(keywords, list) or not all(isinstance(k, str) and k for k in keywords):
+            raise ValueError(f"主題 {topic} 的關鍵字必須是非空字串的列表")
+    return topic_keywords
+
+
+class TopicScanner:
+    """
+    一次掃描文字即可統計所有主題關鍵字。
+
+    以所有關鍵字的首字元組成一個字元類別，由 re 在 C 層找出候選位置，
+    只在候選位置比對以該字元開頭的關鍵字。每個關鍵字各自記錄上次計數
+    的結束位置，因此計數與 str.count 相同：同一關鍵字不重疊計算，
+    不同關鍵字可以重疊（例如「折扣碼」同時計入「折扣」與「折扣碼」）。
+    """
+
+    def __init__(self, topic_keywords):
+        self.topic_keywords = {topic: list(keywords) for topic, keywords in topic_keywords.items()}
+        self.keywords = list(dict.fromkeys(
+            keyword for keywords in self.topic_keywords.values() for keyword in keywords
+        ))
+        self._by_first_char = {}
+        for keyword in self.keywords:
+            self._by_first_char.setdefault(keyword[0], []).append(keyword)
+        self._candidates = re.compile(
+            "[" + "".join(re.escape(char) for char in self._by_first_char) + "]"
+        ) if self._by_first_char else None
+
+    def keyword_counts(self, *texts):
+        """回傳 {關鍵字: 出現次數}，等同對每段文字分別呼叫 str.count 後加總"""
+        counts = dict.fromkeys(self.keywords, 0)
+        if self._candidates is None:
+            return counts
+        by_first_char = self._by_first_char
+        for text in texts:
+            last_end = {}
+            for match in self._candidates.finditer(text):
+                pos = match.start()
+                for keyword in by_first_char[text[pos]]:
+                    if pos >= last_end.get(keyword, 0) and text.startswith(keyword, pos):
+                        counts[keyword] += 1
+                        last_end[keyword] = pos + len(keyword)
+        return counts
+
+    def topic_counts(self, *texts):
+        """回傳 {主題: 關鍵字出現總次數}，順序與設定相同"""
+        counts = self.keyword_counts(*texts)
+        return {
+            topic: sum(counts[keyword] for keyword in keywords)
+            for topic, keywords in self.topic_keywords.items()
+        }
+
+
+def available_cpus():
+    """本行程可使用的 CPU 數（容器限制 CPU 時小於 os.cpu_count()）"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def count_characters(content, tables_content=""):
+    """
+    計算內容與表格的總字數（只計中文、英文、數字）。
+
+    先移除「// filepath:」到行尾（含換行），再移除以標題、連結、發布日期、
+    分類、完整內容開頭的整行；markdown 的 # 與 ● 標記本來就不計入，不需移除。
+    """
+    text = HEADER_LINE_RE.sub('', FILEPATH_LINE_RE.sub('', content + tables_content))
+    return sum(map(len, COUNTED_RUN_RE.findall(text)))
+
+
+def file_stamp(path):
+    """回傳 [大小, mtime_ns]；檔案不存在時回傳 None"""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+class AnalysisCache:
+    """
+    文章分析結果的快取，以內容檔名為鍵，記錄內容檔與表格檔的大小與 mtime。
+
+    兩個檔案都未變動時沿用上次的分析結果；來源檔案已刪除的項目在儲存時移除。
+    主題關鍵字或 ANALYSIS_VERSION 改變時整個快取失效。
+    """
+
+    def __init__(self, path, topic_keywords):
+        self.path = Path(path)
+        self.fingerprint = hashlib.sha1(json.dumps(
+            [ANALYSIS_VERSION, topic_keywords], ensure_ascii=False, sort_keys=True
+        ).encode('utf-8')).hexdigest()
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"讀取分析快取失敗，將重新分析: {e}")
+                data = {}
+            if data.get('fingerprint') == self.fingerprint:
+                self.entries = data.get('entries', {})
+
+    def get(self, content_file, table_file):
+        """兩個檔案的大小與 mtime 都與快取相同時回傳上次的分析結果"""
+        entry = self.entries.get(content_file.name)
+        if (entry is not None
+                and entry['content'] == file_stamp(content_file)
+                and entry['tables'] == file_stamp(table_file)):
+            self.hits += 1
+            return entry['row']
+        return None
+
+    def put(self, content_file, table_file, row):
+        self.misses += 1
+        self.entries[content_file.name] = {
+            'content': file_stamp(content_file),
+            'tables': file_stamp(table_file),
+            'row': row,
+        }
+
+    def evict(self, content_files):
+        """移除來源檔案已不存在的項目"""
+        current = {content_file.name for content_file in content_files}
+        for name in [name for name in self.entries if name not in current]:
+            del self.entries[name]
+            self.evicted += 1
+
+    def save(self):
+        if not self.path.parent.is_dir():  # 資料夾不存在時沒有可快取的文章
+            return
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'fingerprint': self.fingerprint, 'entries': self.entries}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        print(f"分析快取: 沿用 {self.hits} 篇、重新分析 {self.misses} 篇、移除 {self.evicted} 篇")
+
+
 class ArticleAnalyzer:
-    def __init__(self, data_dir):
+    def __init__(self, data_dir, topic_keywords=None, cache=None, index=None):
         self.data_dir = Path(data_dir)
         self.articles_data = []
+        # 關鍵字掃描器只編譯一次，所有文章共用
+        self.topic_scanner = TopicScanner(topic_keywords or DEFAULT_TOPIC_KEYWORDS)
+        self.cache = cache
+        self.index = index
 
-    def extract_article_info(self):
-        """提取所有文章資訊"""
-        # 取得所有content檔案
-        content_files = list(self.data_dir.glob("article_*_content.txt"))
-        
-        for content_file in sorted(content_files, key=lambda x: int(re.search(r'article_(\d+)_content', x.name).group(1))):
-            article_num = re.search(r'article_(\d+)_content', content_file.name).group(1)
-            
+    def extract_article_info(self, workers=1, chunksize=None):
+        """
+        提取所有文章資訊
+
+        workers > 1 時以多個行程平行分析（None 表示使用所有 CPU），
+        結果仍依文章代碼排序。需分析的文章數少於 PARALLEL_MIN_ARTICLES 時
+        啟動行程池的成本高於分析本身，直接在本行程處理。
+        設定快取時只分析新增或變動的文章，其餘沿用快取的結果。
+        設定全文索引時一併寫入本次分析的文章。
+        """
+        jobs = []
+        for content_file, article_num in self.list_article_files():
             # 對應的表格檔案
             table_file = self.data_dir / f"article_{article_num}_tables.txt"
-            
-            # 提取文章資訊
-            article_info = self.analyze_single_article(content_file, table_file, article_num)
-            if article_info:
-                self.articles_data.append(article_info)
-        
+            jobs.append((content_file, table_file, article_num))
+
+        rows = [None] * len(jobs)
+        if self.cache is not None:
+            self.cache.evict(job[0] for job in jobs)
+            for i, (content_file, table_file, _) in enumerate(jobs):
+                rows[i] = self.cache.get(content_file, table_file)
+        pending = [i for i, row in enumerate(rows) if row is None]
+
+        workers = workers or available_cpus()
+        pending_jobs = [jobs[i] for i in pending]
+        if workers > 1 and len(pending_jobs) >= PARALLEL_MIN_ARTICLES:
+            results = self.analyze_parallel(pending_jobs, workers, chunksize)
+        else:
+            results = (self.analyze_single_article(*job) for job in pending_jobs)
+
+        for i, article_info in zip(pending, results):
+            rows[i] = article_info
+            if article_info and self.cache is not None:
+                content_file, table_file, _ = jobs[i]
+                self.cache.put(content_file, table_file, article_info)
+        if self.cache is not None:
+            self.cache.save()
+        if self.index is not None:
+            self.update_index(jobs, rows, pending)
+
+        self.articles_data = [article_info for article_info in rows if article_info]
         return self.articles_data
 
+    def update_index(self, jobs, rows, analyzed):
+        """
+        將本次分析的文章與索引中還沒有的文章寫入全文索引，
+        並移除內容檔已刪除的文章
+        """
+        indexed_urls = self.index.indexed_urls()
+        analyzed = set(analyzed)
+        documents = []
+        for i, row in enumerate(rows):
+            if not row or row['文章連結'] == "未找到連結":
+                continue
+            if i not in analyzed and row['文章連結'] in indexed_urls:
+                continue
+            content_file, table_file, _ = jobs[i]
+            with open(content_file, 'r', encoding='utf-8') as f:
+                content = f.read()
+            tables_content = ""
+            if row['有表格']:
+                with open(table_file, 'r', encoding='utf-8') as f:
+                    tables_content = f.read()
+            documents.append({
+                "url": row['文章連結'],
+                "title": row['文章標題'],
+                "publish_date": row['發布日期'],
+                "categories": row['文章分類'],
+                "topics": topic_names(row['主要主題']),
+                "body": article_body(body_from_content_file(content), tables_content),
+            })
+
+        indexed, skipped = self.index.index_articles(documents)
+        # 只移除內容檔已不存在的文章；分析失敗的文章仍保留索引中上次的內容
+        urls = [self.article_url(content_file, row) for (content_file, _, _), row in zip(jobs, rows)]
+        if None in urls:
+            removed = 0
+            print("部分文章分析失敗且無法取得連結，本次不移除索引中的文章")
+        else:
+            removed = self.index.remove_missing(urls)
+        print(f"全文索引: 更新 {indexed} 篇、未變動 {skipped} 篇、移除 {removed} 篇")
+
+    def article_url(self, content_file, row):
+        """文章連結：依序取自本次結果、快取中上次的結果、內容檔的檔頭；都取不到時回傳 None"""
+        if row:
+            return row['文章連結']
+        entry = self.cache.entries.get(content_file.name) if self.cache is not None else None
+        if entry is not None:
+            return entry['row']['文章連結']
+        try:
+            with open(content_file, 'r', encoding='utf-8') as f:
+                return self.parse_header(f.read(HEADER_READ_CHARS)).get('連結:')
+        except (OSError, UnicodeDecodeError):
+            return None
+
+    def list_article_files(self):
+        """回傳依文章代碼（網址雜湊）排序的 [(內容檔案, 文章代碼)]，新增文章不影響既有文章的代碼"""
+        content_files = []
+        for content_file in self.data_dir.glob("article_*_content.txt"):
+            match = ARTICLE_FILE_RE.search(content_file.name)
+            if match:
+                content_files.append((content_file, match.group(1)))
+        return sorted(content_files, key=lambda item: item[1])
+
+    def analyze_parallel(self, jobs, workers, chunksize=None):
+        """以行程池分析，executor.map 依輸入順序回傳結果"""
+        from concurrent.futures import ProcessPoolExecutor
+
+        # 每個行程約分到 4 批，兼顧負載平衡與行程間傳輸的次數
+        chunksize = chunksize or max(1, len(jobs) // (workers * 4))
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(self.data_dir, self.topic_scanner.topic_keywords),
+        ) as executor:
+            return list(executor.map(_analyze_job, jobs, chunksize=chunksize))
+
     def analyze_single_article(self, content_file, table_file, article_num):
         """分析單篇文章"""
         try:
@@ -33,133 +316,95 @@ class ArticleAnalyzer:
                 content = f.read()
             
             # 讀取表格檔案（如果存在）
+            has_tables = table_file.exists()
             tables_content = ""
-            if table_file.exists():
+            if has_tables:
                 with open(table_file, 'r', encoding='utf-8') as f:
                     tables_content = f.read()
             
-            # 提取文章資訊
-            title = self.extract_title_from_content(content)
-            link = self.extract_link_from_content(content)
-            publish_date = self.extract_publish_date(content)
-            categories = self.extract_categories(content)
+            # 提取文章資訊（檔頭只解析一次）
+            header = self.parse_header(content)
             topics = self.extract_topics(content, tables_content)
             total_chars = self.count_characters(content, tables_content)
             
             return {
                 "文章編號": article_num,
-                "文章標題": title,
-                "文章連結": link,
-                "發布日期": publish_date,
-                "文章分類": categories,
+                "文章標題": header.get('標題:', "未找到標題"),
+                "文章連結": header.get('連結:', "未找到連結"),
+                "發布日期": header.get('發布日期:', "未找到發布日期"),
+                "文章分類": self.split_categories(header['分類:']) if '分類:' in header else ["未分類"],
                 "主要主題": topics,
                 "總字數": total_chars,
                 "內容檔案": content_file.name,
-                "表格檔案": table_file.name if table_file.exists() else "無",
-                "有表格": table_file.exists()
+                "表格檔案": table_file.name if has_tables else "無",
+                "有表格": has_tables
             }
             
         except Exception as e:
             print(f"處理文章 {article_num} 時發生錯誤: {e}")
             return None
 
+    @staticmethod
+    def parse_header(content):
+        """
+        一次掃描取得標題、連結、發布日期與分類，回傳 {標記: 值}
+
+        每個標記取第一個以其開頭的行；四個標記都找到後即停止，
+        不必切分整篇內容。
+        """
+        header = {}
+        start = 0
+        length = len(content)
+        while start <= length and len(header) < len(HEADER_FIELDS):
+            end = content.find('\n', start)
+            if end == -1:
+                end = length
+            line = content[start:end].strip()
+            for field in HEADER_FIELDS:
+                if field not in header and line.startswith(field):
+                    header[field] = line.replace(field, '').strip()
+                    break
+            start = end + 1
+        return header
+
+    @staticmethod
+    def split_categories(categories):
+        # 將分類分割成列表
+        return [cat.strip() for cat in categories.split(',')]
+
     def extract_title_from_content(self, content):
         """從內容中提取標題"""
-        lines = content.split('\n')
-        
-        for line in lines:
-            line = line.strip()
-            if line.startswith('標題:'):
-                title = line.replace('標題:', '').strip()
-                return title
-        
-        return f"未找到標題"
+        return self.parse_header(content).get('標題:', "未找到標題")
 
     def extract_link_from_content(self, content):
         """從內容中提取連結"""
-        lines = content.split('\n')
-        
-        for line in lines:
-            line = line.strip()
-            if line.startswith('連結:'):
-                link = line.replace('連結:', '').strip()
-                return link
-        
-        return "未找到連結"
+        return self.parse_header(content).get('連結:', "未找到連結")
 
     def extract_publish_date(self, content):
         """從內容中提取發布日期"""
-        lines = content.split('\n')
-        
-        for line in lines:
-            line = line.strip()
-            if line.startswith('發布日期:'):
-                date = line.replace('發布日期:', '').strip()
-                return date
-        
-        return "未找到發布日期"
+        return self.parse_header(content).get('發布日期:', "未找到發布日期")
 
     def extract_categories(self, content):
         """從內容中提取分類"""
-        lines = content.split('\n')
-        
-        for line in lines:
-            line = line.strip()
-            if line.startswith('分類:'):
-                categories = line.replace('分類:', '').strip()
-                # 將分類分割成列表
-                category_list = [cat.strip() for cat in categories.split(',')]
-                return category_list
-        
-        return ["未分類"]
+        header = self.parse_header(content)
+        return self.split_categories(header['分類:']) if '分類:' in header else ["未分類"]
 
     def extract_topics(self, content, tables_content):
         """提取主要主題關鍵字"""
-        combined_text = content + " " + tables_content
-        
-        # 定義主題關鍵字映射
-        topic_keywords = {
-            "信用卡優惠": ["折扣", "優惠", "回饋", "紅利", "積分", "現金回饋"],
-            "電影娛樂": ["威秀", "電影", "影城", "IMAX", "TITAN", "購票"],
-            "餐飲美食": ["王品", "餐廳", "美食", "生日", "買一送一", "用餐"],
-            "旅遊消費": ["KKday", "旅遊", "訂房", "機票", "行程"],
-            "銀行服務": ["年費", "免年費", "申請", "核卡", "帳單"],
-            "支付方式": ["APP", "電子支付", "行動支付", "瘋Pay", "刷卡"],
-            "會員權益": ["會員", "VIP", "專屬", "特權", "升等"],
-            "消費分析": ["評價", "心得", "推薦", "比較", "適合"],
-            "促銷活動": ["限時", "期間限定", "活動", "特價", "折扣碼"]
-        }
-        
-        detected_topics = []
-        for topic, keywords in topic_keywords.items():
-            keyword_count = sum(combined_text.count(keyword) for keyword in keywords)
-            if keyword_count >= 2:  # 至少出現2次相關關鍵字
-                detected_topics.append(f"{topic}({keyword_count})")
-        
+        # 內容與表格之間以空白分隔，關鍵字不含空白，分開掃描與合併後掃描結果相同
+        topic_counts = self.topic_scanner.topic_counts(content, tables_content)
+
+        detected_topics = [
+            f"{topic}({keyword_count})"
+            for topic, keyword_count in topic_counts.items()
+            if keyword_count >= TOPIC_MIN_COUNT
+        ]
+
         return detected_topics if detected_topics else ["一般金融"]
 
     def count_characters(self, content, tables_content):
         """計算總字數（排除格式標記）"""
-        combined_text = content + tables_content
-        
-        # 移除檔案路徑標記
-        combined_text = re.sub(r'// filepath:.*?\n', '', combined_text)
-        
-        # 移除標題、連結、日期、分類等格式標記
-        combined_text = re.sub(r'^標題:.*?\n', '', combined_text, flags=re.MULTILINE)
-        combined_text = re.sub(r'^連結:.*?\n', '', combined_text, flags=re.MULTILINE)
-        combined_text = re.sub(r'^發布日期:.*?\n', '', combined_text, flags=re.MULTILINE)
-        combined_text = re.sub(r'^分類:.*?\n', '', combined_text, flags=re.MULTILINE)
-        combined_text = re.sub(r'^完整內容:.*?\n', '', combined_text, flags=re.MULTILINE)
-        
-        # 移除markdown標記
-        combined_text = re.sub(r'#{1,6}\s*', '', combined_text)
-        combined_text = re.sub(r'●\s*', '', combined_text)
-        
-        # 只計算中文、英文、數字
-        clean_text = re.sub(r'[^\u4e00-\u9fa5a-zA-Z0-9]', '', combined_text)
-        
-        return len(clean_text)
+        return count_characters(content, tables_content)
 
     def save_results(self, output_file="articles_analysis.txt"):
         """儲存分析結果"""
@@ -245,14 +490,28 @@ class ArticleAnalyzer:
         for topic, count in sorted(topic_counts.items(), key=lambda x: x[1], reverse=True):
             print(f"  {topic}: {count} 篇")
 
-def main():
-    # 使用方式
-    data_dir = "../money101_cal/roocash_data"
-    
-    analyzer = ArticleAnalyzer(data_dir)
+# 行程池的工作函式需在模組層級才能被 pickle；每個行程建立一個分析器
+_worker_analyzer = None
+
+
+def _init_worker(data_dir, topic_keywords):
+    global _worker_analyzer
+    _worker_analyzer = ArticleAnalyzer(data_dir, topic_keywords)
+
+
+def _analyze_job(job):
+    return _worker_analyzer.analyze_single_article(*job)
+
+
+def main(data_dir="../money101_cal/roocash_data", topics_file=None, workers=None, use_cache=True,
+         build_index=True):
+    topic_keywords = load_topic_keywords(topics_file) if topics_file else DEFAULT_TOPIC_KEYWORDS
+    cache = AnalysisCache(Path(data_dir) / ANALYSIS_CACHE_NAME, topic_keywords) if use_cache else None
+    index = ArticleIndex(Path(data_dir) / INDEX_NAME) if build_index and Path(data_dir).is_dir() else None
+    analyzer = ArticleAnalyzer(data_dir, topic_keywords, cache, index)
     
     print("開始分析 RooCash 文章...")
-    articles = analyzer.extract_article_info()
+    articles = analyzer.extract_article_info(workers)
     
     print(f"共分析了 {len(articles)} 篇文章")
     
@@ -277,4 +536,14 @@ def main():
         print(f"   字數: {article['總字數']:,}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    import argparse
+
+    parser = argparse.ArgumentParser(description="分析已爬取的 RooCash 部落格文章")
+    parser.add_argument("--data-dir", default="../money101_cal/roocash_data", help="文章資料夾")
+    parser.add_argument("--topics", help="主題關鍵字設定檔（JSON）")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="平行分析的行程數（預設為 CPU 數，1 表示不平行）")
+    parser.add_argument("--no-cache", action="store_true", help="不使用分析快取，重新分析所有文章")
+    parser.add_argument("--no-index", action="store_true", help="不更新全文索引")
+    args = parser.parse_args()
+    main(args.data_dir, args.topics, args.workers, use_cache=not args.no_cache, build_index=not args.no_index)
\ No newline at end of file
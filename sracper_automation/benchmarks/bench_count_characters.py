@@ -0,0 +1,163 @@
+"""
+文章字數統計（text.py 的 count_characters）微基準測試。
+
+比較目前的 count_characters（兩次 re.sub 加一次計數）與原本依序執行 8 次 re.sub 的版本，
+逐篇確認字數相同後回報每篇平均耗時。預設讀取部落格爬蟲輸出的
+article_*_content.txt / article_*_tables.txt；資料夾不存在時以固定亂數種子
+產生同樣格式的 80 篇文章，結果仍可互相比較。
+
+使用方式（於 sracper_automation 目錄下）:
+    python benchmarks/bench_count_characters.py
+    python benchmarks/bench_count_characters.py --data-dir ../money101_cal/roocash_data --runs 20
+"""
+import argparse
+import importlib.util
+import json
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+BLOG_DIR = PROJECT_ROOT.parent / "roocash blog"
+SYNTHETIC_ARTICLES = 80
+
+
+def load_text_module():
+    if str(BLOG_DIR) not in sys.path:
+        sys.path.insert(0, str(BLOG_DIR))  # text.py 匯入同資料夾的 article_index
+    spec = importlib.util.spec_from_file_location("roocash_text", BLOG_DIR / "text.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def legacy_count_characters(content, tables_content):
+    """改寫前的實作，作為結果與耗時的對照"""
+    combined_text = content + tables_content
+    combined_text = re.sub(r'// filepath:.*?\n', '', combined_text)
+    combined_text = re.sub(r'^標題:.*?\n', '', combined_text, flags=re.MULTILINE)
+    combined_text = re.sub(r'^連結:.*?\n', '', combined_text, flags=re.MULTILINE)
+    combined_text = re.sub(r'^發布日期:.*?\n', '', combined_text, flags=re.MULTILINE)
+    combined_text = re.sub(r'^分類:.*?\n', '', combined_text, flags=re.MULTILINE)
+    combined_text = re.sub(r'^完整內容:.*?\n', '', combined_text, flags=re.MULTILINE)
+    combined_text = re.sub(r'#{1,6}\s*', '', combined_text)
+    combined_text = re.sub(r'●\s*', '', combined_text)
+    clean_text = re.sub(r'[^一-龥a-zA-Z0-9]', '', combined_text)
+    return len(clean_text)
+
+
+def load_corpus(data_dir):
+    """回傳 [(內容, 表格內容)]，依檔名排序"""
+    articles = []
+    content_files = sorted(data_dir.glob("article_*_content.txt"))
+    for content_file in content_files:
+        table_file = content_file.with_name(content_file.name.replace("_content", "_tables"))
+        tables = table_file.read_text(encoding="utf-8") if table_file.exists() else ""
+        articles.append((content_file.read_text(encoding="utf-8"), tables))
+    return articles
+
+
+def synthetic_corpus(count=SYNTHETIC_ARTICLES, seed=101):
+    """產生與爬蟲輸出格式相同的文章（檔頭、markdown 標題、列表與表格）"""
+    rng = random.Random(seed)
+    phrases = ["信用卡", "現金回饋", "國內消費", "海外消費", "首刷禮", "年費", "電影", "餐廳",
+               "行動支付", "LINE Pay", "2.5%", "NT$1,000", "活動期間", "登錄", "上限", "KKday"]
+    punctuation = ["，", "。", "、", "！", " ", "（", "）"]
+
+    def sentence():
+        return "".join(rng.choice(phrases) + rng.choice(punctuation) for _ in range(rng.randint(8, 20)))
+
+    articles = []
+    for number in range(1, count + 1):
+        lines = [
+            f"// filepath: roocash_data/article_{number}_content.txt",
+            f"標題: 信用卡推薦 {number}",
+            f"連結: https://roo.cash/blog/article-{number}",
+            f"發布日期: 2025-{number % 12 + 1:02d}-{number % 28 + 1:02d}",
+            "分類: 信用卡, 優惠",
+            "",
+            "完整內容:",
+        ]
+        for _ in range(rng.randint(10, 40)):
+            kind = rng.random()
+            if kind < 0.15:
+                lines.append(f"{'#' * rng.randint(2, 4)} {sentence()[:20]}")
+            elif kind < 0.35:
+                lines.append(f"● {sentence()}")
+            else:
+                lines.append(sentence())
+        tables = ""
+        if number % 3:
+            rows = [" | ".join(rng.choice(phrases) for _ in range(4)) for _ in range(rng.randint(3, 12))]
+            tables = "\n表格 1:\n" + "\n".join(rows) + "\n"
+        articles.append(("\n".join(lines) + "\n", tables))
+    return articles
+
+
+def time_per_article(func, articles, runs):
+    """回傳每篇平均微秒數（取各輪最小值）"""
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        for content, tables in articles:
+            func(content, tables)
+        best = min(best, time.perf_counter() - start)
+    return best / len(articles) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="文章字數統計微基準測試")
+    parser.add_argument("--data-dir", default="../money101_cal/roocash_data",
+                        help="文章資料夾（相對於 roocash blog 資料夾）；不存在時使用合成文章")
+    parser.add_argument("--runs", type=int, default=10, help="量測輪數（取最小值）")
+    parser.add_argument("--json", help="將結果寫入 JSON 檔，方便追蹤趨勢")
+    args = parser.parse_args()
+
+    data_dir = BLOG_DIR / args.data_dir
+    if data_dir.is_dir():
+        articles = load_corpus(data_dir)
+        source = str(data_dir)
+    else:
+        articles = []
+    if not articles:
+        articles = synthetic_corpus()
+        source = "合成文章"
+
+    count_characters = load_text_module().count_characters
+    mismatches = [
+        index for index, (content, tables) in enumerate(articles, start=1)
+        if count_characters(content, tables) != legacy_count_characters(content, tables)
+    ]
+
+    legacy_us = time_per_article(legacy_count_characters, articles, args.runs)
+    current_us = time_per_article(count_characters, articles, args.runs)
+    total_kb = sum(len(content) + len(tables) for content, tables in articles) / 1024
+
+    print(f"資料來源: {source}（{len(articles)} 篇，{total_kb:.0f}K 字元）")
+    print(f"{'版本':<20}{'每篇(µs)':>12}")
+    print(f"{'re.sub x8':<20}{legacy_us:>12.1f}")
+    print(f"{'目前版本':<20}{current_us:>12.1f}")
+    print(f"加速 {legacy_us / current_us:.2f}x")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({
+                "python": sys.version.split()[0],
+                "source": source,
+                "articles": len(articles),
+                "legacy_us_per_article": round(legacy_us, 1),
+                "current_us_per_article": round(current_us, 1),
+                "mismatches": mismatches,
+            }, f, ensure_ascii=False, indent=2)
+        print(f"已儲存結果到 {args.json}")
+
+    if mismatches:
+        print(f"字數不一致的文章: {', '.join(map(str, mismatches))}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+"""
+比較冷啟動與連線池兩種方式取得 WebDriver 的耗時。
+
+cold: 每次都解析 chromedriver 路徑（見 utils/driver_resolver.py）並啟動新的 Chrome
+pooled: 透過 DriverPool 借用/歸還同一個 session
+
+使用方式（於 sracper_automation 目錄下）:
+    python benchmarks/bench_driver_startup.py --runs 3
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.browser import initialize_web_driver, close_web_driver
+from src.utils.driver_pool import DriverPool
+
+
+def bench_cold(runs, profile):
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        driver = initialize_web_driver(profile=profile)
+        driver.get("about:blank")
+        durations.append(time.perf_counter() - start)
+        close_web_driver(driver)
+    return durations
+
+
+def bench_pooled(runs, profile):
+    durations = []
+    with DriverPool(size=1, max_pages=0, profile=profile) as pool:
+        for _ in range(runs):
+            start = time.perf_counter()
+            with pool.checkout() as driver:
+                driver.get("about:blank")
+            durations.append(time.perf_counter() - start)
+    return durations
+
+
+def report(name, durations):
+    total = sum(durations)
+    print(f"[{name}] 次數: {len(durations)}  總耗時: {total:.2f}s  平均: {total / len(durations):.2f}s"
+          f"  首次: {durations[0]:.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WebDriver 啟動時間基準測試")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--profile", default=None, choices=["lean", "full"], help="瀏覽器設定檔")
+    args = parser.parse_args()
+
+    report("cold", bench_cold(args.runs, args.profile))
+    report("pooled", bench_pooled(args.runs, args.profile))
+
+
+if __name__ == "__main__":
+    main()
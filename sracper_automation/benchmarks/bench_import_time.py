@@ -0,0 +1,114 @@
+"""
+以 python -X importtime 量測各模組的匯入時間，以及命令列 --help / --dry-run 的啟動時間。
+
+每個目標在獨立的子行程中量測（避免模組快取影響結果），同時檢查
+不應在該路徑載入的重量級套件（例如 --help 不應匯入 selenium 或 pandas），
+違反時以非零狀態結束，可直接放進 cron 或 CI。
+
+使用方式（於 sracper_automation 目錄下）:
+    python benchmarks/bench_import_time.py
+    python benchmarks/bench_import_time.py --runs 5 --json import_time.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_PACKAGES = ["selenium", "webdriver_manager", "pandas", "openpyxl", "requests", "bs4", "playwright"]
+
+# 模組 -> 不應被匯入的套件
+MODULES = {
+    "src.cli": HEAVY_PACKAGES,
+    "src.orchestrator": HEAVY_PACKAGES,
+    "src.crawlers.base_crawler": ["selenium", "webdriver_manager", "pandas", "openpyxl"],
+    "src.crawlers.credit_card_crawler": ["selenium", "webdriver_manager", "pandas", "openpyxl"],
+    "src.utils.html_parser": HEAVY_PACKAGES,
+}
+
+# 命令列 -> 量測整體耗時
+COMMANDS = {
+    "money101 --help": ["-m", "src.cli", "--help"],
+    "money101 crawl --help": ["-m", "src.cli", "crawl", "--help"],
+    "money101 crawl --dry-run": ["-m", "src.cli", "crawl", "--dry-run"],
+}
+
+
+def import_profile(module):
+    """回傳 (自身累計匯入微秒數, 已匯入的頂層套件集合)"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"匯入 {module} 失敗:\n{result.stderr[-2000:]}")
+
+    cumulative = 0
+    packages = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        if not cumulative_us.isdigit():
+            continue  # 標題列
+        packages.add(name.split(".")[0])
+        if name == module:
+            cumulative = int(cumulative_us)
+    return cumulative, packages
+
+
+def command_time(args, runs):
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + args, cwd=PROJECT_ROOT,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="匯入時間與命令列啟動時間基準測試")
+    parser.add_argument("--runs", type=int, default=3, help="每個目標量測次數（取最小值）")
+    parser.add_argument("--json", help="將結果寫入 JSON 檔，方便追蹤趨勢")
+    args = parser.parse_args()
+
+    results = {"python": sys.version.split()[0], "modules": {}, "commands": {}}
+    violations = []
+
+    print(f"{'模組':<36}{'匯入時間':>10}  重量級套件")
+    for module, forbidden in MODULES.items():
+        samples = [import_profile(module) for _ in range(args.runs)]
+        cumulative = min(sample[0] for sample in samples)
+        heavy = sorted(set(HEAVY_PACKAGES) & samples[0][1])
+        bad = sorted(set(forbidden) & samples[0][1])
+        if bad:
+            violations.append(f"{module} 匯入了 {', '.join(bad)}")
+        results["modules"][module] = {"import_ms": round(cumulative / 1000, 1), "heavy": heavy}
+        print(f"{module:<36}{cumulative / 1000:>8.1f}ms  {', '.join(heavy) or '-'}")
+
+    print(f"\n{'命令':<36}{'耗時':>10}")
+    for name, command in COMMANDS.items():
+        elapsed = command_time(command, args.runs)
+        results["commands"][name] = {"wall_ms": round(elapsed * 1000, 1)}
+        print(f"{name:<36}{elapsed * 1000:>8.1f}ms")
+
+    results["violations"] = violations
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n已儲存結果到 {args.json}")
+
+    if violations:
+        print("\n匯入檢查失敗:")
+        for violation in violations:
+            print(f"  {violation}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,358 @@
+"""
+以錄製的 roo.cash 頁面離線執行各爬蟲的端對端基準測試。
+
+fixture_server.py 在本機重播 benchmarks/fixtures/ 中錄製的頁面，每個情境
+（爬蟲 x 擷取模式）在獨立子行程中執行，量測：
+
+    items_per_s         爬取階段每秒產品數（不含瀏覽器啟動）
+    webdriver_commands  爬取與存檔期間的 WebDriver 指令數（見 src/utils/perf.py）
+    peak_rss_mb         Python 行程的記憶體峰值；browser_peak_rss_mb 為 chromedriver/Chrome
+    write_ms            平坦化與寫出所有輸出檔的時間
+
+結果與 benchmarks/baseline_offline.json 比較，任一指標超出容許範圍、或產品數
+與錄製時不同即以非零狀態結束。
+
+使用方式（於 sracper_automation 目錄下）:
+    python benchmarks/bench_offline.py record                # 從真實網站錄製全部頁面
+    python benchmarks/bench_offline.py run                   # 離線執行並與基準比較
+    python benchmarks/bench_offline.py run cards --modes element,js
+    python benchmarks/bench_offline.py run --update-baseline # 以本次結果更新基準
+
+找不到基準（或某個情境沒有基準）時 run 以非零狀態結束，需先以 --update-baseline 建立。
+無法連到 roo.cash 時，可用 synthetic_blog.py 的模擬部落格作為 --upstream 錄製部落格。
+
+產品頁錄製的是捲動載入後的 DOM，並移除 <script>、<link>、<iframe>，重播時頁面
+不會再執行前端程式或連到外部網站；部落格則透過錄製代理保存所有 HTTP 回應。
+"""
+import argparse
+import importlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import urlparse
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from fixture_server import UPSTREAM_ORIGIN, FixtureServer, FixtureStore
+from src.cli import BLOG_DIR, BLOG_TARGET, PRODUCT_TARGETS
+from src.orchestrator import CATEGORIES
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline_offline.json")
+MODES = ("element", "js", "snapshot")
+
+# 指標 -> (較好的方向, 容許的相對變化)
+REGRESSION_RULES = {
+    "items_per_s": ("higher", 0.25),
+    "webdriver_commands": ("lower", 0.10),
+    "peak_rss_mb": ("lower", 0.25),
+    "browser_peak_rss_mb": ("lower", 0.25),
+    "write_ms": ("lower", 0.50),
+}
+
+# 錄製時移除的標籤：重播的頁面不執行前端程式、不載入外部資源
+STRIPPED_TAGS = ("script", "link", "iframe", "noscript")
+
+
+def crawler_class(target):
+    module_path, class_name, crawl_method = CATEGORIES[PRODUCT_TARGETS[target]]
+    return getattr(importlib.import_module(module_path), class_name), crawl_method
+
+
+def peak_rss_mb(who="self"):
+    """ru_maxrss 在 Linux 為 KB、macOS 為 bytes；無 resource 模組（Windows）時回傳 None"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF if who == "self" else resource.RUSAGE_CHILDREN)
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(usage.ru_maxrss / divisor, 1)
+
+
+# ====== 錄製 ======
+
+def record_product(store, target):
+    """以瀏覽器載入真實頁面並捲動到底，保存移除前端程式後的 DOM"""
+    from src.utils.html_parser import make_soup
+
+    cls, _ = crawler_class(target)
+    crawler = cls(extraction_mode="snapshot", browser_profile="full")
+    try:
+        crawler.driver.get(cls.URL)
+        time.sleep(3)
+        crawler.scroll_to_bottom()
+        html = crawler.driver.page_source
+    finally:
+        crawler.close()
+
+    soup = make_soup(html)
+    for tag in soup.find_all(STRIPPED_TAGS):
+        tag.decompose()
+    html = str(soup)
+
+    store.put(urlparse(cls.URL).path, 200, "text/html; charset=utf-8", {}, html)
+    store.expected[target] = len(cls.parse_snapshot(html, cls.URL))
+    print(f"[{target}] 已錄製 {store.expected[target]} 筆產品")
+
+
+def record_blog(store):
+    """透過錄製代理執行一次部落格爬蟲，保存所有請求的回應"""
+    with FixtureServer(store, record=True) as server, tempfile.TemporaryDirectory() as tmp:
+        details, _ = run_blog(server.origin, tmp, min_interval=None)
+    store.expected[BLOG_TARGET] = len(details)
+    print(f"[{BLOG_TARGET}] 已錄製 {len(details)} 篇文章")
+
+
+# ====== 情境（於子行程中執行）======
+
+def run_blog(origin, work_dir, min_interval=0):
+    """在 work_dir 下執行部落格爬蟲（輸出寫到 work_dir 內），回傳 (文章詳情, 寫出 CSV 的毫秒數)"""
+    import importlib.util
+
+    # 部落格腳本以工作目錄的相對路徑 ../money101_cal/roocash_data 輸出
+    blog_cwd = os.path.join(work_dir, "roocash blog")
+    os.makedirs(blog_cwd, exist_ok=True)
+    previous_cwd = os.getcwd()
+    os.chdir(blog_cwd)
+    if str(BLOG_DIR) not in sys.path:
+        sys.path.insert(0, str(BLOG_DIR))  # roocash_blog 匯入同資料夾的 article_index
+    try:
+        spec = importlib.util.spec_from_file_location("roocash_blog", BLOG_DIR / "roocash_blog.py")
+        blog = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(blog)
+
+        write_ms = [0.0]
+        write_csv = blog.write_csv
+
+        def timed_write_csv(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return write_csv(*args, **kwargs)
+            finally:
+                write_ms[0] += (time.perf_counter() - start) * 1000
+
+        blog.write_csv = timed_write_csv
+        options = {} if min_interval is None else {"min_interval": min_interval}
+        details = blog.main(base_url=f"{origin}/blog", use_cache=False, **options)
+    finally:
+        os.chdir(previous_cwd)
+    return details, write_ms[0]
+
+
+def scenario_product(target, origin, mode, work_dir):
+    from src.utils.product_store import ProductStore
+
+    cls, crawl_method = crawler_class(target)
+    start = time.perf_counter()
+    crawler = cls(extraction_mode=mode, browser_profile="lean")
+    startup_s = time.perf_counter() - start
+    crawler.url = origin + urlparse(cls.URL).path
+    crawler.output_dir = work_dir
+    crawler.product_store = ProductStore(os.path.join(work_dir, "products.db"))
+    try:
+        start = time.perf_counter()
+        data = getattr(crawler, crawl_method)()
+        crawl_s = time.perf_counter() - start
+        crawler.save_to_file(data)
+    finally:
+        crawler.close()
+
+    perf = crawler.perf.report()
+    stages = perf["stages"]
+    return {
+        "items": len(data),
+        "startup_s": round(startup_s, 2),
+        "crawl_s": round(crawl_s, 3),
+        "items_per_s": round(len(data) / crawl_s, 2) if crawl_s else 0.0,
+        "webdriver_commands": perf["webdriver_commands"],
+        "write_ms": round(sum(stages.get(name, {}).get("total_ms", 0.0)
+                              for name in ("serialize", "write", "write_store")), 1),
+        "peak_rss_mb": peak_rss_mb("self"),
+        "browser_peak_rss_mb": peak_rss_mb("children"),
+        "stages": {name: stats["total_ms"] for name, stats in stages.items()},
+    }
+
+
+def scenario_blog(origin, work_dir):
+    start = time.perf_counter()
+    details, write_ms = run_blog(origin, work_dir)
+    crawl_s = time.perf_counter() - start
+    return {
+        "items": len(details),
+        "crawl_s": round(crawl_s, 3),
+        "items_per_s": round(len(details) / crawl_s, 2) if crawl_s else 0.0,
+        "webdriver_commands": 0,
+        "write_ms": round(write_ms, 1),
+        "peak_rss_mb": peak_rss_mb("self"),
+        "browser_peak_rss_mb": peak_rss_mb("children"),
+    }
+
+
+def run_scenario(target, origin, mode):
+    """在子行程中執行單一情境，回傳結果字典"""
+    with tempfile.TemporaryDirectory() as tmp:
+        result_path = os.path.join(tmp, "result.json")
+        command = [sys.executable, os.path.abspath(__file__), "scenario", target,
+                   "--origin", origin, "--mode", mode, "--result", result_path]
+        completed = subprocess.run(command, cwd=PROJECT_ROOT, stdout=subprocess.DEVNULL,
+                                   stderr=subprocess.PIPE, text=True)
+        if completed.returncode != 0 or not os.path.exists(result_path):
+            return {"error": (completed.stderr or "").strip()[-2000:] or f"結束狀態 {completed.returncode}"}
+        with open(result_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+
+# ====== 比較 ======
+
+def compare(results, baseline, expected):
+    """回傳違規說明列表"""
+    problems = []
+    for key, result in results.items():
+        target = key.split(":")[0]
+        if "error" in result:
+            problems.append(f"{key} 執行失敗: {result['error'].splitlines()[-1] if result['error'] else ''}")
+            continue
+        if target in expected and result["items"] != expected[target]:
+            problems.append(f"{key} 產品數 {result['items']}，錄製時為 {expected[target]}")
+        base = baseline.get(key)
+        if not base:
+            problems.append(f"{key} 沒有基準，請以 --update-baseline 建立")
+            continue
+        for metric, (better, tolerance) in REGRESSION_RULES.items():
+            current, previous = result.get(metric), base.get(metric)
+            if current is None or not previous:
+                continue
+            change = (current - previous) / previous
+            if (better == "higher" and change < -tolerance) or (better == "lower" and change > tolerance):
+                problems.append(f"{key} {metric}: {previous} -> {current}（{change:+.0%}，容許 {tolerance:.0%}）")
+    return problems
+
+
+def print_results(results, baseline):
+    print(f"\n{'情境':<22}{'產品數':>7}{'每秒':>9}{'指令數':>9}{'RSS(MB)':>10}{'瀏覽器':>9}{'寫出(ms)':>10}")
+    for key, result in results.items():
+        if "error" in result:
+            print(f"{key:<22}失敗")
+            continue
+        print(f"{key:<22}{result['items']:>7}{result['items_per_s']:>9.1f}{result['webdriver_commands']:>9}"
+              f"{result['peak_rss_mb'] or 0:>10.1f}{result['browser_peak_rss_mb'] or 0:>9.1f}"
+              f"{result['write_ms']:>10.1f}")
+        base = baseline.get(key)
+        if base:
+            print(f"{'  基準':<22}{base.get('items', 0):>7}{base.get('items_per_s', 0):>9.1f}"
+                  f"{base.get('webdriver_commands', 0):>9}{base.get('peak_rss_mb') or 0:>10.1f}"
+                  f"{base.get('browser_peak_rss_mb') or 0:>9.1f}{base.get('write_ms', 0):>10.1f}")
+
+
+def command_record(args):
+    store = FixtureStore(args.fixtures)
+    store.data["origin"] = args.upstream
+    for target in args.targets:
+        if target == BLOG_TARGET:
+            record_blog(store)
+        else:
+            record_product(store, target)
+        store.save()
+    print(f"已儲存錄製結果到 {store.index_path}")
+    return 0
+
+
+def command_run(args):
+    store = FixtureStore(args.fixtures)
+    missing = [target for target in args.targets if target not in store.expected]
+    if missing:
+        print(f"尚未錄製: {', '.join(missing)}；請先執行 python benchmarks/bench_offline.py record {' '.join(missing)}")
+        return 2
+
+    modes = [mode.strip() for mode in args.modes.split(",") if mode.strip()]
+    results = {}
+    with FixtureServer(store) as server:
+        for target in args.targets:
+            for mode in ([BLOG_TARGET] if target == BLOG_TARGET else modes):
+                key = f"{target}:{'http' if target == BLOG_TARGET else mode}"
+                print(f"執行 {key} ...")
+                results[key] = run_scenario(target, server.origin, mode)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    if args.update_baseline:
+        baseline.update({key: result for key, result in results.items() if "error" not in result})
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, ensure_ascii=False, indent=2, sort_keys=True)
+        print(f"\n已更新基準 {args.baseline}")
+        return 0
+
+    if not baseline:
+        print(f"\n找不到基準 {args.baseline}，請先以 --update-baseline 建立")
+        return 2
+    problems = compare(results, baseline, store.expected)
+    if problems:
+        print("\n!!!!!! 效能退步或結果不符 !!!!!!")
+        for problem in problems:
+            print(f"  {problem}")
+        return 1
+    print("\n未發現退步")
+    return 0
+
+
+def command_scenario(args):
+    with tempfile.TemporaryDirectory() as work_dir:
+        if args.target == BLOG_TARGET:
+            result = scenario_blog(args.origin, work_dir)
+        else:
+            result = scenario_product(args.target, args.origin, args.mode, work_dir)
+    with open(args.result, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False)
+    return 0
+
+
+def main(argv=None):
+    all_targets = list(PRODUCT_TARGETS) + [BLOG_TARGET]
+    parser = argparse.ArgumentParser(description="以錄製頁面離線執行爬蟲基準測試")
+    parser.add_argument("--fixtures", default=FixtureStore().root, help="錄製頁面的資料夾")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    record = sub.add_parser("record", help="從真實網站錄製頁面")
+    record.add_argument("targets", nargs="*", default=all_targets, metavar="target")
+    record.add_argument("--upstream", default=UPSTREAM_ORIGIN, help="部落格錄製代理轉送的網站")
+    record.set_defaults(handler=command_record)
+
+    run = sub.add_parser("run", help="離線執行並與基準比較")
+    run.add_argument("targets", nargs="*", default=all_targets, metavar="target")
+    run.add_argument("--modes", default=",".join(MODES), help="產品頁的擷取模式，以逗號分隔")
+    run.add_argument("--baseline", default=BASELINE_PATH)
+    run.add_argument("--update-baseline", action="store_true", help="以本次結果更新基準")
+    run.add_argument("--json", help="另外將本次結果寫入 JSON 檔")
+    run.set_defaults(handler=command_run)
+
+    scenario = sub.add_parser("scenario", help=argparse.SUPPRESS)
+    scenario.add_argument("target")
+    scenario.add_argument("--origin", required=True)
+    scenario.add_argument("--mode", default="element")
+    scenario.add_argument("--result", required=True)
+    scenario.set_defaults(handler=command_scenario)
+
+    args = parser.parse_args(argv)
+    unknown = [target for target in getattr(args, "targets", []) if target not in all_targets]
+    if unknown:
+        parser.error(f"未知的項目: {', '.join(unknown)}")
+    modes = [mode.strip() for mode in getattr(args, "modes", "").split(",") if mode.strip()]
+    if any(mode not in MODES for mode in modes):
+        parser.error(f"擷取模式須為 {', '.join(MODES)}")
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+"""
+比較 element 與 js 兩種擷取模式每頁的 WebDriver 指令數與耗時。
+
+使用方式（於 sracper_automation 目錄下）:
+    python benchmarks/bench_webdriver_commands.py cards
+    python benchmarks/bench_webdriver_commands.py loans accounts
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.crawlers.credit_card_crawler import CreditCardCrawler
+from src.crawlers.personal_loan_crawler import PersonalLoanCrawler
+from src.crawlers.account_crawler import AccountCrawler
+from src.utils.command_counter import count_webdriver_commands
+
+CRAWLERS = {
+    "cards": (CreditCardCrawler, "crawl_credit_cards"),
+    "loans": (PersonalLoanCrawler, "crawl_loans"),
+    "accounts": (AccountCrawler, "crawl_accounts"),
+}
+
+
+def run_once(crawler_cls, method_name, mode):
+    crawler = crawler_cls(extraction_mode=mode)
+    try:
+        with count_webdriver_commands(crawler.driver) as counter:
+            start = time.perf_counter()
+            data = getattr(crawler, method_name)()
+            elapsed = time.perf_counter() - start
+        return data, counter, elapsed
+    finally:
+        crawler.close()
+
+
+def main(argv):
+    targets = argv or list(CRAWLERS)
+    for name in targets:
+        crawler_cls, method_name = CRAWLERS[name]
+        results = {}
+        for mode in ("element", "js"):
+            results[mode] = run_once(crawler_cls, method_name, mode)
+
+        print(f"\n====== {name} ======")
+        for mode, (data, counter, elapsed) in results.items():
+            print(f"[{mode}] 產品數: {len(data)}  WebDriver 指令數: {counter.total}  耗時: {elapsed:.2f}s")
+            for command, count in counter.counts.most_common(5):
+                print(f"    {command}: {count}")
+
+        if results["element"][0] != results["js"][0]:
+            print("警告：兩種模式的輸出不一致")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
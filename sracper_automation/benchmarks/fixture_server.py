@@ -0,0 +1,161 @@
+"""
+以本機 HTTP 伺服器重播錄製的 roo.cash 頁面，供離線基準測試使用。
+
+fixtures/index.json 記錄每個路徑（含查詢字串）對應的回應檔案：
+
+    {"version": 1, "origin": "https://roo.cash", "recorded_at": "...",
+     "pages": {"/creditcard": {"file": "pages/<sha1>.bin", "status": 200,
+                               "content_type": "text/html; charset=utf-8", "headers": {...}}},
+     "expected": {"cards": 52, ...}}
+
+錄製時將內容中的 https://roo.cash（含 JSON 跳脫的 https:\\/\\/roo.cash）換成佔位字串，
+重播時再換回本機伺服器的網址，因此文章連結與 REST API 回傳的連結都會指向本機。
+"""
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+UPSTREAM_ORIGIN = "https://roo.cash"
+
+ORIGIN_TOKEN = "__FIXTURE_ORIGIN__"
+ESCAPED_ORIGIN_TOKEN = "__FIXTURE_ORIGIN_ESCAPED__"
+
+# 重播時保留的回應標頭（REST API 分頁需要）
+KEPT_HEADERS = ("X-WP-Total", "X-WP-TotalPages", "Last-Modified", "ETag")
+TEXT_TYPES = ("text/", "application/json", "application/xml", "application/rss+xml", "application/javascript")
+
+
+def is_text(content_type):
+    return any(content_type.startswith(prefix) for prefix in TEXT_TYPES)
+
+
+def tokenize_origin(body, origin=UPSTREAM_ORIGIN):
+    escaped = origin.replace("/", "\\/")
+    return body.replace(escaped, ESCAPED_ORIGIN_TOKEN).replace(origin, ORIGIN_TOKEN)
+
+
+def restore_origin(body, origin):
+    return body.replace(ESCAPED_ORIGIN_TOKEN, origin.replace("/", "\\/")).replace(ORIGIN_TOKEN, origin)
+
+
+class FixtureStore:
+    """錄製回應的索引與檔案"""
+
+    def __init__(self, root=FIXTURES_DIR):
+        self.root = root
+        self.index_path = os.path.join(root, "index.json")
+        self.data = {"version": 1, "origin": UPSTREAM_ORIGIN, "pages": {}, "expected": {}}
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                self.data.update(json.load(f))
+        self._lock = threading.Lock()
+
+    def __contains__(self, path):
+        return path in self.data["pages"]
+
+    @property
+    def expected(self):
+        return self.data["expected"]
+
+    def get(self, path, origin):
+        """回傳 (狀態碼, Content-Type, 標頭, 內容位元組)，未錄製時回傳 None"""
+        entry = self.data["pages"].get(path)
+        if entry is None:
+            return None
+        with open(os.path.join(self.root, entry["file"]), "rb") as f:
+            body = f.read()
+        if is_text(entry["content_type"]):
+            body = restore_origin(body.decode("utf-8"), origin).encode("utf-8")
+        return entry["status"], entry["content_type"], entry.get("headers", {}), body
+
+    def put(self, path, status, content_type, headers, body):
+        """body 為 str 時視為文字並替換網址"""
+        if isinstance(body, str):
+            body = tokenize_origin(body, self.data["origin"]).encode("utf-8")
+        name = os.path.join("pages", hashlib.sha1(path.encode("utf-8")).hexdigest() + ".bin")
+        os.makedirs(os.path.join(self.root, "pages"), exist_ok=True)
+        with open(os.path.join(self.root, name), "wb") as f:
+            f.write(body)
+        with self._lock:
+            self.data["pages"][path] = {
+                "file": name,
+                "status": status,
+                "content_type": content_type,
+                "headers": {key: value for key, value in headers.items()
+                            if key.lower() in {kept.lower() for kept in KEPT_HEADERS}},
+            }
+
+    def save(self):
+        self.data["recorded_at"] = datetime.now().isoformat(timespec="seconds")
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = f"{self.index_path}.tmp"
+        with self._lock, open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.index_path)
+
+
+def make_handler(store, record=False):
+    """record=True 時未錄製的路徑轉向真實網站抓取並存入 store"""
+    session = None
+    if record:
+        import requests
+
+        session = requests.Session()
+
+    class FixtureHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            origin = f"http://{self.headers.get('Host', '%s:%d' % self.server.server_address[:2])}"
+            if record and self.path not in store:
+                response = session.get(store.data["origin"] + self.path, timeout=30)
+                content_type = response.headers.get("Content-Type", "application/octet-stream")
+                if is_text(content_type):
+                    response.encoding = response.encoding or "utf-8"
+                    body = response.text
+                else:
+                    body = response.content
+                store.put(self.path, response.status_code, content_type, response.headers, body)
+
+            page = store.get(self.path, origin)
+            if page is None:
+                self.send_error(404, "Not recorded")  # 狀態列只能使用 ASCII
+                return
+            status, content_type, headers, body = page
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for key, value in headers.items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return FixtureHandler
+
+
+class FixtureServer:
+    """在背景執行緒啟動重播（或錄製代理）伺服器；with 區塊結束時關閉"""
+
+    def __init__(self, store, record=False, host="127.0.0.1", port=0):
+        self.store = store
+        self.httpd = ThreadingHTTPServer((host, port), make_handler(store, record))
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def origin(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
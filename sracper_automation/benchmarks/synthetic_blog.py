@@ -0,0 +1,157 @@
+"""
+模擬 roo.cash 部落格（WordPress REST API、分類列表頁與文章頁）的本機伺服器。
+
+無法連到 roo.cash 的環境可以用它錄製部落格的離線 fixture，內容以固定亂數
+種子產生，每次錄製的頁面都相同:
+
+    python benchmarks/synthetic_blog.py --port 8765 &
+    python benchmarks/bench_offline.py record blog --upstream http://127.0.0.1:8765
+"""
+import argparse
+import json
+import random
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+CATEGORY_SLUGS = ["roo-creditcard", "roo-loan", "roo-insurance", "roo-investment", "roo-news",
+                  "roo-life-discount"]
+ARTICLES_PER_CATEGORY = 4
+SEED = 101
+
+PHRASES = ["信用卡", "現金回饋", "國內消費", "海外消費", "首刷禮", "年費", "行動支付", "LINE Pay",
+           "2.5%", "NT$1,000", "活動期間", "登錄", "上限", "信貸利率", "保費", "定期定額"]
+CARDS = ["玉山Pi拍錢包信用卡", "台新FlyGo卡", "國泰CUBE卡", "永豐DAWAY卡", "富邦J卡"]
+
+
+def build_site(seed=SEED):
+    """回傳 (分類列表, 文章列表)；部分文章同時屬於兩個分類"""
+    rng = random.Random(seed)
+    categories = [{"id": 10 + number, "slug": slug} for number, slug in enumerate(CATEGORY_SLUGS)]
+    articles = []
+    for category in categories:
+        for _ in range(ARTICLES_PER_CATEGORY):
+            number = len(articles) + 1
+            ids = [category["id"]]
+            if rng.random() < 0.25:
+                ids.append(rng.choice(categories)["id"])
+            articles.append({
+                "number": number,
+                "slug": f"article-{number}",
+                "title": f"{rng.choice(CARDS)}懶人包 {number}",
+                "date": f"2025-{number % 12 + 1:02d}-{number % 28 + 1:02d}",
+                "categories": sorted(set(ids)),
+                "paragraphs": [sentence(rng) for _ in range(rng.randint(6, 14))],
+                "items": [f"{rng.choice(CARDS)} {sentence(rng)[:24]}" for _ in range(rng.randint(2, 6))],
+                "table": [[rng.choice(PHRASES) for _ in range(3)] for _ in range(rng.randint(2, 5))],
+            })
+    return categories, articles
+
+
+def sentence(rng):
+    return "".join(rng.choice(PHRASES) + rng.choice("，。、！ ") for _ in range(rng.randint(8, 20)))
+
+
+def article_html(article, slug_by_id):
+    terms = "".join(f'<a href="/blog/category/{slug_by_id[cid]}/">{slug_by_id[cid]}</a>'
+                    for cid in article["categories"])
+    rows = "".join("<tr>" + "".join(f"<td>{cell}</td>" for cell in row) + "</tr>" for row in article["table"])
+    body = "".join(f"<h2>{text[:12]}</h2><p>{text}</p>" if i % 4 == 0 else f"<p>{text}</p>"
+                   for i, text in enumerate(article["paragraphs"]))
+    items = "".join(f"<li>{item}</li>" for item in article["items"])
+    return (
+        f"<html><head><title>{article['title']}</title></head><body>"
+        f'<article class="bam-single-post"><h1>{article["title"]}</h1>'
+        f'<span class="elementor-post-info__item--type-date">{article["date"]}</span>'
+        f'<span class="elementor-post-info__terms-list">{terms}</span>'
+        f'<div class="post-thumbnail"><img src="/blog/images/{article["slug"]}.jpg"></div>'
+        f'<div class="entry-content">{body}<ul>{items}</ul><table>{rows}</table></div>'
+        f"</article></body></html>"
+    )
+
+
+def listing_html(articles, origin):
+    cards = "".join(
+        f'<div class="elementor-post__card"><h3 class="elementor-post__title">'
+        f'<a href="{origin}/blog/{article["slug"]}/">{article["title"]}</a></h3></div>'
+        for article in articles
+    )
+    return f"<html><body>{cards}</body></html>"
+
+
+def make_handler(seed=SEED):
+    categories, articles = build_site(seed)
+    slug_by_id = {category["id"]: category["slug"] for category in categories}
+    by_slug = {article["slug"]: article for article in articles}
+
+    class SyntheticBlogHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            origin = f"http://{self.headers.get('Host', '%s:%d' % self.server.server_address[:2])}"
+            url = urlparse(self.path)
+            query = {key: values[0] for key, values in parse_qs(url.query).items()}
+            parts = [part for part in url.path.split("/") if part]
+
+            if parts[:4] == ["blog", "wp-json", "wp", "v2"] and parts[4:] == ["categories"]:
+                wanted = set(query.get("slug", "").split(","))
+                self.send_json([category for category in categories if category["slug"] in wanted])
+            elif parts[:4] == ["blog", "wp-json", "wp", "v2"] and parts[4:] == ["posts"]:
+                wanted = {int(cid) for cid in query.get("categories", "").split(",") if cid}
+                posts = [
+                    {"link": f"{origin}/blog/{article['slug']}/", "title": {"rendered": article["title"]},
+                     "categories": article["categories"]}
+                    for article in articles if wanted & set(article["categories"])
+                ]
+                per_page = int(query.get("per_page", 10))
+                page = int(query.get("page", 1))
+                total_pages = max(1, -(-len(posts) // per_page))
+                self.send_json(posts[(page - 1) * per_page:page * per_page],
+                               {"X-WP-Total": str(len(posts)), "X-WP-TotalPages": str(total_pages)})
+            elif parts[:2] == ["blog", "category"] and len(parts) == 3 and parts[2] in CATEGORY_SLUGS:
+                category_id = next(c["id"] for c in categories if c["slug"] == parts[2])
+                listed = [article for article in articles if category_id in article["categories"]]
+                self.send_text(listing_html(listed, origin))
+            elif len(parts) == 2 and parts[0] == "blog" and parts[1] in by_slug:
+                self.send_text(article_html(by_slug[parts[1]], slug_by_id))
+            else:
+                self.send_error(404)
+
+        def send_json(self, data, headers=None):
+            self.send_body(json.dumps(data, ensure_ascii=False), "application/json; charset=UTF-8", headers)
+
+        def send_text(self, html):
+            self.send_body(html, "text/html; charset=UTF-8")
+
+        def send_body(self, text, content_type, headers=None):
+            body = text.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return SyntheticBlogHandler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="模擬 roo.cash 部落格的本機伺服器")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=SEED)
+    args = parser.parse_args(argv)
+
+    httpd = ThreadingHTTPServer((args.host, args.port), make_handler(args.seed))
+    print(f"模擬部落格: http://{args.host}:{args.port}/blog")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
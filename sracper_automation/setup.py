@@ -27,6 +27,13 @@ setup(
         "beautifulsoup4",
         "requests"
     ],
+    entry_points={
+        "console_scripts": ["money101=src.cli:main"],
+    },
+    extras_require={
+        # 非同步 CDP 爬蟲（src/crawlers/async_base_crawler.py）
+        "async": ["playwright"],
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
@@ -0,0 +1,244 @@
+"""
+統一的命令列入口 money101。
+
+    money101 crawl cards loans accounts    # 平行爬取產品類別
+    money101 crawl blog --resume           # 爬取部落格文章
+    money101 analyze                       # 分析已爬取的部落格文章
+    money101 search --card 玉山 --since 2025-01-01  # 查詢部落格文章全文索引
+    money101 crawl --dry-run               # 只檢查設定與相依套件，不啟動瀏覽器
+
+本模組只匯入標準函式庫；selenium、requests、bs4 等只在實際執行
+對應的子命令時才載入，--help 與 --dry-run 不需要等待這些套件匯入。
+"""
+import argparse
+import importlib.util
+import os
+import sys
+from pathlib import Path
+
+# 命令列名稱 -> 調度器（src/orchestrator.py）的類別名稱
+PRODUCT_TARGETS = {
+    "cards": "credit_cards",
+    "loans": "personal_loans",
+    "accounts": "securities_accounts",
+}
+BLOG_TARGET = "blog"
+
+# 部落格爬蟲與分析腳本位於專案根目錄的 "roocash blog" 資料夾，
+# 腳本以該資料夾為工作目錄讀寫 ../money101_cal/roocash_data
+BLOG_DIR = Path(__file__).resolve().parents[2] / "roocash blog"
+
+# 各路徑需要的第三方套件，--dry-run 只檢查是否已安裝而不匯入
+REQUIREMENTS = {
+    "products": ["selenium", "webdriver_manager", "openpyxl", "bs4"],
+    "blog": ["requests", "bs4", "lxml"],
+    "blog-selenium": ["selenium", "webdriver_manager"],
+    "parquet": ["pyarrow"],
+}
+
+
+def load_blog_module(name):
+    """
+    以 "roocash blog" 為工作目錄載入部落格腳本
+
+    資料夾加入 sys.path 並以模組名稱匯入，行程池的子行程才能以相同名稱
+    重新匯入工作函式（spawn / forkserver 啟動方式）。
+    """
+    path = BLOG_DIR / f"{name}.py"
+    if not path.exists():
+        raise SystemExit(f"找不到 {path}")
+    os.chdir(BLOG_DIR)
+    if str(BLOG_DIR) not in sys.path:
+        sys.path.insert(0, str(BLOG_DIR))
+    return importlib.import_module(name)
+
+
+def missing_packages(names):
+    return [name for name in names if importlib.util.find_spec(name) is None]
+
+
+def crawl_plan(args):
+    """依參數列出將執行的工作與缺少的套件"""
+    targets = args.targets or list(PRODUCT_TARGETS) + [BLOG_TARGET]
+    categories = [PRODUCT_TARGETS[target] for target in targets if target in PRODUCT_TARGETS]
+    formats = [fmt.strip() for fmt in args.formats.split(",") if fmt.strip()]
+
+    plan = []
+    needed = []
+    if categories:
+        plan.append(
+            f"產品類別: {', '.join(categories)}（模式 {args.mode}，輸出 {', '.join(formats)}"
+            f"{'，瀏覽器 ' + args.profile if args.profile else ''}{'，增量' if args.incremental else ''}{'，從日誌繼續' if args.resume else ''}）"
+        )
+        needed += REQUIREMENTS["products"]
+        if "parquet" in formats:
+            needed += REQUIREMENTS["parquet"]
+    if BLOG_TARGET in targets:
+        plan.append(
+            f"部落格: {BLOG_DIR / 'roocash_blog.py'}（{args.backend}，同時 {args.concurrency} 篇"
+            f"{'，不使用快取' if args.no_cache else ''}{'，從日誌繼續' if args.resume else ''}）"
+        )
+        needed += REQUIREMENTS["blog"]
+        if args.backend == "selenium":
+            needed += REQUIREMENTS["blog-selenium"]
+    return categories, BLOG_TARGET in targets, plan, missing_packages(dict.fromkeys(needed))
+
+
+def run_crawl(args):
+    from src.utils.sinks import SINKS
+
+    unknown = [fmt for fmt in args.formats.split(",") if fmt.strip() and fmt.strip() not in SINKS]
+    if unknown:
+        print(f"不支援的輸出格式: {', '.join(unknown)}")
+        return 2
+    categories, crawl_blog, plan, missing = crawl_plan(args)
+
+    if args.dry_run:
+        print("將執行:")
+        for line in plan:
+            print(f"  {line}")
+        if crawl_blog and not BLOG_DIR.exists():
+            print(f"找不到部落格腳本資料夾: {BLOG_DIR}")
+            return 1
+        if missing:
+            print(f"缺少套件: {', '.join(missing)}")
+            return 1
+        print("檢查通過")
+        return 0
+
+    status = 0
+    # 產品爬蟲與部落格爬蟲共用同一個 WebDriver 連線池，瀏覽器只需啟動一次；
+    # 部落格的每個詳情 worker 都會借用一個 session，連線池大小需容納 concurrency
+    driver_pool = None
+    if not args.no_pool:
+        from src.utils.driver_pool import DriverPool
+        size = max(args.workers or len(categories), args.concurrency if crawl_blog else 0, 1)
+        driver_pool = DriverPool(size=size, profile=args.profile)
+
+    try:
+        if categories:
+            from src.orchestrator import run_crawl as run_categories, print_summary, exit_status, PERF_REPORT_DIR
+
+            runs = run_categories(
+                categories=categories,
+                workers=args.workers,
+                timeout=args.timeout,
+                extraction_mode=args.mode,
+                use_pool=driver_pool is not None,
+                incremental=args.incremental,
+                resume=args.resume,
+                output_formats=[fmt.strip() for fmt in args.formats.split(",") if fmt.strip()],
+                browser_profile=args.profile,
+                perf_report_dir=None if args.no_perf_report else PERF_REPORT_DIR,
+                driver_pool=driver_pool,
+            )
+            print_summary(runs)
+            status = exit_status(runs)
+
+        if crawl_blog:
+            blog = load_blog_module("roocash_blog")
+            blog.main(
+                driver_pool=driver_pool,
+                concurrency=args.concurrency,
+                backend=args.backend,
+                use_cache=not args.no_cache,
+                resume=args.resume,
+                build_index=not args.no_index,
+            )
+    finally:
+        if driver_pool is not None:
+            driver_pool.close()
+    return status
+
+
+def run_analyze(args):
+    if args.dry_run:
+        print(f"將分析 {BLOG_DIR / args.data_dir} 下的 article_*_content.txt")
+        return 0 if BLOG_DIR.exists() else 1
+    topics_file = os.path.abspath(args.topics) if args.topics else None  # 載入前會切換工作目錄
+    load_blog_module("text").main(args.data_dir, topics_file, args.workers, use_cache=not args.no_cache,
+                                  build_index=not args.no_index)
+    return 0
+
+
+def run_search(args):
+    article_index = load_blog_module("article_index")
+    argv = ["--db", str(Path(args.data_dir) / article_index.INDEX_NAME), "search", "--limit", str(args.limit)]
+    for option in ("card", "merchant", "topic", "since"):
+        if getattr(args, option):
+            argv += [f"--{option}", getattr(args, option)]
+    if args.json:
+        argv.append("--json")
+    if args.query:
+        argv += ["--", args.query]
+    return article_index.main(argv)
+
+
+def build_parser():
+    from src.config.settings import CATEGORY_TIMEOUT
+
+    parser = argparse.ArgumentParser(prog="money101", description="roo.cash 產品與部落格爬蟲")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    crawl = sub.add_parser("crawl", help="爬取產品類別或部落格")
+    crawl.add_argument("targets", nargs="*", metavar="target",
+                       help=f"要爬取的項目（{', '.join(list(PRODUCT_TARGETS) + [BLOG_TARGET])}），預設為全部")
+    crawl.add_argument("--dry-run", action="store_true", help="只列出將執行的工作並檢查相依套件")
+    crawl.add_argument("--resume", action="store_true", help="從上次中斷的日誌繼續")
+
+    products = crawl.add_argument_group("產品類別")
+    products.add_argument("--workers", type=int, default=None, help="同時執行的類別數")
+    products.add_argument("--timeout", type=float, default=CATEGORY_TIMEOUT, help="每個類別的逾時秒數")
+    products.add_argument("--mode", default="element", choices=["element", "js", "snapshot"],
+                          help="擷取模式")
+    products.add_argument("--no-pool", action="store_true", help="不使用 WebDriver 連線池")
+    products.add_argument("--incremental", action="store_true", help="增量模式")
+    products.add_argument("--formats", default="json,xlsx", help="輸出格式，以逗號分隔")
+    products.add_argument("--no-perf-report", action="store_true", help="不寫出各階段耗時的效能報告")
+    products.add_argument("--profile", default=None, choices=["lean", "full"],
+                          help="瀏覽器設定檔（lean 無頭且封鎖圖片、字型與追蹤腳本；full 完整載入）")
+
+    blog = crawl.add_argument_group("部落格")
+    blog.add_argument("--backend", default="http", choices=["http", "selenium"], help="抓取方式")
+    blog.add_argument("--concurrency", type=int, default=4, help="同時抓取的文章數")
+    blog.add_argument("--no-cache", action="store_true", help="不使用 HTTP 文章快取")
+    blog.add_argument("--no-index", action="store_true", help="不更新文章全文索引")
+    crawl.set_defaults(handler=run_crawl)
+
+    analyze = sub.add_parser("analyze", help="分析已爬取的部落格文章")
+    analyze.add_argument("--data-dir", default="../money101_cal/roocash_data",
+                         help="文章資料夾（相對於 roocash blog 資料夾）")
+    analyze.add_argument("--topics", help="主題關鍵字設定檔（JSON，{\"主題\": [\"關鍵字\", ...]}）")
+    analyze.add_argument("--workers", type=int, default=None,
+                         help="平行分析的行程數（預設為 CPU 數，1 表示不平行）")
+    analyze.add_argument("--no-cache", action="store_true", help="不使用分析快取，重新分析所有文章")
+    analyze.add_argument("--no-index", action="store_true", help="不更新文章全文索引")
+    analyze.add_argument("--dry-run", action="store_true", help="只列出將執行的工作")
+    analyze.set_defaults(handler=run_analyze)
+
+    search = sub.add_parser("search", help="查詢部落格文章全文索引")
+    search.add_argument("query", nargs="?", help="比對所有欄位的關鍵字")
+    search.add_argument("--card", help="提到的信用卡")
+    search.add_argument("--merchant", help="提到的商家")
+    search.add_argument("--topic", help="主題或分類")
+    search.add_argument("--since", help="只列出此日期（YYYY-MM-DD）以後發布的文章")
+    search.add_argument("--limit", type=int, default=20, help="最多列出的篇數")
+    search.add_argument("--json", action="store_true", help="以 JSON 輸出")
+    search.add_argument("--data-dir", default="../money101_cal/roocash_data",
+                        help="索引所在的文章資料夾（相對於 roocash blog 資料夾）")
+    search.set_defaults(handler=run_search)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    unknown = [target for target in getattr(args, "targets", []) if target not in PRODUCT_TARGETS
+               and target != BLOG_TARGET]
+    if unknown:
+        parser.error(f"未知的項目: {', '.join(unknown)}")
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,5 @@
 # Configuration settings for the application
+import os
 
 # Base URLs for the crawlers
 CREDIT_CARD_URL = "https://roo.cash/creditcard"
@@ -13,4 +14,27 @@ CREDIT_CARD_OUTPUT_PATH = "output/credit_cards/"
 PERSONAL_LOAN_OUTPUT_PATH = "output/personal_loans/"
 
 # Log file path
-LOG_FILE_PATH = "logs/crawler.log"
\ No newline at end of file
+LOG_FILE_PATH = "logs/crawler.log"
+
+# WebDriver 連線池
+DRIVER_POOL_SIZE = 2  # 同時存在的瀏覽器數量上限
+DRIVER_MAX_PAGES_PER_SESSION = 50  # 每個 session 使用幾頁後回收重建
+
+# 多類別平行爬取
+CATEGORY_TIMEOUT = 600  # 每個類別的逾時秒數
+
+# 無限捲動載入
+SCROLL_DEADLINE = 30  # 整體捲動載入的時間上限（秒）
+SCROLL_IDLE_MS = 300  # DOM 無變動且無進行中請求持續多久視為載入完成（毫秒）
+SCROLL_STEP_TIMEOUT = 8  # 單次捲動最多等待秒數
+
+# chromedriver 解析（見 utils/driver_resolver.py），可用環境變數覆寫
+CHROMEDRIVER_CACHE_DIR = os.environ.get(
+    "MONEY101_DRIVER_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "money101", "chromedriver")
+)
+CHROMEDRIVER_VERSION = os.environ.get("MONEY101_CHROMEDRIVER_VERSION") or None  # 固定版本，None 為清單中的預設版本
+CHROMEDRIVER_OFFLINE = os.environ.get("MONEY101_DRIVER_OFFLINE", "") == "1"  # 離線模式：絕不連網
+
+# 瀏覽器設定檔：lean 為無頭模式、不載入圖片與字型、封鎖分析與廣告網域、較小的視窗；
+# full 為完整載入的有頭瀏覽器（除錯用）
+BROWSER_PROFILE = os.environ.get("MONEY101_BROWSER_PROFILE", "lean")
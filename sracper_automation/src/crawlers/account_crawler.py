@@ -1,22 +1,62 @@
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
 import time
 import os
 from .base_crawler import BaseCrawler
+from .async_base_crawler import AsyncBaseCrawler
+from ..utils.html_parser import extract_account_info, extract_products
+from ..utils.js_extractor import ACCOUNT_JS, run_extraction_script
 
 class AccountCrawler(BaseCrawler):
-    def __init__(self):
-        super().__init__()
+    URL = "https://roo.cash/securities/account-recommendation"
+
+    # 產品容器選擇器（依序嘗試）
+    CARD_CONTAINER_SELECTORS = ["div[data-testid='product-card']", "div.product-card-large"]
+
+    # 各欄位的選擇器 fallback 列表，element 與 js 模式共用
+    SELECTORS = {
+        'account_name': ["h3[data-testid='product-title']", "h3", ".font-bold"],
+        'broker_info': ["div[data-testid='product-content'] > div.border-l", ".border-l"],
+        'highlights': ["div[data-testid^='product-highlight-']", ".highlight"],
+        'activity': ["div[data-testid='product-activity']", ".activity-info"],
+        'tags': ["div[data-testid='product-taxonomy'] div.whitespace-nowrap.rounded-full", ".tag"],
+        'banner': ["div[data-testid='product-banner'] img", ".banner img"],
+        'apply_button': ["div[data-testid='product-apply-cta']", ".apply-btn"],
+        'detail_link': ["a[data-testid='product-detail']", "a[href*='securities']"],
+        'fees': [".fee-info", ".commission-info"],
+        'promotions': [".promotion", ".offer"]
+    }
+
+    # 券商資訊區塊內的標籤/數值選擇器
+    BROKER_LABEL_SELECTORS = ["p.text-xs", ".label", ".info-label"]
+    BROKER_VALUE_SELECTORS = ["p.font-bold", ".value", ".info-value", "p.b1-bold"]
+
+    # 手續費與優惠活動的候選選擇器（含 :contains 的項目並非合法 CSS，會被略過）
+    FEE_SELECTORS = [
+        ".fee", ".commission", ".cost",
+        "[class*='fee']", "[class*='commission']",
+        "div:contains('手續費')", "div:contains('折')",
+        "p:contains('%')", "span:contains('折')"
+    ]
+    PROMOTION_SELECTORS = [
+        ".promotion", ".offer", ".deal",
+        "[class*='promo']", "[class*='offer']",
+        "div:contains('優惠')", "div:contains('活動')",
+        "div:contains('限時')", "div:contains('贈')"
+    ]
+
+    # 增量模式的產品識別欄位
+    NAME_FIELD = "券商名稱"
+    PRODUCT_TYPE = "securities_accounts"
+
+    def __init__(self, extraction_mode="element", driver_pool=None, incremental=False, resume=False,
+                 browser_profile=None):
+        super().__init__(extraction_mode, driver_pool, incremental, resume, browser_profile)
         
         # 初始化 WebDriver
         if not self.initialize_driver():
             raise Exception("WebDriver 初始化失敗")
         
         # 設定 URL
-        self.url = "https://roo.cash/securities/account-recommendation"
+        self.url = self.URL
         
         # 設定輸出目錄
         self.output_dir = os.path.join(self.base_output_dir, "securities_accounts")
@@ -24,13 +64,17 @@ class AccountCrawler(BaseCrawler):
 
     def crawl_accounts(self):
         """抓取證券開戶推薦資訊 - 優化版本"""
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
         print("正在前往證券開戶推薦頁面...")
         try:
-            self.driver.get(self.url)
-            # 使用 WebDriverWait 替代固定等待
-            WebDriverWait(self.driver, 3).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "div[data-testid='product-card'], div.product-card-large"))
-            )
+            with self.perf.stage("navigation"):
+                self.driver.get(self.url)
+                # 使用 WebDriverWait 替代固定等待
+                WebDriverWait(self.driver, 3).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, "div[data-testid='product-card'], div.product-card-large"))
+                )
         except Exception as e:
             print(f"導向頁面時出錯: {e}")
             return []
@@ -40,10 +84,20 @@ class AccountCrawler(BaseCrawler):
         # 滾動到頁面底部確保所有產品都載入
         self.scroll_to_bottom()
 
+        if self.extraction_mode in ("js", "snapshot"):
+            with self.perf.stage("extract_page"):
+                if self.extraction_mode == "js":
+                    data = self.extract_accounts_js()
+                else:
+                    html, url = self.take_snapshot()
+                    data = self.parse_snapshot(html, url)
+            self.perf.items += len(data)
+            return data
+
         # 獲取所有證券開戶產品
-        account_elements = self.driver.find_elements(By.CSS_SELECTOR, "div[data-testid='product-card']")
+        account_elements = self.driver.find_elements(By.CSS_SELECTOR, self.CARD_CONTAINER_SELECTORS[0])
         if not account_elements:
-            account_elements = self.driver.find_elements(By.CSS_SELECTOR, "div.product-card-large")
+            account_elements = self.driver.find_elements(By.CSS_SELECTOR, self.CARD_CONTAINER_SELECTORS[1])
         
         print(f"找到 {len(account_elements)} 個證券開戶產品")
         
@@ -52,46 +106,73 @@ class AccountCrawler(BaseCrawler):
             return []
 
         accounts_data = []
-        
-        # 批次處理，每次處理10個產品
-        batch_size = 10
-        for i in range(0, len(account_elements), batch_size):
-            batch = account_elements[i:i+batch_size]
-            print(f"處理第 {i+1}-{min(i+batch_size, len(account_elements))} 個證券開戶產品...")
+
+        # 逐張提取期間不使用隱式等待，欄位選擇器每頁只解析一次
+        with self.extraction_session(account_elements):
+            # 批次處理，每次處理10個產品
+            batch_size = 10
+            for i in range(0, len(account_elements), batch_size):
+                self.check_cancelled()  # 逾時時由 orchestrator 設定
+                batch = account_elements[i:i+batch_size]
+                print(f"處理第 {i+1}-{min(i+batch_size, len(account_elements))} 個證券開戶產品...")
             
-            for idx, account in enumerate(batch, start=i):
-                try:
-                    # 只在必要時滾動
-                    if idx % 3 == 0:  # 每3個產品才滾動一次
-                        self.scroll_to_element(account)
-                        time.sleep(0.1)
+                for idx, account in enumerate(batch, start=i):
+                    try:
+                        # 只在必要時滾動
+                        if idx % 3 == 0:  # 每3個產品才滾動一次
+                            with self.perf.stage("scroll_into_view"):
+                                self.scroll_to_element(account)
+                                time.sleep(0.1)
 
-                    # 使用優化的資料提取方法
-                    account_data = self.extract_account_data(account, idx + 1)
-                    accounts_data.append(account_data)
+                        # 使用優化的資料提取方法
+                        account_data = self.extract_cached(account, idx + 1, self.extract_account_data)
+                        accounts_data.append(account_data)
                     
-                except Exception as e:
-                    print(f"處理第 {idx+1} 個證券開戶產品時發生錯誤: {str(e)}")
-                    continue
+                    except Exception as e:
+                        print(f"處理第 {idx+1} 個證券開戶產品時發生錯誤: {str(e)}")
+                        continue
 
         return accounts_data
 
+    @classmethod
+    def parse_snapshot(cls, html, base_url=None):
+        """從頁面 HTML 離線提取證券開戶產品資料"""
+        data = extract_products(
+            html, cls.CARD_CONTAINER_SELECTORS, extract_account_info, cls.extraction_selectors(), base_url or cls.URL
+        )
+        print(f"從 HTML 解析出 {len(data)} 筆證券開戶產品資料")
+        return data
+
+    @classmethod
+    def extraction_selectors(cls):
+        """合併所有欄位選擇器，供 js 與 snapshot 模式使用"""
+        return dict(
+            cls.SELECTORS,
+            broker_label=cls.BROKER_LABEL_SELECTORS,
+            broker_value=cls.BROKER_VALUE_SELECTORS,
+            fee_selectors=cls.FEE_SELECTORS,
+            promotion_selectors=cls.PROMOTION_SELECTORS,
+        )
+
+    def extract_accounts_js(self):
+        """以單次 execute_script 提取整頁證券開戶產品資料"""
+        try:
+            accounts_data = run_extraction_script(
+                self.driver, ACCOUNT_JS, self.CARD_CONTAINER_SELECTORS, self.extraction_selectors()
+            )
+        except Exception as e:
+            print(f"執行 JS 擷取時發生錯誤: {e}")
+            return []
+
+        print(f"找到 {len(accounts_data)} 個證券開戶產品")
+        if len(accounts_data) == 0:
+            print("警告：未找到任何證券開戶產品")
+        return accounts_data
+
     def extract_account_data(self, account, idx):
         """提取單個證券開戶產品資料 - 優化版本"""
-        # 使用更簡潔的選擇器策略
-        selectors = {
-            'account_name': ["h3[data-testid='product-title']", "h3", ".font-bold"],
-            'broker_info': ["div[data-testid='product-content'] > div.border-l", ".border-l"],
-            'highlights': ["div[data-testid^='product-highlight-']", ".highlight"],
-            'activity': ["div[data-testid='product-activity']", ".activity-info"],
-            'tags': ["div[data-testid='product-taxonomy'] div.whitespace-nowrap.rounded-full", ".tag"],
-            'banner': ["div[data-testid='product-banner'] img", ".banner img"],
-            'apply_button': ["div[data-testid='product-apply-cta']", ".apply-btn"],
-            'detail_link': ["a[data-testid='product-detail']", "a[href*='securities']"],
-            'fees': [".fee-info", ".commission-info"],
-            'promotions': [".promotion", ".offer"]
-        }
-        
+        selectors = self.SELECTORS
+
         # 1. 券商/開戶名稱
         account_name = self.safe_find_text(account, selectors['account_name'], f"未知證券開戶產品 {idx}")
         
@@ -135,74 +216,18 @@ class AccountCrawler(BaseCrawler):
             "詳細頁連結": detail_link,
         }
 
-    def safe_find_text(self, element, selectors, default=""):
-        """安全地尋找文字內容"""
-        for selector in selectors:
-            try:
-                found = element.find_element(By.CSS_SELECTOR, selector)
-                text = found.text.strip()
-                if text:
-                    return text
-            except:
-                continue
-        return default
-
-    def safe_find_multiple_text(self, element, selectors):
-        """安全地尋找多個文字內容"""
-        for selector in selectors:
-            try:
-                elements = element.find_elements(By.CSS_SELECTOR, selector)
-                texts = [elem.text.strip() for elem in elements if elem.text.strip()]
-                if texts:
-                    return texts
-            except:
-                continue
-        return []
-
-    def safe_find_attribute(self, element, selectors, attribute, default=""):
-        """安全地尋找屬性值"""
-        for selector in selectors:
-            try:
-                found = element.find_element(By.CSS_SELECTOR, selector)
-                attr_value = found.get_attribute(attribute)
-                if attr_value:
-                    return attr_value
-            except:
-                continue
-        return default
-
     def extract_broker_info(self, account, selectors):
         """提取券商基本資訊 - 優化版"""
+        from selenium.webdriver.common.by import By
         broker_info = {}
         try:
             info_blocks = account.find_elements(By.CSS_SELECTOR, selectors[0])
             for block in info_blocks[:6]:  # 限制處理前6個，避免過度處理
                 try:
-                    # 嘗試不同的標籤結構
-                    label_selectors = ["p.text-xs", ".label", ".info-label"]
-                    value_selectors = ["p.font-bold", ".value", ".info-value", "p.b1-bold"]
-                    
-                    label = ""
-                    value = ""
-                    
-                    for label_sel in label_selectors:
-                        try:
-                            label_elem = block.find_element(By.CSS_SELECTOR, label_sel)
-                            label = label_elem.text.strip()
-                            if label:
-                                break
-                        except:
-                            continue
-                    
-                    for value_sel in value_selectors:
-                        try:
-                            value_elem = block.find_element(By.CSS_SELECTOR, value_sel)
-                            value = value_elem.text.strip()
-                            if value:
-                                break
-                        except:
-                            continue
-                    
+                    # 依序嘗試不同的標籤結構（選擇器計畫只略過整頁不存在或不合法的選擇器）
+                    label = self.safe_find_text(block, self.BROKER_LABEL_SELECTORS, "")
+                    value = self.safe_find_text(block, self.BROKER_VALUE_SELECTORS, "")
+
                     if label and value:
                         broker_info[label] = value
                 except:
@@ -215,17 +240,9 @@ class AccountCrawler(BaseCrawler):
         """提取手續費資訊"""
         fee_info = {}
         try:
-            # 尋找手續費相關資訊
-            fee_selectors = [
-                ".fee", ".commission", ".cost",
-                "[class*='fee']", "[class*='commission']",
-                "div:contains('手續費')", "div:contains('折')",
-                "p:contains('%')", "span:contains('折')"
-            ]
-            
-            for selector in fee_selectors:
+            # 尋找手續費相關資訊（不合法的選擇器第一次失敗後整頁略過）
+            for selector, elements in self.find_all_valid(account, self.FEE_SELECTORS):
                 try:
-                    elements = account.find_elements(By.CSS_SELECTOR, selector)
                     for elem in elements[:3]:  # 限制處理數量
                         text = elem.text.strip()
                         if any(keyword in text for keyword in ['手續費', '折', '%', '優惠', '免費']):
@@ -246,16 +263,8 @@ class AccountCrawler(BaseCrawler):
         """提取優惠活動資訊"""
         promotions = []
         try:
-            promotion_selectors = [
-                ".promotion", ".offer", ".deal",
-                "[class*='promo']", "[class*='offer']",
-                "div:contains('優惠')", "div:contains('活動')",
-                "div:contains('限時')", "div:contains('贈')"
-            ]
-            
-            for selector in promotion_selectors:
+            for selector, elements in self.find_all_valid(account, self.PROMOTION_SELECTORS):
                 try:
-                    elements = account.find_elements(By.CSS_SELECTOR, selector)
                     for elem in elements[:5]:  # 限制處理數量
                         text = elem.text.strip()
                         if text and len(text) > 3:
@@ -270,6 +279,7 @@ class AccountCrawler(BaseCrawler):
 
     def extract_banner_info(self, account, selectors):
         """提取廣告橫幅資訊 - 優化版"""
+        from selenium.webdriver.common.by import By
         try:
             for selector in selectors:
                 banner_elements = account.find_elements(By.CSS_SELECTOR, selector)
@@ -327,3 +337,10 @@ class AccountCrawler(BaseCrawler):
             records.append(record)
         
         return records
+
+
+class AsyncAccountCrawler(AsyncBaseCrawler):
+    """證券開戶的非同步版本，與 AccountCrawler 共用選擇器與提取邏輯"""
+    CRAWLER_CLASS = AccountCrawler
+    EXTRACTION_SCRIPT = ACCOUNT_JS
+    OUTPUT_SUBDIR = "securities_accounts"
@@ -0,0 +1,164 @@
+"""
+以 Chrome DevTools Protocol 驅動的非同步爬蟲基底類別。
+
+同步的 BaseCrawler 一個行程一次只能操作一個頁面；這裡透過 Playwright 的
+async API，在同一個事件迴圈中同時操作多個分頁。欄位提取沿用同步爬蟲的
+選擇器表與 JS 擷取腳本（或 snapshot 模式的 HTML 解析），輸出格式一致。
+"""
+import os
+import time
+from datetime import datetime
+
+from .base_crawler import BaseCrawler
+from ..utils.browser import (LEAN_WINDOW_SIZE, PAGE_METRICS_JS, format_page_metrics, resolve_profile,
+                             should_block_request)
+from ..utils.js_extractor import as_page_function
+from ..utils.perf import build_run_report, write_perf_report
+from ..utils.scroll_loader import load_all_cards_async
+
+
+class AsyncBaseCrawler(BaseCrawler):
+    # js: 於頁面內以單次 evaluate 提取；snapshot: 取 HTML 後離線解析
+    EXTRACTION_MODES = ("js", "snapshot")
+
+    # 子類別覆寫：對應的同步爬蟲（共用網址與選擇器）、擷取腳本與輸出子目錄
+    CRAWLER_CLASS = None
+    EXTRACTION_SCRIPT = None
+    OUTPUT_SUBDIR = None
+    WAIT_TIMEOUT = 10  # 等待第一張卡片出現的秒數
+
+    def __init__(self, context, extraction_mode="js", incremental=False):
+        super().__init__(extraction_mode, incremental=incremental)
+        self.NAME_FIELD = self.CRAWLER_CLASS.NAME_FIELD
+        self.VOLATILE_FIELDS = self.CRAWLER_CLASS.VOLATILE_FIELDS
+        self.PRODUCT_TYPE = self.CRAWLER_CLASS.PRODUCT_TYPE
+        self.context = context
+        self.url = self.CRAWLER_CLASS.URL
+        self.output_dir = os.path.join(self.base_output_dir, self.OUTPUT_SUBDIR)
+        os.makedirs(self.output_dir, exist_ok=True)
+
+    async def crawl(self):
+        """開新分頁抓取產品列表，完成後關閉分頁"""
+        container_selectors = self.CRAWLER_CLASS.CARD_CONTAINER_SELECTORS
+        card_selector = ", ".join(container_selectors)
+        page = await self.context.new_page()
+        try:
+            try:
+                with self.perf.stage("navigation"):
+                    await page.goto(self.url)
+                    await page.wait_for_selector(card_selector, timeout=self.WAIT_TIMEOUT * 1000)
+            except Exception as e:
+                print(f"導向頁面時出錯: {e}")
+                return []
+
+            with self.perf.stage("scroll"):
+                self.scroll_stats = await load_all_cards_async(page, card_selector)
+            await self.record_page_metrics_async(page)
+
+            with self.perf.stage("extract_page"):
+                if self.extraction_mode == "snapshot":
+                    html = await page.content()
+                    data = self.CRAWLER_CLASS.parse_snapshot(html, page.url)
+                else:
+                    data = await page.evaluate(
+                        as_page_function(self.EXTRACTION_SCRIPT),
+                        [list(container_selectors), self.CRAWLER_CLASS.extraction_selectors()],
+                    )
+                    print(f"{self.url} 找到 {len(data)} 筆資料")
+            data = data or []
+            self.perf.items += len(data)
+            return data
+        finally:
+            await page.close()
+
+    async def record_page_metrics_async(self, page):
+        try:
+            self.page_metrics = await page.evaluate(as_page_function(PAGE_METRICS_JS)) or {}
+        except Exception as e:
+            print(f"取得頁面載入資訊時發生錯誤: {e}")
+            self.page_metrics = {}
+        self.perf.page_metrics = self.page_metrics
+        if self.page_metrics:
+            print(format_page_metrics(self.page_metrics))
+        return self.page_metrics
+
+    def flatten_data_for_excel(self, data):
+        """沿用同步爬蟲的平坦化邏輯"""
+        return self.CRAWLER_CLASS.flatten_data_for_excel(self, data)
+
+    def close(self):
+        """分頁在 crawl() 結束時已關閉，瀏覽器由 crawl_concurrently 管理"""
+
+
+async def block_requests(route):
+    """lean 設定檔的請求攔截：圖片、字型、媒體與分析/廣告網域直接中止"""
+    request = route.request
+    if should_block_request(request.url, request.resource_type):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+async def crawl_concurrently(crawler_classes, extraction_mode="js", headless=None,
+                             cdp_endpoint=None, save=True, profile=None, incremental=False):
+    """
+    在同一個瀏覽器中以多個分頁同時執行多個非同步爬蟲。
+
+    cdp_endpoint 指定時連線到既有的 Chrome（例如 http://localhost:9222），
+    否則啟動新的 Chromium。profile 為 lean（預設）時縮小視窗並攔截
+    不需要的請求；incremental 與同步 orchestrator 相同，只輸出變動的產品。
+    回傳 {爬蟲類別名稱: 資料列表或例外}。
+    """
+    import asyncio
+    from playwright.async_api import async_playwright
+
+    if not crawler_classes:
+        return {}
+
+    profile, headless = resolve_profile(profile, headless)
+    async with async_playwright() as playwright:
+        if cdp_endpoint:
+            browser = await playwright.chromium.connect_over_cdp(cdp_endpoint)
+        else:
+            browser = await playwright.chromium.launch(headless=headless)
+        if profile == "lean":
+            width, height = LEAN_WINDOW_SIZE
+            context = await browser.new_context(viewport={"width": width, "height": height})
+            await context.route("**/*", block_requests)
+        else:
+            context = await browser.new_context()
+        crawlers = []
+        try:
+            crawlers = [cls(context, extraction_mode, incremental=incremental) for cls in crawler_classes]
+
+            async def run(crawler):
+                start = time.perf_counter()
+                data = await crawler.crawl()
+                print(f"[{type(crawler).__name__}] {len(data)} 筆資料，耗時 {time.perf_counter() - start:.1f}s")
+                if save:
+                    # 檔案與 SQLite 寫入會阻塞，移到執行緒中以免拖慢其他分頁的爬取
+                    await asyncio.to_thread(crawler.save_to_file, data)
+                return data
+
+            started_at = datetime.now().isoformat(timespec="seconds")
+            started = time.perf_counter()
+            results = await asyncio.gather(*(run(c) for c in crawlers), return_exceptions=True)
+        finally:
+            await context.close()
+            await browser.close()
+
+    if save:
+        entries = [{"category": type(c).__name__, "perf": c.perf.report()} for c in crawlers]
+        report = build_run_report(entries, [c.perf for c in crawlers], started_at,
+                                  time.perf_counter() - started, {"options": {"profile": profile}})
+        path = write_perf_report(report, os.path.join(crawlers[0].base_output_dir, "perf"))
+        print(f"已儲存效能報告到 {path}")
+
+    return {type(c).__name__: result for c, result in zip(crawlers, results)}
+
+
+def run_async_crawl(crawler_classes, **kwargs):
+    """同步呼叫入口"""
+    import asyncio
+
+    return asyncio.run(crawl_concurrently(crawler_classes, **kwargs))
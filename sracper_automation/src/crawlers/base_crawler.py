@@ -1,17 +1,108 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 import os
+import threading
 import time
-import json
-import pandas as pd
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
+from ..utils.browser import (build_chrome_options, resolve_profile, apply_request_blocking,
+                             page_load_metrics, format_page_metrics)
+from ..utils.driver_resolver import resolve_chromedriver
+from ..utils.html_parser import load_html_fixture
+from ..utils.incremental import IncrementalStore, hash_text
+from ..utils.journal import CrawlJournal, JOURNAL_FILE
+from ..utils.perf import PerfRecorder
+from ..utils.product_store import ProductStore
+from ..utils.scroll_loader import load_all_cards
+from ..utils.selector_plan import SelectorPlan
+from ..utils.sinks import open_sinks, write_records
+
+
+class CrawlCancelled(Exception):
+    """爬取已被取消（例如類別逾時），由 check_cancelled() 丟出"""
+
 
 class BaseCrawler:
-    def __init__(self):
+    # element: 逐張卡片以 WebDriver 查詢；js: 每頁一次 execute_script 取回所有卡片
+    # snapshot: 載入完成後取一次 page_source、立即釋放瀏覽器，再離線解析 HTML
+    EXTRACTION_MODES = ("element", "js", "snapshot")
+
+    # 子類別覆寫為產品列表頁網址
+    URL = None
+
+    # 子類別覆寫為產品卡片容器選擇器（依序嘗試）與欄位選擇器
+    CARD_CONTAINER_SELECTORS = []
+    SELECTORS = {}
+
+    # 增量模式下的產品名稱欄位，以及每次都會變動、不算內容變更的欄位路徑
+    NAME_FIELD = None
+    VOLATILE_FIELDS = ()
+    # 卡片中內容每次都會變動的節點（例如倒數計時），計算 HTML 指紋前先移除
+    VOLATILE_SELECTORS = ()
+
+    # 產品歷史資料庫中的資料表（見 utils/product_store.py）
+    PRODUCT_TYPE = None
+
+    # 導航與等待元素時的隱式等待秒數；element 模式逐張提取期間改為 0
+    IMPLICIT_WAIT = 10
+
+    # save_to_file 預設的輸出格式
+    OUTPUT_FORMATS = ("json", "xlsx")
+
+    # 日誌中識別卡片的鍵：詳細頁連結與標題（不含倒數計時等每秒變動的內容），
+    # 每頁以一次 execute_script 取得所有卡片的鍵
+    JOURNAL_KEYS_JS = (
+        "return arguments[0].map(function (el) {"
+        " var a = el.querySelector('a[href]'), h = el.querySelector('h1, h2, h3, h4, h5, h6');"
+        " return (a ? a.href : '') + '|' + (h ? h.textContent.trim() : ''); });"
+    )
+
+    # 增量模式的 HTML 指紋：每頁一次取回所有卡片移除 VOLATILE_SELECTORS 後的 HTML
+    STABLE_HTML_JS = (
+        "var volatile = arguments[1]; return arguments[0].map(function (el) {"
+        " var copy = el.cloneNode(true);"
+        " volatile.forEach(function (selector) {"
+        " copy.querySelectorAll(selector).forEach(function (node) { node.remove(); }); });"
+        " return copy.outerHTML; });"
+    )
+
+    # 選擇器計畫的整頁檢查：每個選擇器是否有符合的元素，不合法的選擇器回傳 null
+    SELECTOR_PROBE_JS = (
+        "return arguments[0].map(function (selector) {"
+        " try { return document.querySelector(selector) !== null; } catch (e) { return null; } });"
+    )
+
+    def __init__(self, extraction_mode="element", driver_pool=None, incremental=False, resume=False,
+                 browser_profile=None):
+        if extraction_mode not in self.EXTRACTION_MODES:
+            raise ValueError(f"不支援的擷取模式: {extraction_mode}")
+        self.extraction_mode = extraction_mode
+        # 增量模式：只輸出新增/移除/變更的產品，並維護最新快照
+        self.incremental = incremental
+        self._incremental_store = None
+        self.reused_count = 0  # 因 HTML 未變而略過提取的卡片數
+        # resume 模式：沿用上次中斷時日誌中已完成的卡片
+        self.resume = resume
+        self._journal = None
+        self._journal_keys = {}  # 本頁卡片的 element id -> 日誌鍵
+        self._html_hashes = {}  # 增量模式下本頁卡片的 element id -> HTML 指紋
+        self.resumed_count = 0
+        # 每次存檔時一併寫入產品歷史資料庫；可由呼叫端指定共用的 ProductStore
+        self.product_store = None
+        # save_to_file 的輸出格式（見 utils/sinks.py）與最近一次寫出的筆數
+        self.output_formats = list(self.OUTPUT_FORMATS)
+        self.saved_count = 0
+        # 有連線池時向連線池借用 WebDriver，close() 時歸還而不是關閉
+        self.driver_pool = driver_pool
         self.driver = None
+        # 瀏覽器設定檔（lean / full，見 utils/browser.py），None 時使用設定值
+        self.browser_profile = browser_profile
+        self.page_metrics = {}  # 最近一次載入列表頁的載入時間與傳輸量
+        # 各階段耗時與 WebDriver 指令數（見 utils/perf.py）
+        self.perf = PerfRecorder(type(self).__name__)
+        self.scroll_stats = []  # 每次捲動新增的卡片數
+        self.selector_plan = SelectorPlan()
+        # 協作式取消旗標：orchestrator 逾時時設定，爬蟲在捲動步驟與卡片批次之間檢查
+        self.cancelled = threading.Event()
         # 建立輸出目錄基本路徑
         project_root  = Path(__file__).resolve().parent.parent
         self.base_output_dir = project_root / "output"
@@ -20,19 +111,29 @@ class BaseCrawler:
     def initialize_driver(self):
         """Initialize the web driver."""
         try:
+            if self.driver_pool is not None:
+                self.driver = self.driver_pool.acquire()
+                self.perf.attach(self.driver)
+                self.driver.implicitly_wait(self.IMPLICIT_WAIT)
+                print("已從連線池取得 WebDriver")
+                return True
+
+            from selenium import webdriver
+            from selenium.webdriver.chrome.service import Service
+
             # 設定 Chrome 選項
-            options = Options()
-            # options.add_argument('--headless')  # 無頭模式
-            options.add_argument("--no-sandbox")
-            options.add_argument("--disable-dev-shm-usage")
-            options.add_argument("--window-size=1920,1080")
+            profile, headless = resolve_profile(self.browser_profile)
+            options = build_chrome_options(headless, profile)
             
-            # 初始化 WebDriver
+            # 初始化 WebDriver（chromedriver 路徑來自本機快取，不必每次查詢版本）
             self.driver = webdriver.Chrome(
-                service=Service(ChromeDriverManager().install()),
+                service=Service(resolve_chromedriver()),
                 options=options
             )
-            self.driver.implicitly_wait(10)  # 設定隱式等待時間
+            self.perf.attach(self.driver)
+            if profile == "lean":
+                apply_request_blocking(self.driver)
+            self.driver.implicitly_wait(self.IMPLICIT_WAIT)  # 設定隱式等待時間
             print("WebDriver 初始化成功")
             return True
         except Exception as e:
@@ -42,31 +143,33 @@ class BaseCrawler:
             return False
 
     def scroll_to_bottom(self):
-        """Scroll to the bottom of the page to load all content."""
+        """Scroll to the bottom of the page until no more product cards load."""
         if self.driver is None:
             print("WebDriver 未初始化，無法執行滾動操作")
-            return
+            return []
 
         print("滾動頁面以載入所有內容...")
-        
-        # 優化滾動策略 - 一次滾動更多距離
-        last_height = self.driver.execute_script("return document.body.scrollHeight")
-        
-        while True:
-            # 一次滾動到底部，而非逐步滾動
-            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            
-            # 減少等待時間
-            time.sleep(0.5)  # 從 1 秒減少到 0.5 秒
-            
-            new_height = self.driver.execute_script("return document.body.scrollHeight")
-            if new_height == last_height:
-                break
-            last_height = new_height
-        
-        # 滾動回頂部的時間也減少
-        self.driver.execute_script("window.scrollTo(0, 0);")
-        time.sleep(0.5)  # 從 1 秒減少到 0.5 秒
+
+        # 依卡片數量增加、DOM 變動與網路請求判斷載入完成，而非固定 sleep
+        card_selector = ", ".join(self.CARD_CONTAINER_SELECTORS) or "body *"
+        with self.perf.stage("scroll"):
+            self.scroll_stats = load_all_cards(self.driver, card_selector, should_stop=self.cancelled.is_set)
+            self.check_cancelled()
+            self.driver.execute_script("window.scrollTo(0, 0);")
+        self.record_page_metrics()
+        return self.scroll_stats
+
+    def check_cancelled(self):
+        if self.cancelled.is_set():
+            raise CrawlCancelled("爬取已取消")
+
+    def record_page_metrics(self):
+        """記錄目前頁面（含捲動載入的內容）的載入時間與傳輸量"""
+        self.page_metrics = page_load_metrics(self.driver)
+        self.perf.page_metrics = self.page_metrics
+        if self.page_metrics:
+            print(format_page_metrics(self.page_metrics))
+        return self.page_metrics
 
     def scroll_to_element(self, element):
         """滾動到特定元素使其在視窗內"""
@@ -85,8 +188,280 @@ class BaseCrawler:
         except Exception as e:
             print(f"滾動到元素時出錯: {e}")
     
+    @contextmanager
+    def extraction_session(self, elements=()):
+        """
+        element 模式逐張提取期間關閉隱式等待（選擇器未命中時立即返回，
+        而不是每次等待 IMPLICIT_WAIT 秒），並為本頁建立新的選擇器計畫。
+        傳入本頁的卡片元素時，一次取回所有卡片的日誌鍵（增量模式另取 HTML 指紋）。
+        """
+        from selenium.common.exceptions import WebDriverException
+
+        self.selector_plan = SelectorPlan(self.probe_selectors)
+        self._journal_keys = self.fetch_journal_keys(elements)
+        self._html_hashes = self.fetch_html_hashes(elements) if self.incremental else {}
+        self.driver.implicitly_wait(0)
+        try:
+            yield self.selector_plan
+        finally:
+            try:
+                self.driver.implicitly_wait(self.IMPLICIT_WAIT)
+            except WebDriverException:
+                pass
+            print(self.selector_plan.summary())
+
+    def probe_selectors(self, selectors):
+        """以一次 execute_script 檢查多個選擇器在整頁是否存在；失敗時視為全部存在"""
+        from selenium.common.exceptions import WebDriverException
+
+        try:
+            found = self.driver.execute_script(self.SELECTOR_PROBE_JS, list(selectors))
+        except WebDriverException:
+            found = None
+        return found if isinstance(found, list) and len(found) == len(selectors) else [True] * len(selectors)
+
+    def find_first(self, element, selectors, read):
+        """
+        依原順序尋找（略過選擇器計畫排除的選擇器），回傳第一個 read(元素) 為真值的結果與其選擇器；
+        都沒有時回傳 (None, None)。
+        """
+        from selenium.webdriver.common.by import By
+        from selenium.common.exceptions import InvalidSelectorException, WebDriverException
+
+        plan = self.selector_plan
+        for selector in plan.candidates(selectors):
+            try:
+                value = read(element.find_element(By.CSS_SELECTOR, selector))
+            except InvalidSelectorException:
+                plan.mark_invalid(selector)
+                continue
+            except WebDriverException:
+                continue
+            if value:
+                return value, selector
+        return None, None
+
+    def safe_find_text(self, element, selectors, default=""):
+        """安全地尋找文字內容"""
+        text, _ = self.find_first(element, selectors, lambda found: found.text.strip())
+        return text or default
+
+    def safe_find_multiple_text(self, element, selectors):
+        """安全地尋找多個文字內容"""
+        from selenium.webdriver.common.by import By
+        from selenium.common.exceptions import InvalidSelectorException, WebDriverException
+
+        plan = self.selector_plan
+        for selector in plan.candidates(selectors):
+            try:
+                elements = element.find_elements(By.CSS_SELECTOR, selector)
+                texts = [text for text in (elem.text.strip() for elem in elements) if text]
+            except InvalidSelectorException:
+                plan.mark_invalid(selector)
+                continue
+            except WebDriverException:
+                continue
+            if texts:
+                return texts
+        return []
+
+    def safe_find_attribute(self, element, selectors, attribute, default=""):
+        """安全地尋找屬性值"""
+        value, _ = self.find_first(element, selectors, lambda found: found.get_attribute(attribute))
+        return value or default
+
+    def find_all_valid(self, element, selectors):
+        """對每個選擇器回傳 (選擇器, 元素列表)，不合法的選擇器記錄後整頁略過"""
+        from selenium.webdriver.common.by import By
+        from selenium.common.exceptions import InvalidSelectorException, WebDriverException
+
+        for selector in self.selector_plan.valid(selectors):
+            try:
+                yield selector, element.find_elements(By.CSS_SELECTOR, selector)
+            except InvalidSelectorException:
+                self.selector_plan.mark_invalid(selector)
+            except WebDriverException:
+                continue
+
+    def take_snapshot(self):
+        """取得目前頁面的 HTML 後立即關閉瀏覽器，回傳 (html, url)"""
+        html = self.driver.page_source
+        url = self.driver.current_url
+        self.close()
+        return html, url
+
+    @classmethod
+    def extraction_selectors(cls):
+        """js 與 snapshot 模式使用的欄位選擇器"""
+        return cls.SELECTORS
+
+    @classmethod
+    def parse_snapshot(cls, html, base_url=None):
+        """解析整頁 HTML，子類應覆寫此方法"""
+        raise NotImplementedError
+
+    @classmethod
+    def parse_snapshot_file(cls, path, base_url=None):
+        """解析離線儲存的 .html 檔案，不需要啟動瀏覽器"""
+        return cls.parse_snapshot(load_html_fixture(path), base_url)
+
+    @property
+    def incremental_store(self):
+        if self._incremental_store is None:
+            output_dir = self.output_dir if hasattr(self, 'output_dir') else self.base_output_dir
+            self._incremental_store = IncrementalStore(
+                output_dir, self.NAME_FIELD, self.VOLATILE_FIELDS
+            )
+        return self._incremental_store
+
+    @property
+    def journal(self):
+        if self._journal is None:
+            output_dir = self.output_dir if hasattr(self, 'output_dir') else self.base_output_dir
+            self._journal = CrawlJournal(os.path.join(output_dir, JOURNAL_FILE), self.resume)
+        return self._journal
+
+    def fetch_journal_keys(self, elements):
+        """回傳 {element id: 日誌鍵}，整頁只需一次 execute_script"""
+        from selenium.common.exceptions import WebDriverException
+
+        elements = list(elements)
+        if not elements:
+            return {}
+        try:
+            keys = self.driver.execute_script(self.JOURNAL_KEYS_JS, elements)
+        except WebDriverException:
+            return {}
+        return {element.id: key for element, key in zip(elements, keys or [])}
+
+    def journal_key(self, element, idx):
+        key = self._journal_keys.get(element.id)
+        if key is None:
+            key = self.fetch_journal_keys([element]).get(element.id)
+        return key if key and key != "|" else f"#{idx}"
+
+    def fetch_html_hashes(self, elements):
+        """回傳 {element id: 移除變動節點後的 HTML 指紋}，整頁只需一次 execute_script"""
+        from selenium.common.exceptions import WebDriverException
+
+        elements = list(elements)
+        if not elements:
+            return {}
+        try:
+            htmls = self.driver.execute_script(self.STABLE_HTML_JS, elements, list(self.VOLATILE_SELECTORS))
+        except WebDriverException:
+            return {}
+        return {element.id: hash_text(html or "") for element, html in zip(elements, htmls or [])}
+
+    def refresh_volatile_fields(self, element, record):
+        """沿用上次的資料時重新讀取變動欄位（例如倒數計時），子類可覆寫"""
+        return record
+
+    def extract_cached(self, element, idx, extract_fn):
+        """
+        每完成一張卡片就寫入日誌；resume 模式下日誌已有的卡片直接沿用。
+        增量模式下，卡片 HTML 與上次相同時直接沿用上次的資料。
+        """
+        with self.perf.stage("extract"):
+            record = self._extract_cached(element, idx, extract_fn)
+        self.perf.items += 1
+        return record
+
+    def _extract_cached(self, element, idx, extract_fn):
+        key = self.journal_key(element, idx)
+        journaled = self.journal.get(key)
+        if journaled is not None:
+            self.resumed_count += 1
+            return journaled
+
+        if not self.incremental:
+            record = extract_fn(element, idx)
+            self.journal.append(key, record)
+            return record
+
+        html_hash = self._html_hashes.get(element.id)
+        if html_hash is None:
+            html_hash = self.fetch_html_hashes([element]).get(element.id, "")
+        cached = self.incremental_store.cached_record(html_hash)
+        if cached is not None:
+            self.reused_count += 1
+            self.incremental_store.remember_html(html_hash, cached)
+            cached = self.refresh_volatile_fields(element, cached)
+            self.journal.append(key, cached)
+            return cached
+
+        record = extract_fn(element, idx)
+        self.incremental_store.remember_html(html_hash, record)
+        self.journal.append(key, record)
+        return record
+
+    def finish_journal(self):
+        """最終檔案寫出後移除日誌；沒有資料或已取消時保留日誌供下次續爬"""
+        if not self.saved_count or self.cancelled.is_set():
+            if self._journal is not None:
+                self._journal.close()
+            return
+        if self._journal is not None or self.resume:
+            self.journal.finish()
+        if self.resumed_count:
+            print(f"從日誌沿用 {self.resumed_count} 筆資料")
+
+    def save_incremental(self, data):
+        """比對上次快照，寫出 delta 檔與最新快照"""
+        store = self.incremental_store
+        delta = store.apply(data)
+        snapshot_path, delta_path = store.save(delta)
+        print(
+            f"新增 {len(delta['added'])}、移除 {len(delta['removed'])}、"
+            f"變更 {len(delta['changed'])}、未變動 {delta['unchanged_count']} 筆"
+            f"（略過提取 {self.reused_count} 筆）"
+        )
+        print(f"已更新快照 {snapshot_path}")
+        if delta_path:
+            print(f"已儲存變動到 {delta_path}")
+        return snapshot_path, delta_path
+
+    def store_sink(self):
+        """產品歷史資料庫的輸出端；沒有對應資料表或資料庫無法開啟時回傳 None"""
+        if self.PRODUCT_TYPE is None:
+            return None
+        try:
+            if self.product_store is None:
+                self.product_store = ProductStore()
+            return self.product_store.writer(self.PRODUCT_TYPE)
+        except Exception as e:
+            print(f"開啟產品資料庫時發生錯誤: {e}")
+            return None
+
+    def save_to_store(self, data):
+        """將本次爬取的產品寫入歷史資料庫，回傳爬取時間"""
+        sink = self.store_sink()
+        if sink is None:
+            return None
+        if write_records(data, [sink]):
+            print(f"已寫入 {sink.count} 筆資料到 {sink.path}（{self.PRODUCT_TYPE}）")
+        return sink.crawled_at
+
+    def flatten_record(self, record):
+        """單筆資料的平坦化，供 CSV / Excel / Parquet 輸出使用"""
+        return self.flatten_data_for_excel([record])[0]
+
     def save_to_file(self, data, output_subdir=None):
-        """儲存資料到 JSON 和 Excel 檔案"""
+        """
+        將資料逐筆串流寫入各輸出格式（預設 JSON 與 Excel），並寫入產品歷史資料庫。
+        data 可以是列表或產生器，不會整份載入記憶體。回傳已寫出的檔案路徑。
+        """
+        if self.incremental and output_subdir is None:
+            # 增量比對需要完整的本次資料
+            data = list(data)
+            with self.perf.stage("write"):
+                # 先比對快照：空結果會在此拋出例外，不寫入歷史資料庫也不移除日誌
+                paths = self.save_incremental(data)
+                self.save_to_store(data)
+                self.saved_count = len(data)
+            self.finish_journal()
+            return paths
+
         # 確定輸出目錄
         if output_subdir:
             output_dir = os.path.join(self.base_output_dir, output_subdir)
@@ -98,36 +473,56 @@ class BaseCrawler:
         
         # 生成檔案名稱的時間戳部分
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        
-        # 1. 儲存為 JSON 格式
-        json_path = os.path.join(output_dir, f"data_{timestamp}.json")
-        with open(json_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=4)
-        print(f"已儲存資料到 {json_path}")
 
-        # 2. 儲存為 XLSX 格式
-        try:
-            # 將多層結構轉換為平坦結構，用於 Excel
-            records = self.flatten_data_for_excel(data)
-            
-            df = pd.DataFrame(records)
-            xlsx_path = os.path.join(output_dir, f"data_{timestamp}.xlsx")
-            df.to_excel(xlsx_path, index=False)
-            print(f"已儲存資料到 {xlsx_path}")
-        except Exception as e:
-            print(f"儲存 Excel 時發生錯誤: {e}")
-            import traceback
-            traceback.print_exc()
-        
-        return json_path, xlsx_path
+        # 巢狀資料寫入 JSON / JSONL，平坦化後寫入 CSV / Excel / Parquet
+        flatten = self.perf.timed("serialize", self.flatten_record)
+        sinks = open_sinks(output_dir, f"data_{timestamp}", self.output_formats, flatten)
+        file_sinks = list(sinks)
+        store_sink = self.store_sink() if output_subdir is None else None
+        if store_sink is not None:
+            sinks.append(self.perf.instrument_sink(store_sink, "write_store"))
+
+        for sink in file_sinks:
+            self.perf.instrument_sink(sink)
+        self.saved_count = write_records(data, sinks)
+
+        paths = tuple(sink.path for sink in file_sinks if sink in sinks)
+        for path in paths:
+            print(f"已儲存資料到 {path}")
+        if store_sink in sinks:
+            print(f"已寫入 {store_sink.count} 筆資料到 {store_sink.path}（{self.PRODUCT_TYPE}）")
+
+        self.finish_journal()
+        return paths
 
     def flatten_data_for_excel(self, data):
         """將多層結構數據轉為適合 Excel 的平坦結構"""
         # 基礎實現，子類應覆寫此方法
         return data
 
+    def abort(self):
+        """強制結束目前的瀏覽器 session（例如逾時），借用的 session 視為損壞"""
+        driver, self.driver = self.driver, None
+        if driver is None:
+            return
+        self.perf.detach()
+        try:
+            if self.driver_pool is not None:
+                self.driver_pool.release(driver, broken=True)
+            else:
+                driver.quit()
+        except Exception as e:
+            print(f"強制關閉瀏覽器時發生錯誤: {e}")
+
     def close(self):
         """Close the web driver."""
         if self.driver:
+            self.perf.detach()
+        if self.driver and self.driver_pool is not None:
+            self.driver_pool.release(self.driver)
+            self.driver = None
+            print("WebDriver 已歸還連線池")
+        elif self.driver:
             self.driver.quit()
+            self.driver = None
             print("瀏覽器已關閉")
\ No newline at end of file
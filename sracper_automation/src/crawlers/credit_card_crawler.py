@@ -1,24 +1,43 @@
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
 import time
 import os
 from .base_crawler import BaseCrawler
+from .async_base_crawler import AsyncBaseCrawler
+from ..utils.html_parser import extract_card_info, extract_products
+from ..utils.js_extractor import CREDIT_CARD_JS, run_extraction_script
 
 class CreditCardCrawler(BaseCrawler):
-    def __init__(self):
-        super().__init__()
+    URL = "https://roo.cash/creditcard"
+
+    # 卡片容器選擇器（依序嘗試）
+    CARD_CONTAINER_SELECTORS = ["div.product-card-large", "div[data-testid='product-card']"]
+
+    # 各欄位的選擇器 fallback 列表，element 與 js 模式共用
+    SELECTORS = {
+        'card_name': ["h3[data-testid='product-title']", "h3"],
+        'tags': ["div[data-testid='product-taxonomy'] div", ".whitespace-nowrap.rounded-full"],
+        'activity': ["div[data-testid='product-activity']", ".flex.flex-col.items-start.justify-between"],
+        'gifts': [".flex.min-w-\\[86px\\] p.c1-regular", ".scrollbar-hidden img"],
+        'button': ["div[data-testid='product-cta']", ".bg-NRooOrange-120"],
+        'link': ["a[data-testid='product-detail']", "a[href*='credit-card/info']"]
+    }
+
+    # 增量模式的產品識別欄位（倒數計時每次都不同，不算變更）
+    NAME_FIELD = "卡片名稱"
+    VOLATILE_FIELDS = [("首刷活動", "活動倒數")]
+    COUNTDOWN_SELECTOR = ".flex.items-center.gap-1 div.b1-bold"
+    VOLATILE_SELECTORS = [COUNTDOWN_SELECTOR]
+    PRODUCT_TYPE = "credit_cards"
+
+    def __init__(self, extraction_mode="element", driver_pool=None, incremental=False, resume=False,
+                 browser_profile=None):
+        super().__init__(extraction_mode, driver_pool, incremental, resume, browser_profile)
         
         # 初始化 WebDriver
         if not self.initialize_driver():
             raise Exception("WebDriver 初始化失敗")
         
         # 設定 URL
-        self.url = "https://roo.cash/creditcard"
+        self.url = self.URL
         
         # 設定輸出目錄
         self.output_dir = os.path.join(self.base_output_dir, "credit_cards")
@@ -26,13 +45,17 @@ class CreditCardCrawler(BaseCrawler):
 
     def crawl_credit_cards(self):
         """抓取信用卡資訊 - 優化版本"""
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
         print("正在前往信用卡頁面...")
         try:
-            self.driver.get(self.url)
-            # 使用 WebDriverWait 替代固定等待
-            WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "div.product-card-large, div[data-testid='product-card']"))
-            )
+            with self.perf.stage("navigation"):
+                self.driver.get(self.url)
+                # 使用 WebDriverWait 替代固定等待
+                WebDriverWait(self.driver, 10).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, "div.product-card-large, div[data-testid='product-card']"))
+                )
         except Exception as e:
             print(f"導向頁面時出錯: {e}")
             return []
@@ -41,11 +64,21 @@ class CreditCardCrawler(BaseCrawler):
         
         # 滾動到頁面底部確保所有卡片都載入
         self.scroll_to_bottom()
+
+        if self.extraction_mode in ("js", "snapshot"):
+            with self.perf.stage("extract_page"):
+                if self.extraction_mode == "js":
+                    data = self.extract_cards_js()
+                else:
+                    html, url = self.take_snapshot()
+                    data = self.parse_snapshot(html, url)
+            self.perf.items += len(data)
+            return data
         
         # 獲取所有卡片
-        card_elements = self.driver.find_elements(By.CSS_SELECTOR, "div.product-card-large")
+        card_elements = self.driver.find_elements(By.CSS_SELECTOR, self.CARD_CONTAINER_SELECTORS[0])
         if not card_elements:
-            card_elements = self.driver.find_elements(By.CSS_SELECTOR, "div[data-testid='product-card']")
+            card_elements = self.driver.find_elements(By.CSS_SELECTOR, self.CARD_CONTAINER_SELECTORS[1])
         
         print(f"找到 {len(card_elements)} 張信用卡")
         
@@ -54,42 +87,62 @@ class CreditCardCrawler(BaseCrawler):
             return []
 
         cards_data = []
-        
-        # 批次處理，每次處理5張卡片
-        batch_size = 5
-        for i in range(0, len(card_elements), batch_size):
-            batch = card_elements[i:i+batch_size]
-            print(f"處理第 {i+1}-{min(i+batch_size, len(card_elements))} 張信用卡...")
+
+        # 逐張提取期間不使用隱式等待，欄位選擇器每頁只解析一次
+        with self.extraction_session(card_elements):
+            # 批次處理，每次處理5張卡片
+            batch_size = 5
+            for i in range(0, len(card_elements), batch_size):
+                self.check_cancelled()  # 逾時時由 orchestrator 設定
+                batch = card_elements[i:i+batch_size]
+                print(f"處理第 {i+1}-{min(i+batch_size, len(card_elements))} 張信用卡...")
             
-            for idx, card in enumerate(batch, start=i):
-                try:
-                    # 只在必要時滾動
-                    if idx % 3 == 0:  # 每3張卡片才滾動一次
-                        self.scroll_to_element(card)
-                        time.sleep(0.1)
+                for idx, card in enumerate(batch, start=i):
+                    try:
+                        # 只在必要時滾動
+                        if idx % 3 == 0:  # 每3張卡片才滾動一次
+                            with self.perf.stage("scroll_into_view"):
+                                self.scroll_to_element(card)
+                                time.sleep(0.1)
                     
-                    # 使用優化的資料提取方法
-                    card_data = self.extract_card_data(card, idx + 1)
-                    cards_data.append(card_data)
+                        # 使用優化的資料提取方法
+                        card_data = self.extract_cached(card, idx + 1, self.extract_card_data)
+                        cards_data.append(card_data)
                     
-                except Exception as e:
-                    print(f"處理第 {idx+1} 張信用卡時發生錯誤: {str(e)}")
-                    continue
+                    except Exception as e:
+                        print(f"處理第 {idx+1} 張信用卡時發生錯誤: {str(e)}")
+                        continue
+
+        return cards_data
+
+    @classmethod
+    def parse_snapshot(cls, html, base_url=None):
+        """從頁面 HTML 離線提取信用卡資料"""
+        data = extract_products(
+            html, cls.CARD_CONTAINER_SELECTORS, extract_card_info, cls.extraction_selectors(), base_url or cls.URL
+        )
+        print(f"從 HTML 解析出 {len(data)} 筆信用卡資料")
+        return data
+
+    def extract_cards_js(self):
+        """以單次 execute_script 提取整頁信用卡資料"""
+        try:
+            cards_data = run_extraction_script(
+                self.driver, CREDIT_CARD_JS, self.CARD_CONTAINER_SELECTORS, self.extraction_selectors()
+            )
+        except Exception as e:
+            print(f"執行 JS 擷取時發生錯誤: {e}")
+            return []
 
+        print(f"找到 {len(cards_data)} 張信用卡")
+        if len(cards_data) == 0:
+            print("警告：未找到任何信用卡元素")
         return cards_data
 
     def extract_card_data(self, card, idx):
         """提取單張卡片資料 - 優化版本"""
-        # 使用更簡潔的選擇器策略
-        selectors = {
-            'card_name': ["h3[data-testid='product-title']", "h3"],
-            'tags': ["div[data-testid='product-taxonomy'] div", ".whitespace-nowrap.rounded-full"],
-            'activity': ["div[data-testid='product-activity']", ".flex.flex-col.items-start.justify-between"],
-            'gifts': [".flex.min-w-\\[86px\\] p.c1-regular", ".scrollbar-hidden img"],
-            'button': ["div[data-testid='product-cta']", ".bg-NRooOrange-120"],
-            'link': ["a[data-testid='product-detail']", "a[href*='credit-card/info']"]
-        }
-        
+        selectors = self.SELECTORS
+
         # 1. 卡片名稱
         card_name = self.safe_find_text(card, selectors['card_name'], f"未知信用卡 {idx}")
         
@@ -122,46 +175,16 @@ class CreditCardCrawler(BaseCrawler):
             "詳細頁連結": detail_link,
         }
 
-    def safe_find_text(self, element, selectors, default=""):
-        """安全地尋找文字內容"""
-        for selector in selectors:
-            try:
-                found = element.find_element(By.CSS_SELECTOR, selector)
-                text = found.text.strip()
-                if text:
-                    return text
-            except:
-                continue
-        return default
-
-    def safe_find_multiple_text(self, element, selectors):
-        """安全地尋找多個文字內容"""
-        for selector in selectors:
-            try:
-                elements = element.find_elements(By.CSS_SELECTOR, selector)
-                texts = [elem.text.strip() for elem in elements if elem.text.strip()]
-                if texts:
-                    return texts
-            except:
-                continue
-        return []
-
-    def safe_find_attribute(self, element, selectors, attribute, default=""):
-        """安全地尋找屬性值"""
-        for selector in selectors:
-            try:
-                found = element.find_element(By.CSS_SELECTOR, selector)
-                attr_value = found.get_attribute(attribute)
-                if attr_value:
-                    return attr_value
-            except:
-                continue
-        return default
+    def refresh_volatile_fields(self, card, record):
+        """沿用上次的資料時只重新讀取倒數計時"""
+        record["首刷活動"]["活動倒數"] = self.extract_countdown(card)
+        return record
 
     def extract_countdown(self, card):
         """提取倒數時間 - 簡化版"""
+        from selenium.webdriver.common.by import By
         try:
-            countdown_elements = card.find_elements(By.CSS_SELECTOR, ".flex.items-center.gap-1 div.b1-bold")
+            countdown_elements = card.find_elements(By.CSS_SELECTOR, self.COUNTDOWN_SELECTOR)
             if len(countdown_elements) >= 4:
                 countdown_parts = [elem.text for elem in countdown_elements[:4]]
                 return f"{countdown_parts[0]} 天 {countdown_parts[1]} 時 {countdown_parts[2]} 分 {countdown_parts[3]} 秒"
@@ -171,6 +194,7 @@ class CreditCardCrawler(BaseCrawler):
 
     def extract_gifts(self, card):
         """提取首刷禮 - 優化版"""
+        from selenium.webdriver.common.by import By
         gift_items = []
         
         # 嘗試文字提取
@@ -195,6 +219,7 @@ class CreditCardCrawler(BaseCrawler):
 
     def extract_rewards_simple(self, card):
         """簡化的回饋提取方法"""
+        from selenium.webdriver.common.by import By
         rewards = {}
         try:
             reward_elements = card.find_elements(By.CSS_SELECTOR, ".max-w-60.flex-1")
@@ -248,3 +273,9 @@ class CreditCardCrawler(BaseCrawler):
         
         return records
 
+
+class AsyncCreditCardCrawler(AsyncBaseCrawler):
+    """信用卡的非同步版本，與 CreditCardCrawler 共用選擇器與提取邏輯"""
+    CRAWLER_CLASS = CreditCardCrawler
+    EXTRACTION_SCRIPT = CREDIT_CARD_JS
+    OUTPUT_SUBDIR = "credit_cards"
@@ -1,24 +1,42 @@
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
 import time
 import os
 from .base_crawler import BaseCrawler
+from .async_base_crawler import AsyncBaseCrawler
+from ..utils.html_parser import extract_loan_info, extract_products
+from ..utils.js_extractor import PERSONAL_LOAN_JS, run_extraction_script
 
 class PersonalLoanCrawler(BaseCrawler):
-    def __init__(self):
-        super().__init__()
+    URL = "https://roo.cash/personal-loan"
+
+    # 產品容器選擇器
+    CARD_CONTAINER_SELECTORS = ["div[data-testid='product-card']"]
+
+    # 各欄位的選擇器 fallback 列表，element 與 js 模式共用
+    SELECTORS = {
+        'loan_name': ["h3[data-testid='product-title']", "h3"],
+        'info_blocks': ["div[data-testid='product-content'] > div.border-l"],
+        'highlights': ["div[data-testid^='product-highlight-']"],
+        'activity': ["div[data-testid='product-activity']"],
+        'tags': ["div[data-testid='product-taxonomy'] div.whitespace-nowrap.rounded-full"],
+        'banner': ["div[data-testid='product-banner'] img"],
+        'apply_button': ["div[data-testid='product-apply-cta']"],
+        'detail_link': ["a[data-testid='product-detail']"]
+    }
+
+    # 增量模式的產品識別欄位
+    NAME_FIELD = "貸款名稱"
+    PRODUCT_TYPE = "personal_loans"
+
+    def __init__(self, extraction_mode="element", driver_pool=None, incremental=False, resume=False,
+                 browser_profile=None):
+        super().__init__(extraction_mode, driver_pool, incremental, resume, browser_profile)
         
         # 初始化 WebDriver
         if not self.initialize_driver():
             raise Exception("WebDriver 初始化失敗")
             
         # 設定 URL
-        self.url = "https://roo.cash/personal-loan"
+        self.url = self.URL
         
         # 設定輸出目錄
         self.output_dir = os.path.join(self.base_output_dir, "personal_loans")
@@ -26,13 +44,17 @@ class PersonalLoanCrawler(BaseCrawler):
 
     def crawl_loans(self):
         """抓取個人貸款資訊 - 優化版本"""
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
         print("正在前往個人貸款頁面...")
         try:
-            self.driver.get(self.url)
-            # 使用 WebDriverWait 替代固定等待
-            WebDriverWait(self.driver, 3).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "div[data-testid='product-card']"))
-            )
+            with self.perf.stage("navigation"):
+                self.driver.get(self.url)
+                # 使用 WebDriverWait 替代固定等待
+                WebDriverWait(self.driver, 3).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, "div[data-testid='product-card']"))
+                )
         except Exception as e:
             print(f"導向頁面時出錯: {e}")
             return []
@@ -42,8 +64,18 @@ class PersonalLoanCrawler(BaseCrawler):
         # 滾動到頁面底部確保所有產品都載入
         self.scroll_to_bottom()
 
+        if self.extraction_mode in ("js", "snapshot"):
+            with self.perf.stage("extract_page"):
+                if self.extraction_mode == "js":
+                    data = self.extract_loans_js()
+                else:
+                    html, url = self.take_snapshot()
+                    data = self.parse_snapshot(html, url)
+            self.perf.items += len(data)
+            return data
+
         # 獲取所有貸款產品
-        loan_elements = self.driver.find_elements(By.CSS_SELECTOR, "div[data-testid='product-card']")
+        loan_elements = self.driver.find_elements(By.CSS_SELECTOR, self.CARD_CONTAINER_SELECTORS[0])
         print(f"找到 {len(loan_elements)} 個貸款產品")
         
         if len(loan_elements) == 0:
@@ -51,44 +83,62 @@ class PersonalLoanCrawler(BaseCrawler):
             return []
 
         loans_data = []
-        
-        # 批次處理，每次處理10個產品
-        batch_size = 10
-        for i in range(0, len(loan_elements), batch_size):
-            batch = loan_elements[i:i+batch_size]
-            print(f"處理第 {i+1}-{min(i+batch_size, len(loan_elements))} 個貸款產品...")
+
+        # 逐張提取期間不使用隱式等待，欄位選擇器每頁只解析一次
+        with self.extraction_session(loan_elements):
+            # 批次處理，每次處理10個產品
+            batch_size = 10
+            for i in range(0, len(loan_elements), batch_size):
+                self.check_cancelled()  # 逾時時由 orchestrator 設定
+                batch = loan_elements[i:i+batch_size]
+                print(f"處理第 {i+1}-{min(i+batch_size, len(loan_elements))} 個貸款產品...")
             
-            for idx, loan in enumerate(batch, start=i):
-                try:
-                    # 只在必要時滾動
-                    if idx % 3 == 0:  # 每3個產品才滾動一次
-                        self.scroll_to_element(loan)
-                        time.sleep(0.1)
-
-                    # 使用優化的資料提取方法
-                    loan_data = self.extract_loan_data(loan, idx + 1)
-                    loans_data.append(loan_data)
+                for idx, loan in enumerate(batch, start=i):
+                    try:
+                        # 只在必要時滾動
+                        if idx % 3 == 0:  # 每3個產品才滾動一次
+                            with self.perf.stage("scroll_into_view"):
+                                self.scroll_to_element(loan)
+                                time.sleep(0.1)
+
+                        # 使用優化的資料提取方法
+                        loan_data = self.extract_cached(loan, idx + 1, self.extract_loan_data)
+                        loans_data.append(loan_data)
                     
-                except Exception as e:
-                    print(f"處理第 {idx+1} 個貸款產品時發生錯誤: {str(e)}")
-                    continue
+                    except Exception as e:
+                        print(f"處理第 {idx+1} 個貸款產品時發生錯誤: {str(e)}")
+                        continue
+
+        return loans_data
 
+    @classmethod
+    def parse_snapshot(cls, html, base_url=None):
+        """從頁面 HTML 離線提取貸款產品資料"""
+        data = extract_products(
+            html, cls.CARD_CONTAINER_SELECTORS, extract_loan_info, cls.extraction_selectors(), base_url or cls.URL
+        )
+        print(f"從 HTML 解析出 {len(data)} 筆貸款產品資料")
+        return data
+
+    def extract_loans_js(self):
+        """以單次 execute_script 提取整頁貸款產品資料"""
+        try:
+            loans_data = run_extraction_script(
+                self.driver, PERSONAL_LOAN_JS, self.CARD_CONTAINER_SELECTORS, self.extraction_selectors()
+            )
+        except Exception as e:
+            print(f"執行 JS 擷取時發生錯誤: {e}")
+            return []
+
+        print(f"找到 {len(loans_data)} 個貸款產品")
+        if len(loans_data) == 0:
+            print("警告：未找到任何貸款產品")
         return loans_data
 
     def extract_loan_data(self, loan, idx):
         """提取單個貸款產品資料 - 優化版本"""
-        # 使用更簡潔的選擇器策略
-        selectors = {
-            'loan_name': ["h3[data-testid='product-title']", "h3"],
-            'info_blocks': ["div[data-testid='product-content'] > div.border-l"],
-            'highlights': ["div[data-testid^='product-highlight-']"],
-            'activity': ["div[data-testid='product-activity']"],
-            'tags': ["div[data-testid='product-taxonomy'] div.whitespace-nowrap.rounded-full"],
-            'banner': ["div[data-testid='product-banner'] img"],
-            'apply_button': ["div[data-testid='product-apply-cta']"],
-            'detail_link': ["a[data-testid='product-detail']"]
-        }
-        
+        selectors = self.SELECTORS
+
         # 1. 貸款名稱
         loan_name = self.safe_find_text(loan, selectors['loan_name'], f"未知貸款產品 {idx}")
         
@@ -124,44 +174,9 @@ class PersonalLoanCrawler(BaseCrawler):
             "詳細頁連結": detail_link,
         }
 
-    def safe_find_text(self, element, selectors, default=""):
-        """安全地尋找文字內容"""
-        for selector in selectors:
-            try:
-                found = element.find_element(By.CSS_SELECTOR, selector)
-                text = found.text.strip()
-                if text:
-                    return text
-            except:
-                continue
-        return default
-
-    def safe_find_multiple_text(self, element, selectors):
-        """安全地尋找多個文字內容"""
-        for selector in selectors:
-            try:
-                elements = element.find_elements(By.CSS_SELECTOR, selector)
-                texts = [elem.text.strip() for elem in elements if elem.text.strip()]
-                if texts:
-                    return texts
-            except:
-                continue
-        return []
-
-    def safe_find_attribute(self, element, selectors, attribute, default=""):
-        """安全地尋找屬性值"""
-        for selector in selectors:
-            try:
-                found = element.find_element(By.CSS_SELECTOR, selector)
-                attr_value = found.get_attribute(attribute)
-                if attr_value:
-                    return attr_value
-            except:
-                continue
-        return default
-
     def extract_loan_info(self, loan, selectors):
         """提取貸款資訊 - 優化版"""
+        from selenium.webdriver.common.by import By
         loan_info = {}
         try:
             info_blocks = loan.find_elements(By.CSS_SELECTOR, selectors[0])
@@ -183,6 +198,7 @@ class PersonalLoanCrawler(BaseCrawler):
 
     def extract_banner_info(self, loan, selectors):
         """提取廣告橫幅資訊 - 優化版"""
+        from selenium.webdriver.common.by import By
         try:
             banner_elements = loan.find_elements(By.CSS_SELECTOR, selectors[0])
             if banner_elements:
@@ -231,4 +247,11 @@ class PersonalLoanCrawler(BaseCrawler):
             
             records.append(record)
         
-        return records
\ No newline at end of file
+        return records
+
+
+class AsyncPersonalLoanCrawler(AsyncBaseCrawler):
+    """個人貸款的非同步版本，與 PersonalLoanCrawler 共用選擇器與提取邏輯"""
+    CRAWLER_CLASS = PersonalLoanCrawler
+    EXTRACTION_SCRIPT = PERSONAL_LOAN_JS
+    OUTPUT_SUBDIR = "personal_loans"
@@ -0,0 +1,268 @@
+"""
+多類別平行爬取的調度器。
+
+各產品類別（信用卡、個人貸款、證券開戶…）在執行緒池中同時執行，
+每個類別有獨立的逾時與錯誤隔離，整體耗時取決於最慢的類別而非總和。
+"""
+import argparse
+import importlib
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+from pathlib import Path
+
+from src.config.settings import CATEGORY_TIMEOUT
+from src.utils.perf import build_run_report, write_perf_report, print_stage_table
+from src.utils.sinks import SINKS
+
+# 每次執行結束時寫出效能報告 perf_<時間>.json 的目錄（見 utils/perf.py）
+PERF_REPORT_DIR = Path(__file__).resolve().parent / "output" / "perf"
+
+# 類別名稱 -> (模組路徑, 類別名稱, 爬取方法)；新增產品類別時在此註冊即可
+CATEGORIES = {
+    "credit_cards": ("src.crawlers.credit_card_crawler", "CreditCardCrawler", "crawl_credit_cards"),
+    "personal_loans": ("src.crawlers.personal_loan_crawler", "PersonalLoanCrawler", "crawl_loans"),
+    "securities_accounts": ("src.crawlers.account_crawler", "AccountCrawler", "crawl_accounts"),
+}
+
+
+def register_category(name, module_path, class_name, crawl_method):
+    """註冊新的產品類別"""
+    CATEGORIES[name] = (module_path, class_name, crawl_method)
+
+
+class CategoryRun:
+    """單一類別的執行狀態"""
+
+    def __init__(self, name):
+        self.name = name
+        self.status = "pending"  # pending / running / ok / failed / timeout
+        self.count = 0
+        self.error = ""
+        self.files = ()
+        self.started_at = None
+        self.elapsed = 0.0
+        self.crawler = None
+        self.cancelled = threading.Event()  # 逾時時設定，與爬蟲共用的取消旗標
+        self.lock = threading.Lock()  # 工作執行緒與逾時檢查之間，狀態只會轉換一次
+
+    def as_dict(self):
+        return {
+            "category": self.name,
+            "status": self.status,
+            "count": self.count,
+            "elapsed": round(self.elapsed, 2),
+            "error": self.error,
+            "files": [str(path) for path in self.files],
+            "page_metrics": getattr(self.crawler, "page_metrics", {}) or {},
+        }
+
+    def perf_report(self):
+        perf = getattr(self.crawler, "perf", None)
+        return perf.report() if perf is not None else None
+
+
+def run_category(run, extraction_mode="element", driver_pool=None, incremental=False, resume=False,
+                 output_formats=None, browser_profile=None):
+    """在工作執行緒中爬取單一類別並存檔"""
+    module_path, class_name, crawl_method = CATEGORIES[run.name]
+    run.started_at = time.monotonic()
+    run.status = "running"
+    try:
+        crawler_cls = getattr(importlib.import_module(module_path), class_name)
+        crawler = crawler_cls(
+            extraction_mode=extraction_mode, driver_pool=driver_pool,
+            incremental=incremental, resume=resume, browser_profile=browser_profile,
+        )
+        crawler.cancelled = run.cancelled
+        run.crawler = crawler
+        if run.cancelled.is_set():
+            # 等待連線池或啟動瀏覽器期間就已逾時：不再爬取，直接關閉借到的瀏覽器
+            crawler.abort()
+            return run
+        if output_formats:
+            run.crawler.output_formats = list(output_formats)
+        print(f"\n[{run.name}] 開始爬取...")
+        data = getattr(run.crawler, crawl_method)()
+        if run.cancelled.is_set():
+            return run
+        files = run.crawler.save_to_file(data)
+        with run.lock:
+            # 存檔期間可能已逾時，不覆寫逾時狀態
+            if run.status == "timeout":
+                return run
+            run.files = files
+            run.count = run.crawler.saved_count
+            run.status = "ok"
+        print(f"[{run.name}] 成功爬取 {run.count} 筆資料")
+    except Exception as e:
+        with run.lock:
+            if run.status == "timeout":
+                return run
+            run.status = "failed"
+            run.error = str(e)
+        print(f"[{run.name}] 爬蟲過程中發生錯誤: {e}")
+        traceback.print_exc()
+    finally:
+        if run.status != "timeout":
+            run.elapsed = time.monotonic() - run.started_at
+        if run.crawler is not None:
+            try:
+                run.crawler.close()
+            except Exception:
+                pass
+    return run
+
+
+def run_crawl(categories=None, workers=None, timeout=CATEGORY_TIMEOUT,
+              extraction_mode="element", use_pool=True, incremental=False, resume=False,
+              output_formats=None, browser_profile=None, perf_report_dir=PERF_REPORT_DIR,
+              driver_pool=None):
+    """
+    平行執行多個類別的爬取，回傳各類別的 CategoryRun。
+    perf_report_dir 不為 None 時，結束後將各階段耗時寫成 JSON 報告。
+    傳入 driver_pool 時沿用呼叫端的連線池（由呼叫端負責關閉），否則依 use_pool 自行建立。
+    """
+    categories = list(categories or CATEGORIES)
+    unknown = [name for name in categories if name not in CATEGORIES]
+    if unknown:
+        raise ValueError(f"未知的類別: {', '.join(unknown)}")
+
+    workers = workers or len(categories)
+    runs = {name: CategoryRun(name) for name in categories}
+    started_at = datetime.now().isoformat(timespec="seconds")
+    started = time.monotonic()
+
+    owns_pool = driver_pool is None and use_pool
+    if owns_pool:
+        from src.utils.driver_pool import DriverPool
+        driver_pool = DriverPool(size=workers, profile=browser_profile)
+
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="crawl")
+    try:
+        pending = {
+            executor.submit(
+                run_category, runs[name], extraction_mode, driver_pool, incremental, resume,
+                output_formats, browser_profile,
+            ): name
+            for name in categories
+        }
+        while pending:
+            done, _ = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.pop(future)
+
+            # 逾時的類別：強制關閉其瀏覽器並不再等待，讓其他類別不受影響
+            now = time.monotonic()
+            for future, name in list(pending.items()):
+                run = runs[name]
+                with run.lock:
+                    if run.status != "running" or now - run.started_at <= timeout:
+                        continue
+                    run.status = "timeout"
+                    run.error = f"超過 {timeout} 秒未完成"
+                    run.elapsed = now - run.started_at
+                print(f"[{name}] 逾時，強制結束")
+                # 爬蟲在下一個捲動步驟或卡片批次停止；瀏覽器立即關閉，不歸還連線池重用
+                run.cancelled.set()
+                if run.crawler is not None:
+                    run.crawler.abort()
+                pending.pop(future)
+    finally:
+        executor.shutdown(wait=False)
+        if owns_pool:
+            driver_pool.close()
+
+    results = [runs[name] for name in categories]
+    if perf_report_dir is not None:
+        save_perf_report(results, started_at, time.monotonic() - started, perf_report_dir,
+                         extraction_mode=extraction_mode, browser_profile=browser_profile)
+    return results
+
+
+def save_perf_report(runs, started_at, wall_s, output_dir=PERF_REPORT_DIR, **options):
+    """將各類別的分段計時寫成 JSON 報告，回傳檔案路徑"""
+    entries = []
+    recorders = []
+    for run in runs:
+        entry = run.as_dict()
+        entry["perf"] = run.perf_report()
+        entries.append(entry)
+        if run.crawler is not None:
+            recorders.append(run.crawler.perf)
+    report = build_run_report(entries, recorders, started_at, wall_s, {"options": options})
+    try:
+        path = write_perf_report(report, output_dir)
+    except OSError as e:
+        print(f"寫入效能報告時發生錯誤: {e}")
+        return None
+    print("\n====== 各階段耗時 ======")
+    print_stage_table(report["stages"])
+    print(f"已儲存效能報告到 {path}")
+    return path
+
+
+def print_summary(runs):
+    print("\n====== 爬取結果 ======")
+    for run in runs:
+        line = f"{run.name:<22}{run.status:<9}{run.count:>6} 筆  {run.elapsed:7.1f}s"
+        metrics = run.as_dict()["page_metrics"]
+        if metrics:
+            line += f"  載入 {metrics.get('load_ms', 0)}ms / {metrics.get('transferred_bytes', 0) / 1024:.0f}KB"
+        if run.error:
+            line += f"  {run.error}"
+        print(line)
+
+
+def exit_status(runs):
+    """全部成功回傳 0，任一類別失敗或逾時回傳 1"""
+    return 0 if all(run.status == "ok" for run in runs) else 1
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="平行爬取多個產品類別")
+    parser.add_argument("categories", nargs="*",
+                        help=f"要爬取的類別（{', '.join(CATEGORIES)}），預設為全部")
+    parser.add_argument("--workers", type=int, default=None, help="同時執行的類別數")
+    parser.add_argument("--timeout", type=float, default=CATEGORY_TIMEOUT, help="每個類別的逾時秒數")
+    parser.add_argument("--mode", default="element", choices=["element", "js", "snapshot"],
+                        help="擷取模式")
+    parser.add_argument("--no-pool", action="store_true", help="不使用 WebDriver 連線池")
+    parser.add_argument("--incremental", action="store_true",
+                        help="增量模式：只輸出變動的產品並更新 current.json 快照")
+    parser.add_argument("--resume", action="store_true",
+                        help="從上次中斷的日誌（journal.jsonl）繼續，已完成的產品不再提取")
+    parser.add_argument("--formats", default="json,xlsx",
+                        help=f"輸出格式，以逗號分隔（{', '.join(SINKS)}）")
+    parser.add_argument("--no-perf-report", action="store_true", help="不寫出效能報告")
+    parser.add_argument("--profile", default=None, choices=["lean", "full"],
+                        help="瀏覽器設定檔：lean 無頭並封鎖圖片、字型與追蹤腳本；full 完整載入（預設依設定）")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    output_formats = [fmt.strip() for fmt in args.formats.split(",") if fmt.strip()]
+    unknown = [fmt for fmt in output_formats if fmt not in SINKS]
+    if unknown:
+        parser.error(f"不支援的輸出格式: {', '.join(unknown)}")
+    try:
+        runs = run_crawl(
+            categories=args.categories,
+            workers=args.workers,
+            timeout=args.timeout,
+            extraction_mode=args.mode,
+            use_pool=not args.no_pool,
+            incremental=args.incremental,
+            resume=args.resume,
+            output_formats=output_formats,
+            browser_profile=args.profile,
+            perf_report_dir=None if args.no_perf_report else PERF_REPORT_DIR,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    print_summary(runs)
+    return exit_status(runs)
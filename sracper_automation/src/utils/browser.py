@@ -1,18 +1,117 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
+import fnmatch
+import re
 
-def initialize_web_driver(headless=False):
+from ..config.settings import BROWSER_PROFILE
+
+# selenium 與 webdriver_manager 匯入很慢，只在實際建立瀏覽器時才載入
+
+BROWSER_PROFILES = ("lean", "full")
+
+# lean 設定檔：爬蟲只讀文字與 src/alt 屬性，不需要圖片、字型與第三方追蹤腳本
+LEAN_WINDOW_SIZE = (1280, 800)
+BLOCKED_URL_PATTERNS = [
+    # 圖片與字型（img 的 src/alt 屬性仍可讀取）
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    # 分析與廣告
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*googlesyndication.com*", "*googleadservices.com*", "*adservice.google.*",
+    "*facebook.net*", "*connect.facebook.com*", "*hotjar.com*", "*clarity.ms*",
+    "*scorecardresearch.com*", "*criteo.com*", "*criteo.net*", "*taboola.com*",
+    "*outbrain.com*", "*analytics.tiktok.com*", "*bat.bing.com*", "*cdn.segment.com*",
+    "*amplitude.com*", "*mixpanel.com*", "*newrelic.com*", "*nr-data.net*",
+]
+# Playwright 以資源類型與網址規則封鎖（萬用字元轉成單一正規表示式）
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media"}
+BLOCKED_URL_RE = re.compile("|".join(fnmatch.translate(pattern) for pattern in BLOCKED_URL_PATTERNS))
+
+# 以一次 execute_script 取得頁面載入時間與傳輸量（跨網域且未提供
+# Timing-Allow-Origin 的資源 transferSize 為 0，因此傳輸量為下限）
+PAGE_METRICS_JS = r"""
+var nav = performance.getEntriesByType('navigation')[0] || {};
+var resources = performance.getEntriesByType('resource');
+var bytes = nav.transferSize || 0;
+for (var i = 0; i < resources.length; i++) bytes += resources[i].transferSize || 0;
+return {
+    "url": location.href,
+    "load_ms": Math.round((nav.loadEventEnd || nav.duration || 0)),
+    "dom_content_loaded_ms": Math.round(nav.domContentLoadedEventEnd || 0),
+    "transferred_bytes": bytes,
+    "resources": resources.length
+};
+"""
+
+
+def resolve_profile(profile=None, headless=None):
+    """回傳 (設定檔, 是否無頭)；lean 預設無頭，full 預設有頭"""
+    profile = profile or BROWSER_PROFILE
+    if profile not in BROWSER_PROFILES:
+        raise ValueError(f"不支援的瀏覽器設定檔: {profile}")
+    if headless is None:
+        headless = profile == "lean"
+    return profile, headless
+
+
+def build_chrome_options(headless=None, profile=None):
+    from selenium.webdriver.chrome.options import Options
+
+    profile, headless = resolve_profile(profile, headless)
     options = Options()
     if headless:
-        options.add_argument('--headless')
+        options.add_argument('--headless=new')
     options.add_argument("--no-sandbox")
     options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--window-size=1920,1080")
+    if profile == "lean":
+        options.add_argument("--window-size=%d,%d" % LEAN_WINDOW_SIZE)
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    else:
+        options.add_argument("--window-size=1920,1080")
+    return options
+
+
+def apply_request_blocking(driver, patterns=BLOCKED_URL_PATTERNS):
+    """透過 CDP 封鎖符合規則的請求，設定在整個 session 期間有效"""
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(patterns)})
+    except Exception as e:
+        print(f"設定請求封鎖時發生錯誤: {e}")
 
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+
+def should_block_request(url, resource_type=None):
+    return resource_type in BLOCKED_RESOURCE_TYPES or BLOCKED_URL_RE.match(url) is not None
+
+
+def page_load_metrics(driver):
+    """回傳目前頁面的載入時間與傳輸量"""
+    try:
+        return driver.execute_script(PAGE_METRICS_JS) or {}
+    except Exception as e:
+        print(f"取得頁面載入資訊時發生錯誤: {e}")
+        return {}
+
+
+def format_page_metrics(metrics):
+    return (f"頁面載入 {metrics.get('load_ms', 0)} ms，傳輸 {metrics.get('transferred_bytes', 0) / 1024:.0f} KB"
+            f"（{metrics.get('resources', 0)} 個資源）")
+
+
+def initialize_web_driver(headless=None, driver_path=None, profile=None):
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+
+    profile, headless = resolve_profile(profile, headless)
+    options = build_chrome_options(headless, profile)
+    if driver_path is None:
+        from .driver_resolver import resolve_chromedriver
+        driver_path = resolve_chromedriver()
+
+    driver = webdriver.Chrome(service=Service(driver_path), options=options)
+    if profile == "lean":
+        apply_request_blocking(driver)
     return driver
 
+
 def close_web_driver(driver):
-    driver.quit()
\ No newline at end of file
+    driver.quit()
@@ -0,0 +1,54 @@
+"""統計 WebDriver 指令（對 chromedriver 的 HTTP 往返）次數"""
+from collections import Counter
+from contextlib import contextmanager
+
+
+class CommandCounter:
+    """包裝 driver.execute，記錄每種 WebDriver 指令被呼叫的次數"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.counts = Counter()
+        self._original_execute = None
+        self._wrapped_instance = False
+
+    def start(self):
+        if self._original_execute is not None:
+            return
+        # 已被其他計數器包裝時（例如效能報告與基準測試同時統計），停止時需還原該包裝
+        self._wrapped_instance = "execute" in vars(self.driver)
+        self._original_execute = self.driver.execute
+
+        def counting_execute(driver_command, params=None):
+            self.counts[driver_command] += 1
+            return self._original_execute(driver_command, params)
+
+        # WebElement 的查詢最後都會走 driver.execute，覆寫實例屬性即可攔截
+        self.driver.execute = counting_execute
+
+    def stop(self):
+        if self._original_execute is None:
+            return
+        if self._wrapped_instance:
+            self.driver.execute = self._original_execute
+        else:
+            del self.driver.execute
+        self._original_execute = None
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+    def reset(self):
+        self.counts.clear()
+
+
+@contextmanager
+def count_webdriver_commands(driver):
+    """在 with 區塊內統計 WebDriver 指令次數"""
+    counter = CommandCounter(driver)
+    counter.start()
+    try:
+        yield counter
+    finally:
+        counter.stop()
@@ -0,0 +1,139 @@
+"""
+可重複使用的 WebDriver 連線池。
+
+每個 worker 只需要付一次 Chrome 啟動成本：爬蟲向連線池借用 session，
+用完歸還；連線池負責健康檢查、在使用 N 頁後或當機時回收重建。
+"""
+import queue
+import threading
+from contextlib import contextmanager
+
+from ..config.settings import DRIVER_POOL_SIZE, DRIVER_MAX_PAGES_PER_SESSION
+from .browser import initialize_web_driver, close_web_driver
+
+
+class DriverPool:
+    def __init__(self, size=DRIVER_POOL_SIZE, max_pages=DRIVER_MAX_PAGES_PER_SESSION,
+                 headless=None, driver_factory=None, profile=None):
+        if size < 1:
+            raise ValueError("連線池大小至少為 1")
+        self.size = size
+        self.max_pages = max_pages  # 0 或 None 表示不依頁數回收
+        self.headless = headless  # None 時依瀏覽器設定檔決定
+        self.profile = profile
+        self.driver_factory = driver_factory or self._create_driver
+        self._idle = queue.LifoQueue()
+        self._pages = {}  # id(driver) -> 已使用頁數
+        self._created = 0
+        self._lock = threading.Lock()
+        self._driver_path = None
+        self._closed = False
+
+    def _create_driver(self):
+        # chromedriver 路徑只解析一次，之後的 session 直接重用
+        if self._driver_path is None:
+            from .driver_resolver import resolve_chromedriver
+            self._driver_path = resolve_chromedriver()
+        return initialize_web_driver(headless=self.headless, driver_path=self._driver_path,
+                                     profile=self.profile)
+
+    def _is_healthy(self, driver):
+        try:
+            driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, driver):
+        with self._lock:
+            self._pages.pop(id(driver), None)
+            self._created -= 1
+        try:
+            close_web_driver(driver)
+        except Exception:
+            pass
+
+    def acquire(self, timeout=None):
+        """借出一個健康的 WebDriver，必要時建立新的 session"""
+        if self._closed:
+            raise RuntimeError("連線池已關閉")
+
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                driver = None
+
+            if driver is None:
+                with self._lock:
+                    can_create = self._created < self.size
+                    if can_create:
+                        self._created += 1
+                if can_create:
+                    try:
+                        driver = self.driver_factory()
+                    except Exception:
+                        with self._lock:
+                            self._created -= 1
+                        raise
+                    with self._lock:
+                        self._pages[id(driver)] = 0
+                    print(f"連線池建立新的 WebDriver ({self._created}/{self.size})")
+                    return driver
+                try:
+                    driver = self._idle.get(timeout=timeout)
+                except queue.Empty:
+                    raise TimeoutError("等待可用的 WebDriver 逾時")
+
+            if self._is_healthy(driver):
+                return driver
+            print("WebDriver 健康檢查失敗，重新建立 session")
+            self._discard(driver)
+
+    def release(self, driver, pages=1, broken=False):
+        """歸還 WebDriver；超過使用頁數或已損壞時直接回收"""
+        if driver is None:
+            return
+        with self._lock:
+            used = self._pages.get(id(driver), 0) + pages
+            self._pages[id(driver)] = used
+
+        if broken or self._closed or (self.max_pages and used >= self.max_pages):
+            self._discard(driver)
+            return
+
+        try:
+            driver.delete_all_cookies()
+            driver.get("about:blank")
+        except Exception:
+            self._discard(driver)
+            return
+        self._idle.put(driver)
+
+    @contextmanager
+    def checkout(self, pages=1, timeout=None):
+        """以 with 區塊借用 WebDriver，發生例外時視為損壞"""
+        driver = self.acquire(timeout=timeout)
+        try:
+            yield driver
+        except Exception:
+            self.release(driver, pages=pages, broken=True)
+            raise
+        else:
+            self.release(driver, pages=pages)
+
+    def close(self):
+        """關閉所有閒置的 WebDriver"""
+        self._closed = True
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(driver)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,162 @@
+"""
+chromedriver 執行檔的解析與快取。
+
+ChromeDriverManager().install() 每次都會查詢最新版本、必要時下載，
+在無法連網的主機上會直接失敗。這裡改為：
+
+1. 同一個行程內解析過就直接重用（毫秒級）
+2. 讀取快取目錄中的版本清單 manifest.json，檔案存在即使用
+3. 離線模式只在本機尋找（PATH、Selenium Manager 的快取），絕不連網
+4. 以上都沒有且允許連網時，才透過 webdriver_manager 下載到快取目錄並記錄於清單
+
+清單格式: {"default": "<版本>", "drivers": {"<版本>": "<chromedriver 路徑>"}}
+
+預先準備離線主機：
+    python -m src.utils.driver_resolver --version 124.0.6367.91   # 下載並固定版本
+    python -m src.utils.driver_resolver --register /opt/chromedriver  # 登記既有的執行檔
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import shutil
+import subprocess
+import threading
+from datetime import datetime
+
+from ..config.settings import CHROMEDRIVER_CACHE_DIR, CHROMEDRIVER_VERSION, CHROMEDRIVER_OFFLINE
+
+MANIFEST_FILE = "manifest.json"
+
+# 行程內快取：(快取目錄, 版本) -> 路徑
+_resolved = {}
+_lock = threading.Lock()
+
+
+def is_executable(path):
+    return bool(path) and os.path.isfile(path) and os.access(path, os.X_OK)
+
+
+def driver_version(path):
+    """執行 chromedriver --version 取得版本號，失敗時回傳 None"""
+    try:
+        output = subprocess.run([path, "--version"], capture_output=True, text=True, timeout=10).stdout
+    except Exception:
+        return None
+    match = re.search(r"(\d+\.\d+\.\d+\.\d+)", output)
+    return match.group(1) if match else None
+
+
+class DriverManifest:
+    def __init__(self, cache_dir=CHROMEDRIVER_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.path = os.path.join(cache_dir, MANIFEST_FILE)
+        self.data = {"default": None, "drivers": {}}
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.data.update(json.load(f))
+
+    def lookup(self, version=None):
+        """回傳清單中指定版本（預設為 default）的可執行路徑"""
+        version = version or self.data.get("default")
+        path = self.data["drivers"].get(version) if version else None
+        return path if is_executable(path) else None
+
+    def record(self, version, path, make_default=True):
+        self.data["drivers"][version] = path
+        if make_default or not self.data.get("default"):
+            self.data["default"] = version
+        self.data["updated_at"] = datetime.now().isoformat(timespec="seconds")
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+def find_local_driver(version=None):
+    """不連網尋找本機已有的 chromedriver：PATH 上的執行檔或 Selenium Manager 的快取"""
+    candidates = [shutil.which("chromedriver")]
+    pattern = os.path.join(os.path.expanduser("~"), ".cache", "selenium", "chromedriver", "*", "*", "chromedriver*")
+    candidates += sorted(glob.glob(pattern), reverse=True)
+    for path in candidates:
+        if not is_executable(path):
+            continue
+        if version is None or driver_version(path) == version:
+            return path
+    return None
+
+
+def download_driver(version, cache_dir):
+    """透過 webdriver_manager 下載到快取目錄"""
+    from webdriver_manager.chrome import ChromeDriverManager
+    from webdriver_manager.core.driver_cache import DriverCacheManager
+
+    manager = ChromeDriverManager(
+        driver_version=version,
+        cache_manager=DriverCacheManager(root_dir=os.path.join(cache_dir, "wdm")),
+    )
+    return manager.install()
+
+
+def resolve_chromedriver(version=CHROMEDRIVER_VERSION, offline=CHROMEDRIVER_OFFLINE,
+                         cache_dir=CHROMEDRIVER_CACHE_DIR):
+    """回傳 chromedriver 路徑；離線模式下找不到時丟出 RuntimeError"""
+    key = (cache_dir, version)
+    path = _resolved.get(key)
+    if is_executable(path):
+        return path
+
+    with _lock:
+        # 明確指定的路徑優先
+        path = os.environ.get("CHROMEDRIVER_PATH")
+        if not is_executable(path):
+            manifest = DriverManifest(cache_dir)
+            path = manifest.lookup(version)
+            if path is None:
+                path = find_local_driver(version)
+                if path is None and offline:
+                    raise RuntimeError(
+                        f"離線模式找不到 chromedriver{' ' + version if version else ''}；"
+                        f"請先以 python -m src.utils.driver_resolver --register <路徑> 登記，"
+                        f"或設定 CHROMEDRIVER_PATH"
+                    )
+                if path is None:
+                    path = download_driver(version, cache_dir)
+                manifest.record(version or driver_version(path) or "unknown", path,
+                                make_default=version is None or manifest.data.get("default") is None)
+        _resolved[key] = path
+    return path
+
+
+def register_driver(path, cache_dir=CHROMEDRIVER_CACHE_DIR, make_default=True):
+    """將既有的 chromedriver 登記到清單（例如離線主機上手動放置的執行檔）"""
+    path = os.path.abspath(path)
+    if not is_executable(path):
+        raise ValueError(f"不是可執行檔: {path}")
+    version = driver_version(path) or "unknown"
+    DriverManifest(cache_dir).record(version, path, make_default)
+    return version
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="解析並快取 chromedriver")
+    parser.add_argument("--version", default=CHROMEDRIVER_VERSION, help="固定的 chromedriver 版本")
+    parser.add_argument("--offline", action="store_true", default=CHROMEDRIVER_OFFLINE, help="不連網")
+    parser.add_argument("--cache-dir", default=CHROMEDRIVER_CACHE_DIR)
+    parser.add_argument("--register", metavar="PATH", help="登記既有的 chromedriver 執行檔並設為預設")
+    args = parser.parse_args(argv)
+
+    if args.register:
+        version = register_driver(args.register, args.cache_dir)
+        print(f"已登記 chromedriver {version}: {os.path.abspath(args.register)}")
+        return 0
+
+    path = resolve_chromedriver(args.version, args.offline, args.cache_dir)
+    print(path)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
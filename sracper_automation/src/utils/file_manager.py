@@ -1,12 +1,14 @@
 import json 
-import os
-import pandas as pd
+
+# pandas 只在讀寫 Excel 時才載入
 
 def save_to_json(data, filename):
     with open(filename, 'w', encoding='utf-8') as f:
         json.dump(data, f, ensure_ascii=False, indent=4)
 
 def save_to_excel(data, filename):
+    import pandas as pd
+
     df = pd.DataFrame(data)
     df.to_excel(filename, index=False)
 
@@ -15,4 +17,6 @@ def load_from_json(filename):
         return json.load(f)
 
 def load_from_excel(filename):
+    import pandas as pd
+
     return pd.read_excel(filename)
\ No newline at end of file
@@ -1,26 +1,272 @@
-def parse_html(html_content):
-    """Parse HTML content and extract relevant information."""
+import re
+from urllib.parse import urljoin
+
+# 視為區塊元素的標籤，取文字時在前後換行，近似 Selenium .text 的呈現結果
+BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt",
+    "figcaption", "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6",
+    "header", "hr", "li", "main", "nav", "ol", "p", "section", "table", "tr", "ul",
+}
+
+# 不會呈現在畫面上的標籤
+HIDDEN_TAGS = {"script", "style", "noscript", "template", "head"}
+
+# 屬性值為網址時，比照瀏覽器 property 轉成絕對網址
+URL_ATTRIBUTES = {"href", "src"}
+
+
+def make_soup(html_content):
+    """建立 BeautifulSoup 物件，有 lxml 時優先使用"""
     from bs4 import BeautifulSoup
 
-    soup = BeautifulSoup(html_content, 'html.parser')
+    try:
+        return BeautifulSoup(html_content, 'lxml')
+    except Exception:
+        return BeautifulSoup(html_content, 'html.parser')
+
+
+def load_html_fixture(path):
+    """讀取離線儲存的 .html 檔案"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def parse_html(html_content):
+    """Parse HTML content and extract relevant information."""
+    soup = make_soup(html_content)
     data = {}
 
     # Example of extracting specific data
     data['title'] = soup.title.string if soup.title else 'No title found'
     data['headings'] = [h.get_text() for h in soup.find_all(['h1', 'h2', 'h3'])]
-    
+
     return data
 
-def extract_card_info(card_element):
+
+def element_text(element):
+    """取得元素的可見文字，區塊元素之間以換行分隔"""
+    from bs4 import NavigableString, Comment
+
+    parts = []
+
+    def walk(node):
+        for child in node.children:
+            if isinstance(child, Comment):
+                continue
+            if isinstance(child, NavigableString):
+                parts.append(re.sub(r"\s+", " ", str(child)))
+                continue
+            if child.name in HIDDEN_TAGS:
+                continue
+            is_block = child.name in BLOCK_TAGS
+            if is_block:
+                parts.append("\n")
+            walk(child)
+            if is_block:
+                parts.append("\n")
+
+    walk(element)
+    lines = (" ".join(line.split()) for line in "".join(parts).split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+def select(root, selector):
+    """安全地執行 CSS 查詢，不合法的選擇器回傳空列表"""
+    # 瀏覽器不支援 :contains，為了與線上結果一致直接略過
+    if ":contains(" in selector:
+        return []
+    try:
+        return root.select(selector)
+    except Exception:
+        return []
+
+
+def select_one(root, selector):
+    found = select(root, selector)
+    return found[0] if found else None
+
+
+def get_attribute(element, attribute, base_url=""):
+    """取得屬性值，網址類屬性轉為絕對網址"""
+    value = element.get(attribute)
+    if isinstance(value, list):
+        value = " ".join(value)
+    if value and attribute in URL_ATTRIBUTES and base_url:
+        value = urljoin(base_url, value)
+    return value or ""
+
+
+def safe_find_text(element, selectors, default=""):
+    """安全地尋找文字內容"""
+    for selector in selectors:
+        found = select_one(element, selector)
+        if found is not None:
+            text = element_text(found)
+            if text:
+                return text
+    return default
+
+
+def safe_find_multiple_text(element, selectors):
+    """安全地尋找多個文字內容"""
+    for selector in selectors:
+        texts = [element_text(elem) for elem in select(element, selector)]
+        texts = [text for text in texts if text]
+        if texts:
+            return texts
+    return []
+
+
+def safe_find_attribute(element, selectors, attribute, default="", base_url=""):
+    """安全地尋找屬性值"""
+    for selector in selectors:
+        found = select_one(element, selector)
+        if found is not None:
+            attr_value = get_attribute(found, attribute, base_url)
+            if attr_value:
+                return attr_value
+    return default
+
+
+def find_containers(soup, container_selectors):
+    """依序嘗試容器選擇器，回傳第一組找到的產品卡片"""
+    for selector in container_selectors:
+        found = select(soup, selector)
+        if found:
+            return found
+    return []
+
+
+def extract_banner(element, selectors, base_url=""):
+    """提取廣告橫幅資訊"""
+    for selector in selectors:
+        banners = select(element, selector)
+        if banners:
+            return {
+                "url": get_attribute(banners[0], "src", base_url),
+                "alt": get_attribute(banners[0], "alt"),
+            }
+    return {"url": "", "alt": ""}
+
+
+def extract_card_info(card_element, idx, selectors, base_url=""):
     """Extract information from a credit card HTML element."""
-    card_info = {}
-    card_info['name'] = card_element.find('h3').get_text(strip=True)
-    card_info['details'] = card_element.find('p', class_='details').get_text(strip=True)
-    return card_info
+    countdown = ""
+    countdown_elements = select(card_element, ".flex.items-center.gap-1 div.b1-bold")
+    if len(countdown_elements) >= 4:
+        parts = [element_text(elem) for elem in countdown_elements[:4]]
+        countdown = f"{parts[0]} 天 {parts[1]} 時 {parts[2]} 分 {parts[3]} 秒"
 
-def extract_loan_info(loan_element):
+    gift_elements = select(card_element, ".flex.min-w-\\[86px\\] p.c1-regular")
+    if not gift_elements:
+        gift_elements = select(card_element, ".scrollbar-hidden .flex.min-w-\\[86px\\] p")
+    gift_items = [element_text(gift) for gift in gift_elements]
+    gift_items = [gift for gift in gift_items if gift]
+    if not gift_items:
+        gift_imgs = select(card_element, ".scrollbar-hidden img")
+        gift_items = [get_attribute(img, "alt") for img in gift_imgs if get_attribute(img, "alt")]
+
+    rewards = {}
+    for reward in select(card_element, ".max-w-60.flex-1")[:3]:
+        category = select_one(reward, "p.c1-regular")
+        value = select_one(reward, "p.b1-bold")
+        if category is not None and value is not None:
+            category, value = element_text(category), element_text(value)
+            if category and value:
+                rewards[category] = value
+            continue
+        text = element_text(reward)
+        if ":" in text or "：" in text:
+            key, value = text.replace("：", ":").split(":", 1)
+            rewards[key.strip()] = value.strip()
+
+    return {
+        "卡片名稱": safe_find_text(card_element, selectors['card_name'], f"未知信用卡 {idx}"),
+        "分類標籤": safe_find_multiple_text(card_element, selectors['tags']),
+        "首刷活動": {
+            "活動名稱": safe_find_text(card_element, selectors['activity'], ""),
+            "活動倒數": countdown,
+        },
+        "首刷禮": gift_items,
+        "卡片回饋": rewards,
+        "立即申請按鈕": safe_find_text(card_element, selectors['button'], "立即申請"),
+        "詳細頁連結": safe_find_attribute(card_element, selectors['link'], "href", "", base_url),
+    }
+
+
+def extract_loan_info(loan_element, idx, selectors, base_url=""):
     """Extract information from a loan HTML element."""
     loan_info = {}
-    loan_info['name'] = loan_element.find('h3').get_text(strip=True)
-    loan_info['interest_rate'] = loan_element.find('span', class_='interest-rate').get_text(strip=True)
-    return loan_info
\ No newline at end of file
+    for block in select(loan_element, selectors['info_blocks'][0])[:5]:
+        label = select_one(block, "p.text-xs")
+        value = select_one(block, "p.font-bold")
+        if label is None or value is None:
+            continue
+        label, value = element_text(label), element_text(value)
+        if label and value:
+            loan_info[label] = value
+
+    return {
+        "貸款名稱": safe_find_text(loan_element, selectors['loan_name'], f"未知貸款產品 {idx}"),
+        "貸款資訊": loan_info,
+        "特色亮點": safe_find_multiple_text(loan_element, selectors['highlights']),
+        "活動資訊": {"活動名稱": safe_find_text(loan_element, selectors['activity'], ""), "活動倒數": ""},
+        "分類標籤": safe_find_multiple_text(loan_element, selectors['tags']),
+        "廣告橫幅": extract_banner(loan_element, selectors['banner'][:1], base_url),
+        "操作按鈕": {"申請按鈕": safe_find_text(loan_element, selectors['apply_button'], "立即申請")},
+        "詳細頁連結": safe_find_attribute(loan_element, selectors['detail_link'], "href", "", base_url),
+    }
+
+
+def extract_account_info(account_element, idx, selectors, base_url=""):
+    """Extract information from a securities account HTML element."""
+    broker_info = {}
+    for block in select(account_element, selectors['broker_info'][0])[:6]:
+        label = safe_find_text(block, selectors['broker_label'], "")
+        value = safe_find_text(block, selectors['broker_value'], "")
+        if label and value:
+            broker_info[label] = value
+
+    fee_info = {}
+    for selector in selectors['fee_selectors']:
+        for elem in select(account_element, selector)[:3]:
+            text = element_text(elem)
+            if any(keyword in text for keyword in ['手續費', '折', '%', '優惠', '免費']):
+                if '手續費' in text:
+                    fee_info['手續費'] = text
+                elif '折' in text:
+                    fee_info['優惠折扣'] = text
+                elif '%' in text:
+                    fee_info['費率'] = text
+
+    promotions = []
+    for selector in selectors['promotion_selectors']:
+        for elem in select(account_element, selector)[:5]:
+            text = element_text(elem)
+            if text and len(text) > 3:
+                if any(keyword in text for keyword in ['優惠', '活動', '贈', '送', '免費', '限時']):
+                    if text not in promotions:
+                        promotions.append(text)
+
+    return {
+        "券商名稱": safe_find_text(account_element, selectors['account_name'], f"未知證券開戶產品 {idx}"),
+        "券商資訊": broker_info,
+        "特色亮點": safe_find_multiple_text(account_element, selectors['highlights']),
+        "手續費資訊": fee_info,
+        "優惠活動": promotions,
+        "活動資訊": {"活動名稱": safe_find_text(account_element, selectors['activity'], ""), "活動倒數": ""},
+        "分類標籤": safe_find_multiple_text(account_element, selectors['tags']),
+        "廣告橫幅": extract_banner(account_element, selectors['banner'], base_url),
+        "操作按鈕": {"開戶按鈕": safe_find_text(account_element, selectors['apply_button'], "立即開戶")},
+        "詳細頁連結": safe_find_attribute(account_element, selectors['detail_link'], "href", "", base_url),
+    }
+
+
+def extract_products(html_content, container_selectors, extract_fn, selectors, base_url=""):
+    """解析整頁 HTML，對每張產品卡片套用提取函式"""
+    soup = make_soup(html_content)
+    containers = find_containers(soup, container_selectors)
+    return [
+        extract_fn(container, idx, selectors, base_url)
+        for idx, container in enumerate(containers, start=1)
+    ]
@@ -0,0 +1,124 @@
+"""
+增量爬取：以產品識別（名稱 + 詳細頁連結）為鍵保存內容指紋，
+每次只輸出新增、移除與變更的產品（delta 檔），並維護一份壓縮後的
+最新快照 current.json，儲存量隨變動量成長，而非隨產品總數成長。
+"""
+import copy
+import hashlib
+import json
+import os
+from datetime import datetime
+
+INDEX_FILE = "fingerprints.json"
+SNAPSHOT_FILE = "current.json"
+
+
+def hash_text(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def write_json_atomic(path, data, indent=None):
+    """先寫入暫存檔再取代，避免中途中斷留下損毀的檔案"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=indent)
+    os.replace(tmp_path, path)
+
+
+class IncrementalStore:
+    def __init__(self, output_dir, name_field, volatile_fields=()):
+        self.output_dir = output_dir
+        self.name_field = name_field
+        # 每次爬取都會變動、不應視為內容變更的欄位路徑，例如 ("首刷活動", "活動倒數")
+        self.volatile_fields = volatile_fields
+        self.index_path = os.path.join(output_dir, INDEX_FILE)
+        self.snapshot_path = os.path.join(output_dir, SNAPSHOT_FILE)
+
+        self.index = {}     # key -> {"fingerprint", "html_hash", "first_seen", "last_seen"}
+        self.records = {}   # key -> 上次的產品資料
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                self.index = json.load(f)
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                for record in json.load(f):
+                    self.records[self.product_key(record)] = record
+
+        self._by_html_hash = {
+            entry["html_hash"]: key
+            for key, entry in self.index.items()
+            if entry.get("html_hash") and key in self.records
+        }
+        self._html_hashes = {}  # 本次爬取: key -> html_hash
+
+    def product_key(self, record):
+        return f"{record.get(self.name_field, '')}|{record.get('詳細頁連結', '')}"
+
+    def fingerprint(self, record):
+        stable = copy.deepcopy(record)
+        for path in self.volatile_fields:
+            node = stable
+            for part in path[:-1]:
+                node = node.get(part, {}) if isinstance(node, dict) else {}
+            if isinstance(node, dict):
+                node.pop(path[-1], None)
+        return hash_text(json.dumps(stable, ensure_ascii=False, sort_keys=True))
+
+    def cached_record(self, html_hash):
+        """卡片 HTML 與上次完全相同時回傳上次的資料，可略過逐欄提取"""
+        key = self._by_html_hash.get(html_hash)
+        return copy.deepcopy(self.records[key]) if key is not None else None
+
+    def remember_html(self, html_hash, record):
+        self._html_hashes[self.product_key(record)] = html_hash
+
+    def apply(self, records):
+        """比對本次資料與上次快照，更新索引並回傳 delta"""
+        now = datetime.now().isoformat(timespec="seconds")
+        current = {}
+        for record in records:
+            current[self.product_key(record)] = record
+        if not current:
+            # 頁面載入失敗時爬蟲會回傳空列表，不能據此把所有產品標為移除並覆寫快照
+            raise ValueError("本次沒有爬到任何產品，不更新增量快照")
+
+        added, changed = [], []
+        new_index = {}
+        for key, record in current.items():
+            fingerprint = self.fingerprint(record)
+            previous = self.index.get(key)
+            if previous is None or key not in self.records:
+                added.append(record)
+            elif previous["fingerprint"] != fingerprint:
+                changed.append({"before": self.records[key], "after": record})
+            new_index[key] = {
+                "fingerprint": fingerprint,
+                "html_hash": self._html_hashes.get(key, ""),
+                "first_seen": previous["first_seen"] if previous else now,
+                "last_seen": now,
+            }
+
+        removed = [record for key, record in self.records.items() if key not in current]
+
+        self.index = new_index
+        self.records = current
+        return {
+            "crawled_at": now,
+            "added": added,
+            "removed": removed,
+            "changed": changed,
+            "unchanged_count": len(current) - len(added) - len(changed),
+        }
+
+    def save(self, delta, timestamp=None):
+        """寫出最新快照與索引；有變動時另外寫出 delta 檔"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        write_json_atomic(self.snapshot_path, list(self.records.values()), indent=4)
+        write_json_atomic(self.index_path, self.index)
+
+        delta_path = None
+        if delta["added"] or delta["removed"] or delta["changed"]:
+            timestamp = timestamp or datetime.now().strftime('%Y%m%d_%H%M%S')
+            delta_path = os.path.join(self.output_dir, f"delta_{timestamp}.json")
+            write_json_atomic(delta_path, delta, indent=4)
+        return self.snapshot_path, delta_path
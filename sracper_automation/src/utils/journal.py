@@ -0,0 +1,79 @@
+"""
+爬取進度的預寫日誌（write-ahead journal）。
+
+每完成一筆產品就在 JSONL 檔尾追加一行 {"key", "record"} 並立即 flush，
+程式中途崩潰時最多只損失正在處理的那一筆；以 resume 模式重新執行時，
+已記錄的產品直接沿用日誌內容而不再提取。全部完成並寫出最終檔案後，
+再以 finish() 移除日誌。
+"""
+import json
+import os
+import threading
+
+JOURNAL_FILE = "journal.jsonl"
+
+
+class CrawlJournal:
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.resume = resume
+        self.entries = {}  # key -> record（同一個 key 以最後一筆為準）
+        self._lock = threading.Lock()
+        self._file = None
+
+        if resume and os.path.exists(path):
+            self.entries = self.load(path)
+            print(f"從日誌恢復 {len(self.entries)} 筆已完成的資料: {path}")
+
+    @staticmethod
+    def load(path):
+        """讀取日誌，忽略崩潰時寫到一半的最後一行"""
+        entries = {}
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                entries[entry["key"]] = entry["record"]
+        return entries
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def append(self, key, record):
+        """追加一筆已完成的資料"""
+        line = json.dumps({"key": key, "record": record}, ensure_ascii=False)
+        with self._lock:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                # 非 resume 模式從空日誌開始
+                self._file = open(self.path, "a" if self.resume else "w", encoding="utf-8")
+                if self._file.tell() and not self._ends_with_newline():
+                    self._file.write("\n")  # 與崩潰時寫到一半的行分開
+            self._file.write(line + "\n")
+            self._file.flush()
+            self.entries[key] = record
+
+    def _ends_with_newline(self):
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def finish(self):
+        """最終檔案已寫出，移除日誌"""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
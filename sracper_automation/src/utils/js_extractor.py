@@ -0,0 +1,213 @@
+"""
+在瀏覽器內一次序列化所有產品卡片的 JavaScript 擷取引擎。
+
+原本每張卡片需要十多次 find_element + .text 的 WebDriver 往返，
+這裡改成每頁只呼叫一次 execute_script，由頁面內的 JS 依照與
+Python 版本相同的選擇器 fallback 順序取出欄位，直接回傳 dict 列表。
+"""
+
+# 共用的 JS 工具函式，對應 safe_find_text / safe_find_multiple_text / safe_find_attribute
+JS_HELPERS = r"""
+function txt(el) {
+    return ((el && el.innerText) || '').trim();
+}
+function q(root, sel) {
+    try { return root.querySelector(sel); } catch (e) { return null; }
+}
+function qa(root, sel) {
+    try { return Array.prototype.slice.call(root.querySelectorAll(sel)); } catch (e) { return []; }
+}
+function attr(el, name) {
+    // 與 Selenium get_attribute 相同：優先取 property（例如絕對網址的 href），再取 attribute
+    var value = el[name];
+    if (value === undefined || value === null || typeof value === 'object') {
+        value = el.getAttribute(name);
+    }
+    return value ? String(value) : '';
+}
+function findText(root, selectors, dflt) {
+    for (var i = 0; i < selectors.length; i++) {
+        var el = q(root, selectors[i]);
+        if (el) {
+            var text = txt(el);
+            if (text) return text;
+        }
+    }
+    return dflt;
+}
+function findMultipleText(root, selectors) {
+    for (var i = 0; i < selectors.length; i++) {
+        var texts = qa(root, selectors[i]).map(txt).filter(Boolean);
+        if (texts.length) return texts;
+    }
+    return [];
+}
+function findAttribute(root, selectors, name, dflt) {
+    for (var i = 0; i < selectors.length; i++) {
+        var el = q(root, selectors[i]);
+        if (el) {
+            var value = attr(el, name);
+            if (value) return value;
+        }
+    }
+    return dflt;
+}
+function findContainers(selectors) {
+    for (var i = 0; i < selectors.length; i++) {
+        var found = qa(document, selectors[i]);
+        if (found.length) return found;
+    }
+    return [];
+}
+function firstBanner(root, selectors) {
+    for (var i = 0; i < selectors.length; i++) {
+        var banners = qa(root, selectors[i]);
+        if (banners.length) {
+            return {"url": attr(banners[0], 'src'), "alt": attr(banners[0], 'alt')};
+        }
+    }
+    return {"url": "", "alt": ""};
+}
+"""
+
+CREDIT_CARD_JS = JS_HELPERS + r"""
+var S = arguments[1];
+return findContainers(arguments[0]).map(function (card, i) {
+    var countdown = '';
+    var parts = qa(card, '.flex.items-center.gap-1 div.b1-bold');
+    if (parts.length >= 4) {
+        countdown = txt(parts[0]) + ' 天 ' + txt(parts[1]) + ' 時 ' +
+                    txt(parts[2]) + ' 分 ' + txt(parts[3]) + ' 秒';
+    }
+
+    var giftElements = qa(card, '.flex.min-w-\\[86px\\] p.c1-regular');
+    if (!giftElements.length) {
+        giftElements = qa(card, '.scrollbar-hidden .flex.min-w-\\[86px\\] p');
+    }
+    var gifts = giftElements.map(txt).filter(Boolean);
+    if (!gifts.length) {
+        gifts = qa(card, '.scrollbar-hidden img').map(function (img) {
+            return attr(img, 'alt');
+        }).filter(Boolean);
+    }
+
+    var rewards = {};
+    qa(card, '.max-w-60.flex-1').slice(0, 3).forEach(function (reward) {
+        var category = q(reward, 'p.c1-regular');
+        var value = q(reward, 'p.b1-bold');
+        if (category && value) {
+            if (txt(category) && txt(value)) rewards[txt(category)] = txt(value);
+            return;
+        }
+        var text = txt(reward).replace(/：/g, ':');
+        var pos = text.indexOf(':');
+        if (pos >= 0) rewards[text.slice(0, pos).trim()] = text.slice(pos + 1).trim();
+    });
+
+    return {
+        "卡片名稱": findText(card, S.card_name, '未知信用卡 ' + (i + 1)),
+        "分類標籤": findMultipleText(card, S.tags),
+        "首刷活動": {"活動名稱": findText(card, S.activity, ''), "活動倒數": countdown},
+        "首刷禮": gifts,
+        "卡片回饋": rewards,
+        "立即申請按鈕": findText(card, S.button, '立即申請'),
+        "詳細頁連結": findAttribute(card, S.link, 'href', '')
+    };
+});
+"""
+
+PERSONAL_LOAN_JS = JS_HELPERS + r"""
+var S = arguments[1];
+return findContainers(arguments[0]).map(function (loan, i) {
+    var loanInfo = {};
+    qa(loan, S.info_blocks[0]).slice(0, 5).forEach(function (block) {
+        var label = q(block, 'p.text-xs');
+        var value = q(block, 'p.font-bold');
+        if (label && value && txt(label) && txt(value)) loanInfo[txt(label)] = txt(value);
+    });
+
+    return {
+        "貸款名稱": findText(loan, S.loan_name, '未知貸款產品 ' + (i + 1)),
+        "貸款資訊": loanInfo,
+        "特色亮點": findMultipleText(loan, S.highlights),
+        "活動資訊": {"活動名稱": findText(loan, S.activity, ''), "活動倒數": ""},
+        "分類標籤": findMultipleText(loan, S.tags),
+        "廣告橫幅": firstBanner(loan, S.banner.slice(0, 1)),
+        "操作按鈕": {"申請按鈕": findText(loan, S.apply_button, '立即申請')},
+        "詳細頁連結": findAttribute(loan, S.detail_link, 'href', '')
+    };
+});
+"""
+
+ACCOUNT_JS = JS_HELPERS + r"""
+var S = arguments[1];
+var FEE_KEYWORDS = ['手續費', '折', '%', '優惠', '免費'];
+var PROMOTION_KEYWORDS = ['優惠', '活動', '贈', '送', '免費', '限時'];
+function hasAny(text, keywords) {
+    return keywords.some(function (k) { return text.indexOf(k) >= 0; });
+}
+return findContainers(arguments[0]).map(function (account, i) {
+    var brokerInfo = {};
+    qa(account, S.broker_info[0]).slice(0, 6).forEach(function (block) {
+        var label = findText(block, S.broker_label, '');
+        var value = findText(block, S.broker_value, '');
+        if (label && value) brokerInfo[label] = value;
+    });
+
+    var feeInfo = {};
+    S.fee_selectors.forEach(function (sel) {
+        qa(account, sel).slice(0, 3).forEach(function (el) {
+            var text = txt(el);
+            if (!hasAny(text, FEE_KEYWORDS)) return;
+            if (text.indexOf('手續費') >= 0) feeInfo['手續費'] = text;
+            else if (text.indexOf('折') >= 0) feeInfo['優惠折扣'] = text;
+            else if (text.indexOf('%') >= 0) feeInfo['費率'] = text;
+        });
+    });
+
+    var promotions = [];
+    S.promotion_selectors.forEach(function (sel) {
+        qa(account, sel).slice(0, 5).forEach(function (el) {
+            var text = txt(el);
+            if (text && text.length > 3 && hasAny(text, PROMOTION_KEYWORDS) &&
+                promotions.indexOf(text) < 0) {
+                promotions.push(text);
+            }
+        });
+    });
+
+    return {
+        "券商名稱": findText(account, S.account_name, '未知證券開戶產品 ' + (i + 1)),
+        "券商資訊": brokerInfo,
+        "特色亮點": findMultipleText(account, S.highlights),
+        "手續費資訊": feeInfo,
+        "優惠活動": promotions,
+        "活動資訊": {"活動名稱": findText(account, S.activity, ''), "活動倒數": ""},
+        "分類標籤": findMultipleText(account, S.tags),
+        "廣告橫幅": firstBanner(account, S.banner),
+        "操作按鈕": {"開戶按鈕": findText(account, S.apply_button, '立即開戶')},
+        "詳細頁連結": findAttribute(account, S.detail_link, 'href', '')
+    };
+});
+"""
+
+
+def run_extraction_script(driver, script, container_selectors, selectors):
+    """執行擷取腳本，一次取回整頁所有卡片的資料"""
+    result = driver.execute_script(script, list(container_selectors), selectors)
+    return result or []
+
+
+def as_page_function(script, is_async=False):
+    """
+    將 Selenium 風格的腳本（以 arguments 取參數、直接 return）包成
+    可給 CDP 類驅動（如 Playwright page.evaluate）使用的函式字串。
+    非同步腳本的最後一個參數為完成時呼叫的 callback。
+    """
+    if is_async:
+        return (
+            "(args) => new Promise((resolve) => { (function () {\n"
+            + script
+            + "\n}).apply(null, args.concat([resolve])); })"
+        )
+    return "(args) => (function () {\n" + script + "\n}).apply(null, args)"
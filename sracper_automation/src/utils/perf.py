@@ -0,0 +1,190 @@
+"""
+爬取流程的分段計時與效能報告。
+
+每個爬蟲持有一個 PerfRecorder，以 stage() 包住各階段：
+
+    navigation        driver.get 與等待第一張卡片
+    scroll            無限捲動載入（scroll_to_bottom）
+    scroll_into_view  element 模式中將卡片捲入視窗（含固定 sleep）
+    extract           element 模式逐張卡片提取（每張一筆樣本）
+    extract_page      js / snapshot 模式整頁提取
+    serialize         輸出前的資料平坦化
+    write             各輸出端寫入與關閉檔案
+
+每個階段記錄耗時與期間送出的 WebDriver 指令數（見 command_counter.py），
+報告包含總計、百分位數與直方圖。調度器在每次執行結束時將所有類別的報告
+寫成一個 JSON 檔，方便比對網站改版或調校前後的差異。
+"""
+import json
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+
+from .command_counter import CommandCounter
+
+# 直方圖的上界（毫秒）；超過最後一個上界的樣本歸入 ">30000"
+HISTOGRAM_BOUNDS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+COMMAND_BOUNDS = (0, 1, 2, 5, 10, 20, 50, 100)
+REPORT_VERSION = 1
+
+
+def histogram(values, bounds):
+    """回傳 {"<=上界": 次數, ">最後上界": 次數}，只列出非零的區間"""
+    buckets = {}
+    for value in values:
+        for bound in bounds:
+            if value <= bound:
+                label = f"<={bound}"
+                break
+        else:
+            label = f">{bounds[-1]}"
+        buckets[label] = buckets.get(label, 0) + 1
+    order = [f"<={bound}" for bound in bounds] + [f">{bounds[-1]}"]
+    return {label: buckets[label] for label in order if label in buckets}
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(samples):
+    """samples 為 [(毫秒, 指令數)]，回傳該階段的統計"""
+    durations = sorted(ms for ms, _ in samples)
+    commands = [count for _, count in samples]
+    total = sum(durations)
+    return {
+        "count": len(samples),
+        "total_ms": round(total, 1),
+        "mean_ms": round(total / len(samples), 2) if samples else 0.0,
+        "p50_ms": round(percentile(durations, 0.5), 2),
+        "p95_ms": round(percentile(durations, 0.95), 2),
+        "max_ms": round(durations[-1], 2) if durations else 0.0,
+        "webdriver_commands": sum(commands),
+        "histogram_ms": histogram(durations, HISTOGRAM_BOUNDS_MS),
+        "commands_histogram": histogram(commands, COMMAND_BOUNDS),
+    }
+
+
+class PerfRecorder:
+    """單一爬蟲的分段計時；附加 WebDriver 後同時統計各階段的指令數"""
+
+    def __init__(self, name):
+        self.name = name
+        self.samples = {}  # 階段 -> [(毫秒, 指令數)]
+        self.started_at = time.perf_counter()
+        self.items = 0
+        self.command_counts = Counter()  # 已 detach 的 session 累計的指令數
+        self._counter = None
+        self._lock = threading.Lock()
+
+    def attach(self, driver):
+        """開始統計此 WebDriver 的指令數（連線池借出的 session 需在歸還前 detach）"""
+        self.detach()
+        if driver is None:
+            return
+        self._counter = CommandCounter(driver)
+        self._counter.start()
+
+    def detach(self):
+        if self._counter is not None:
+            self._counter.stop()
+            self.command_counts.update(self._counter.counts)
+            self._counter = None
+
+    def counts(self):
+        counts = Counter(self.command_counts)
+        if self._counter is not None:
+            counts.update(self._counter.counts)
+        return counts
+
+    def command_total(self):
+        total = sum(self.command_counts.values())
+        return total + self._counter.total if self._counter is not None else total
+
+    def record(self, stage, elapsed_ms, commands=0):
+        with self._lock:
+            self.samples.setdefault(stage, []).append((elapsed_ms, commands))
+
+    @contextmanager
+    def stage(self, name):
+        """計時 with 區塊（發生例外時同樣記錄）"""
+        commands_before = self.command_total()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000, self.command_total() - commands_before)
+
+    def timed(self, name, func):
+        """回傳包裝後的函式，每次呼叫記錄為一筆樣本"""
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with self.stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    def instrument_sink(self, sink, stage="write"):
+        """將輸出端的 write_record / close 記錄為寫入階段"""
+        sink.write_record = self.timed(stage, sink.write_record)
+        sink.close = self.timed(stage, sink.close)
+        return sink
+
+    def report(self):
+        counts = self.counts()
+        with self._lock:
+            stages = {name: summarize(samples) for name, samples in self.samples.items()}
+        return {
+            "crawler": self.name,
+            "wall_ms": round((time.perf_counter() - self.started_at) * 1000, 1),
+            "items": self.items,
+            "webdriver_commands": sum(counts.values()),
+            "webdriver_commands_by_type": dict(counts.most_common()),
+            "stages": stages,
+        }
+
+
+def merge_stage_samples(recorders):
+    """合併多個爬蟲的同名階段，得到整次執行的直方圖"""
+    merged = {}
+    for recorder in recorders:
+        with recorder._lock:
+            for name, samples in recorder.samples.items():
+                merged.setdefault(name, []).extend(samples)
+    return {name: summarize(samples) for name, samples in merged.items()}
+
+
+def build_run_report(entries, recorders, started_at, wall_s, extra=None):
+    """entries 為各類別的摘要（含 perf 欄位），recorders 為對應的 PerfRecorder"""
+    report = {
+        "version": REPORT_VERSION,
+        "started_at": started_at,
+        "wall_s": round(wall_s, 2),
+        "categories": entries,
+        "stages": merge_stage_samples(recorders),
+    }
+    report.update(extra or {})
+    return report
+
+
+def write_perf_report(report, output_dir, basename=None):
+    """寫出 perf_<時間>.json，回傳檔案路徑"""
+    os.makedirs(output_dir, exist_ok=True)
+    basename = basename or f"perf_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    path = os.path.join(output_dir, basename)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def print_stage_table(stages):
+    print(f"{'階段':<18}{'次數':>6}{'總計(ms)':>12}{'p50':>9}{'p95':>9}{'指令數':>8}")
+    for name, stats in sorted(stages.items(), key=lambda kv: -kv[1]["total_ms"]):
+        print(f"{name:<18}{stats['count']:>6}{stats['total_ms']:>12.1f}{stats['p50_ms']:>9.1f}"
+              f"{stats['p95_ms']:>9.1f}{stats['webdriver_commands']:>8}")
@@ -0,0 +1,308 @@
+"""
+以 SQLite 保存每次爬取的產品資料與歷史。
+
+每種產品一張資料表（信用卡、個人貸款、證券開戶、部落格文章），每列是
+「某產品在某次爬取時的內容」，以 (產品識別, 爬取時間) 為主鍵並另外索引
+爬取時間，因此「最新一次爬取的所有產品」與「某產品的歷史」都只需一次
+索引查詢，不必再逐一讀取各次的 data_*.json。
+
+查詢範例：
+    python -m src.utils.product_store latest credit_cards
+    python -m src.utils.product_store history credit_cards "某某信用卡"
+    python -m src.utils.product_store import credit_cards output/credit_cards/data_*.json
+    python -m src.utils.product_store import blog_articles ../money101_cal/roocash_data/roocash_article_details.journal.jsonl
+"""
+import argparse
+import json
+import os
+import re
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from .incremental import hash_text
+from .sinks import RecordSink
+
+DEFAULT_DB_PATH = Path(__file__).resolve().parent.parent / "output" / "products.db"
+
+# 產品類別 -> (名稱欄位, 連結欄位, 不計入內容變更的欄位路徑)；產品識別為「名稱|連結」
+PRODUCT_TYPES = {
+    "credit_cards": ("卡片名稱", "詳細頁連結", [("首刷活動", "活動倒數")]),
+    "personal_loans": ("貸款名稱", "詳細頁連結", []),
+    "securities_accounts": ("券商名稱", "詳細頁連結", []),
+    "blog_articles": ("標題", "連結", []),
+}
+
+
+def product_key(product_type, record):
+    name_field, link_field, _ = PRODUCT_TYPES[product_type]
+    return f"{record.get(name_field, '')}|{record.get(link_field, '')}"
+
+
+def content_hash(product_type, record):
+    """內容指紋，略過倒數計時等每次都不同的欄位"""
+    stable = json.loads(json.dumps(record, ensure_ascii=False))
+    for path in PRODUCT_TYPES[product_type][2]:
+        node = stable
+        for part in path[:-1]:
+            node = node.get(part, {}) if isinstance(node, dict) else {}
+        if isinstance(node, dict):
+            node.pop(path[-1], None)
+    return hash_text(json.dumps(stable, ensure_ascii=False, sort_keys=True))
+
+
+class ProductStore:
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = str(path)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self.connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS crawls ("
+                " product_type TEXT NOT NULL,"
+                " crawled_at TEXT NOT NULL,"
+                " product_count INTEGER NOT NULL,"
+                " PRIMARY KEY (product_type, crawled_at))"
+            )
+            for product_type in PRODUCT_TYPES:
+                conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {product_type} ("
+                    " product_key TEXT NOT NULL,"
+                    " name TEXT NOT NULL,"
+                    " crawled_at TEXT NOT NULL,"
+                    " content_hash TEXT NOT NULL,"
+                    " data TEXT NOT NULL,"
+                    " PRIMARY KEY (product_key, crawled_at))"
+                )
+                conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_{product_type}_crawled_at"
+                    f" ON {product_type} (crawled_at)"
+                )
+                conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_{product_type}_name ON {product_type} (name)"
+                )
+
+    @contextmanager
+    def connect(self):
+        # 每次操作建立獨立連線並以單一交易提交，可在多個爬蟲執行緒中同時使用
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def table(product_type):
+        if product_type not in PRODUCT_TYPES:
+            raise ValueError(f"未知的產品類別: {product_type}")
+        return product_type
+
+    def insert(self, product_type, records, crawled_at=None):
+        """以單一交易寫入一次爬取的所有產品，回傳爬取時間"""
+        with self.writer(product_type, crawled_at) as writer:
+            for record in records:
+                writer.write(record)
+        return writer.crawled_at
+
+    def writer(self, product_type, crawled_at=None, batch_size=500):
+        """逐筆寫入的輸出端（介面與 utils/sinks.py 相同）"""
+        return StoreSink(self, product_type, crawled_at, batch_size)
+
+    def crawl_times(self, product_type):
+        with self.connect() as conn:
+            rows = conn.execute(
+                "SELECT crawled_at FROM crawls WHERE product_type = ? ORDER BY crawled_at",
+                (self.table(product_type),),
+            ).fetchall()
+        return [row["crawled_at"] for row in rows]
+
+    def snapshot(self, product_type, crawled_at=None):
+        """回傳某次爬取（預設為最新一次）的所有產品"""
+        table = self.table(product_type)
+        with self.connect() as conn:
+            if crawled_at is None:
+                row = conn.execute(
+                    "SELECT MAX(crawled_at) AS latest FROM crawls WHERE product_type = ?",
+                    (table,),
+                ).fetchone()
+                crawled_at = row["latest"]
+                if crawled_at is None:
+                    return []
+            rows = conn.execute(
+                f"SELECT data FROM {table} WHERE crawled_at = ? ORDER BY rowid", (crawled_at,)
+            ).fetchall()
+        return [json.loads(row["data"]) for row in rows]
+
+    def latest(self, product_type):
+        return self.snapshot(product_type)
+
+    def history(self, product_type, name=None, key=None, changes_only=False):
+        """
+        回傳某產品的歷次內容 [{"crawled_at", "product_key", "data"}, ...]，依時間排序。
+        changes_only 時只保留內容與前一次不同的紀錄。
+        """
+        if (name is None) == (key is None):
+            raise ValueError("name 與 key 需擇一指定")
+        table = self.table(product_type)
+        column, value = ("name", name) if key is None else ("product_key", key)
+        with self.connect() as conn:
+            rows = conn.execute(
+                f"SELECT product_key, crawled_at, content_hash, data FROM {table}"
+                f" WHERE {column} = ? ORDER BY product_key, crawled_at",
+                (value,),
+            ).fetchall()
+
+        history = []
+        last_hash = {}
+        for row in rows:
+            if changes_only and last_hash.get(row["product_key"]) == row["content_hash"]:
+                continue
+            last_hash[row["product_key"]] = row["content_hash"]
+            history.append({
+                "crawled_at": row["crawled_at"],
+                "product_key": row["product_key"],
+                "data": json.loads(row["data"]),
+            })
+        return history
+
+    def export_parquet(self, product_type, path):
+        """將整張資料表（含歷史）匯出為 Parquet，供分析工具使用"""
+        import pandas as pd
+
+        table = self.table(product_type)
+        with self.connect() as conn:
+            df = pd.read_sql_query(f"SELECT * FROM {table} ORDER BY crawled_at", conn)
+        df.to_parquet(path, index=False)
+        return path
+
+
+class StoreSink(RecordSink):
+    """在同一個交易中分批寫入一次爬取的產品，關閉時提交並記錄該次爬取，abort 時回溯"""
+
+    def __init__(self, store, product_type, crawled_at=None, batch_size=500):
+        super().__init__(store.path)
+        self.table = store.table(product_type)
+        self.product_type = product_type
+        self.crawled_at = crawled_at or datetime.now().isoformat(timespec="seconds")
+        self.batch_size = batch_size
+        self.batch = []
+        self.conn = sqlite3.connect(store.path, timeout=30)
+
+    def write_record(self, record):
+        self.batch.append((
+            product_key(self.product_type, record),
+            record.get(PRODUCT_TYPES[self.product_type][0], ""),
+            self.crawled_at,
+            content_hash(self.product_type, record),
+            json.dumps(record, ensure_ascii=False),
+        ))
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.batch:
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO {self.table}"
+                " (product_key, name, crawled_at, content_hash, data) VALUES (?, ?, ?, ?, ?)",
+                self.batch,
+            )
+            self.batch = []
+
+    def close(self):
+        if self.conn is None:
+            return
+        try:
+            if not self.count:
+                # 沒有任何產品的爬取不記錄，避免成為最新快照
+                self.conn.rollback()
+                return
+            self.flush()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO crawls (product_type, crawled_at, product_count) VALUES (?, ?, ?)",
+                (self.product_type, self.crawled_at, self.count),
+            )
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        finally:
+            self.conn.close()
+            self.conn = None
+
+    def abort(self):
+        """放棄本次爬取：回溯交易，不記錄該次爬取"""
+        if self.conn is None:
+            return
+        try:
+            self.conn.rollback()
+        finally:
+            self.conn.close()
+            self.conn = None
+
+
+def crawled_at_from_filename(path):
+    """由 data_YYYYmmdd_HHMMSS.json 檔名推得爬取時間"""
+    match = re.search(r"(\d{8}_\d{6})", os.path.basename(path))
+    if match:
+        return datetime.strptime(match.group(1), "%Y%m%d_%H%M%S").isoformat(timespec="seconds")
+    return datetime.fromtimestamp(os.path.getmtime(path)).isoformat(timespec="seconds")
+
+
+def load_records(path):
+    """讀取既有的輸出檔：JSON 陣列或 CrawlJournal 日誌（JSONL）"""
+    from .file_manager import load_from_json
+    from .journal import CrawlJournal
+
+    if not path.endswith(".jsonl"):
+        return load_from_json(path)
+    return list(CrawlJournal.load(path).values())
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="查詢或匯入產品歷史資料庫")
+    parser.add_argument("--db", default=str(DEFAULT_DB_PATH), help="資料庫路徑")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    latest = sub.add_parser("latest", help="最新一次爬取的所有產品")
+    latest.add_argument("product_type", choices=list(PRODUCT_TYPES))
+
+    history = sub.add_parser("history", help="某產品的歷次內容")
+    history.add_argument("product_type", choices=list(PRODUCT_TYPES))
+    history.add_argument("name", help="產品名稱（部落格文章為標題）")
+    history.add_argument("--changes-only", action="store_true", help="只列出內容有變動的紀錄")
+
+    load = sub.add_parser("import", help="匯入既有的 data_*.json 或 JSONL 檔")
+    load.add_argument("product_type", choices=list(PRODUCT_TYPES))
+    load.add_argument("files", nargs="+")
+
+    export = sub.add_parser("export", help="匯出為 Parquet")
+    export.add_argument("product_type", choices=list(PRODUCT_TYPES))
+    export.add_argument("path")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    store = ProductStore(args.db)
+
+    if args.command == "latest":
+        result = store.latest(args.product_type)
+    elif args.command == "history":
+        result = store.history(args.product_type, name=args.name, changes_only=args.changes_only)
+    elif args.command == "import":
+        result = {}
+        for path in sorted(args.files):
+            crawled_at = store.insert(args.product_type, load_records(path), crawled_at_from_filename(path))
+            result[path] = crawled_at
+    else:
+        result = store.export_parquet(args.product_type, args.path)
+
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,130 @@
+"""
+以頁面事件驅動的無限捲動載入器。
+
+捲到底部後，在頁面內以 MutationObserver 監看 DOM 變動，並攔截
+fetch/XHR 統計進行中的請求；DOM 靜止且沒有進行中的請求時才回報本次
+載入結果。卡片數與頁面高度都不再增加時即停止，整體有硬性時間上限。
+"""
+import time
+
+from ..config.settings import SCROLL_DEADLINE, SCROLL_IDLE_MS, SCROLL_STEP_TIMEOUT
+from .js_extractor import as_page_function
+
+SCROLL_STEP_JS = r"""
+var selector = arguments[0], idleMs = arguments[1], maxWaitMs = arguments[2];
+var done = arguments[arguments.length - 1];
+
+// 只安裝一次：統計進行中的 fetch / XHR 請求
+if (!window.__crawlerNetHook) {
+    window.__crawlerNetHook = true;
+    window.__crawlerPending = 0;
+    var origFetch = window.fetch;
+    if (origFetch) {
+        window.fetch = function () {
+            window.__crawlerPending++;
+            return origFetch.apply(this, arguments).finally(function () {
+                window.__crawlerPending--;
+            });
+        };
+    }
+    var origSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        window.__crawlerPending++;
+        this.addEventListener('loadend', function () { window.__crawlerPending--; });
+        return origSend.apply(this, arguments);
+    };
+}
+
+function count() {
+    try { return document.querySelectorAll(selector).length; } catch (e) { return 0; }
+}
+
+var finished = false, idleTimer = null, maxTimer = null, observer = null;
+function finish() {
+    if (finished) return;
+    finished = true;
+    if (observer) observer.disconnect();
+    clearTimeout(idleTimer);
+    clearTimeout(maxTimer);
+    done({count: count(), height: document.body.scrollHeight});
+}
+function armIdle() {
+    clearTimeout(idleTimer);
+    idleTimer = setTimeout(function () {
+        // 仍有請求進行中就繼續等
+        if (window.__crawlerPending > 0) { armIdle(); } else { finish(); }
+    }, idleMs);
+}
+
+observer = new MutationObserver(armIdle);
+observer.observe(document.body, {childList: true, subtree: true});
+maxTimer = setTimeout(finish, maxWaitMs);
+window.scrollTo(0, document.body.scrollHeight);
+armIdle();
+"""
+
+
+def load_all_cards(driver, card_selector, deadline=SCROLL_DEADLINE,
+                   idle_ms=SCROLL_IDLE_MS, step_timeout=SCROLL_STEP_TIMEOUT, should_stop=None):
+    """反覆捲到底部直到沒有新卡片（或 should_stop() 為真），回傳每次捲動新增的卡片數"""
+    driver.set_script_timeout(step_timeout + 5)
+    end_time = time.monotonic() + deadline
+    last = driver.execute_script(
+        "return {count: document.querySelectorAll(arguments[0]).length,"
+        " height: document.body.scrollHeight};",
+        card_selector,
+    )
+    loaded_per_step = []
+
+    while True:
+        if should_stop is not None and should_stop():
+            break
+        remaining = end_time - time.monotonic()
+        if remaining <= 0:
+            print("已達捲動載入時間上限，停止捲動")
+            break
+
+        max_wait_ms = int(min(step_timeout, remaining) * 1000)
+        result = driver.execute_async_script(SCROLL_STEP_JS, card_selector, idle_ms, max_wait_ms)
+        loaded = result["count"] - last["count"]
+        loaded_per_step.append(loaded)
+        print(f"第 {len(loaded_per_step)} 次捲動: 新增 {loaded} 張卡片，共 {result['count']} 張")
+
+        if result["count"] == last["count"] and result["height"] == last["height"]:
+            break
+        last = result
+
+    return loaded_per_step
+
+
+async def load_all_cards_async(page, card_selector, deadline=SCROLL_DEADLINE,
+                               idle_ms=SCROLL_IDLE_MS, step_timeout=SCROLL_STEP_TIMEOUT):
+    """load_all_cards 的非同步版本，供 CDP 類的 page 物件使用"""
+    import asyncio
+
+    step_function = as_page_function(SCROLL_STEP_JS, is_async=True)
+    loop = asyncio.get_running_loop()
+    end_time = loop.time() + deadline
+    last = await page.evaluate(
+        "(selector) => ({count: document.querySelectorAll(selector).length,"
+        " height: document.body.scrollHeight})",
+        card_selector,
+    )
+    loaded_per_step = []
+
+    while True:
+        remaining = end_time - loop.time()
+        if remaining <= 0:
+            print("已達捲動載入時間上限，停止捲動")
+            break
+
+        max_wait_ms = int(min(step_timeout, remaining) * 1000)
+        result = await page.evaluate(step_function, [card_selector, idle_ms, max_wait_ms])
+        loaded = result["count"] - last["count"]
+        loaded_per_step.append(loaded)
+
+        if result["count"] == last["count"] and result["height"] == last["height"]:
+            break
+        last = result
+
+    return loaded_per_step
@@ -0,0 +1,46 @@
+"""
+element 模式的選擇器計畫：每頁只檢查一次 fallback 選擇器。
+
+各欄位的選擇器是依序嘗試的 fallback 列表，每張卡片一律保持原本的順序，
+第一個命中的選擇器勝出，結果與逐一嘗試完全相同。計畫只快取兩種可以整頁
+略過的選擇器：瀏覽器判定為不合法的（例如 :contains），以及整頁都找不到
+元素的（卡片是頁面的一部分，整頁沒有就不可能出現在任何一張卡片中）。
+"""
+
+
+class SelectorPlan:
+    def __init__(self, probe=None):
+        # probe(選擇器列表) -> 每個選擇器在整頁是否存在（True/False），不合法時為 None；
+        # 未提供時不檢查，所有合法的選擇器都會嘗試
+        self.probe = probe
+        self.present = {}  # 選擇器 -> 整頁是否有符合的元素
+        self.invalid = set()
+
+    def candidates(self, selectors):
+        """回傳本頁應嘗試的選擇器（保持原順序），略過不合法與整頁不存在的選擇器"""
+        if self.probe is not None:
+            unknown = [selector for selector in selectors
+                       if selector not in self.present and selector not in self.invalid]
+            if unknown:
+                for selector, found in zip(unknown, self.probe(unknown)):
+                    if found is None:
+                        self.invalid.add(selector)
+                    else:
+                        self.present[selector] = bool(found)
+        return [selector for selector in self.valid(selectors) if self.present.get(selector, True)]
+
+    def valid(self, selectors):
+        """保持原順序，只略過不合法的選擇器"""
+        return [selector for selector in selectors if selector not in self.invalid]
+
+    def mark_invalid(self, selector):
+        self.invalid.add(selector)
+
+    def summary(self):
+        absent = sum(1 for found in self.present.values() if not found)
+        line = f"選擇器計畫: 檢查 {len(self.present)} 個選擇器"
+        if absent:
+            line += f"，{absent} 個本頁不存在"
+        if self.invalid:
+            line += f"，略過 {len(self.invalid)} 個不合法的選擇器"
+        return line
@@ -0,0 +1,285 @@
+"""
+串流輸出：產品資料逐筆流經多個輸出端（sink），不必先把整份資料集
+放進記憶體或建立 pandas DataFrame。
+
+每個 sink 提供 write(record)、close() 與 abort()（放棄寫到一半的輸出）；
+write_records 只走訪資料一次，
+同時寫入所有 sink，記憶體用量與資料筆數無關（Parquet 以固定大小分批）。
+"""
+import csv
+import json
+import os
+
+# 格式名稱 -> 副檔名
+FORMAT_EXTENSIONS = {
+    "json": "json",
+    "jsonl": "jsonl",
+    "csv": "csv",
+    "xlsx": "xlsx",
+    "parquet": "parquet",
+}
+
+
+class RecordSink:
+    """輸出端基底類別；flatten 不為 None 時先將巢狀資料轉為平坦欄位"""
+
+    def __init__(self, path, flatten=None):
+        self.path = path
+        self.flatten = flatten
+        self.count = 0
+
+    def write(self, record):
+        if self.flatten is not None:
+            record = self.flatten(record)
+        self.write_record(record)
+        self.count += 1
+
+    def write_record(self, record):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def abort(self):
+        """寫入失敗時放棄輸出：子類先釋放資源，再刪除寫到一半的檔案"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class JsonArraySink(RecordSink):
+    """與 json.dump(data, indent=4) 相同格式的 JSON 陣列，逐筆寫出"""
+
+    def __init__(self, path, flatten=None):
+        super().__init__(path, flatten)
+        self.file = open(path, "w", encoding="utf-8")
+        self.file.write("[")
+
+    def write_record(self, record):
+        text = json.dumps(record, ensure_ascii=False, indent=4)
+        self.file.write(("," if self.count else "") + "\n    " + text.replace("\n", "\n    "))
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.file.write("\n]" if self.count else "]")
+        self.file.close()
+
+    def abort(self):
+        self.file.close()
+        super().abort()
+
+
+class JsonlSink(RecordSink):
+    def __init__(self, path, flatten=None):
+        super().__init__(path, flatten)
+        self.file = open(path, "w", encoding="utf-8")
+
+    def write_record(self, record):
+        self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def close(self):
+        self.file.close()
+
+    def abort(self):
+        self.file.close()
+        super().abort()
+
+
+class CsvSink(RecordSink):
+    """欄位以第一筆資料為準，之後缺少的欄位留空"""
+
+    def __init__(self, path, flatten=None, encoding="utf-8-sig"):
+        super().__init__(path, flatten)
+        self.file = open(path, "w", encoding=encoding, newline="")
+        self.writer = None
+
+    def write_record(self, record):
+        if self.writer is None:
+            self.writer = csv.DictWriter(self.file, fieldnames=list(record), extrasaction="ignore")
+            self.writer.writeheader()
+        self.writer.writerow({key: cell_value(value) for key, value in record.items()})
+
+    def close(self):
+        self.file.close()
+
+    def abort(self):
+        self.file.close()
+        super().abort()
+
+
+class XlsxSink(RecordSink):
+    """openpyxl write-only 模式，每列寫出後即釋放，不保留整張工作表"""
+
+    def __init__(self, path, flatten=None):
+        super().__init__(path, flatten)
+        from openpyxl import Workbook
+
+        self.workbook = Workbook(write_only=True)
+        self.sheet = self.workbook.create_sheet()
+        self.columns = None
+
+    def write_record(self, record):
+        if self.columns is None:
+            self.columns = list(record)
+            self.sheet.append(self.columns)
+        self.sheet.append([cell_value(record.get(column, "")) for column in self.columns])
+
+    def close(self):
+        if self.workbook is None:
+            return
+        if self.columns is None:
+            self.sheet.append([])
+        self.workbook.save(self.path)
+        self.workbook = None
+
+    def abort(self):
+        # write-only 工作表的暫存檔只有存檔時才會清除，先存檔再刪除
+        try:
+            self.close()
+        finally:
+            self.workbook = None
+            super().abort()
+
+
+class ParquetSink(RecordSink):
+    """
+    以 pyarrow 分批寫出 row group，每批最多 batch_size 筆。
+
+    與 CsvSink 相同，欄位以第一筆資料為準，值一律存為字串（空值為 null），
+    因此某一批全為空值、下一批才出現文字時 schema 也不會衝突。
+    """
+
+    def __init__(self, path, flatten=None, batch_size=1000):
+        super().__init__(path, flatten)
+        import pyarrow  # noqa: F401  提早確認套件存在
+
+        self.batch_size = batch_size
+        self.batch = []
+        self.columns = None
+        self.writer = None
+
+    def write_record(self, record):
+        if self.columns is None:
+            self.columns = list(record)
+        self.batch.append(record)
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.batch:
+            return
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self.writer is None:
+            schema = pa.schema([(column, pa.string()) for column in self.columns])
+            self.writer = pq.ParquetWriter(self.path, schema)
+        columns = {
+            column: [text_value(record.get(column)) for record in self.batch]
+            for column in self.columns
+        }
+        self.writer.write_table(pa.Table.from_pydict(columns, schema=self.writer.schema))
+        self.batch = []
+
+    def close(self):
+        self.flush()
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+    def abort(self):
+        self.batch = []
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+        super().abort()
+
+
+SINKS = {
+    "json": JsonArraySink,
+    "jsonl": JsonlSink,
+    "csv": CsvSink,
+    "xlsx": XlsxSink,
+    "parquet": ParquetSink,
+}
+
+# 試算表類格式需要平坦欄位
+FLAT_FORMATS = {"csv", "xlsx", "parquet"}
+
+
+def cell_value(value):
+    """巢狀值轉為字串，讓試算表類格式也能寫入"""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def text_value(value):
+    """Parquet 欄位值：空值保留為 null，其餘轉為字串"""
+    return None if value is None else str(cell_value(value))
+
+
+def open_sinks(output_dir, basename, formats, flatten=None):
+    """依格式建立輸出端，試算表類格式套用 flatten"""
+    for fmt in formats:
+        if fmt not in SINKS:
+            raise ValueError(f"不支援的輸出格式: {fmt}")
+    sinks = []
+    for fmt in formats:
+        path = os.path.join(output_dir, f"{basename}.{FORMAT_EXTENSIONS[fmt]}")
+        try:
+            sinks.append(SINKS[fmt](path, flatten if fmt in FLAT_FORMATS else None))
+        except Exception as e:
+            print(f"建立 {fmt} 輸出時發生錯誤: {e}")
+    return sinks
+
+
+def write_records(records, sinks):
+    """
+    走訪一次資料並寫入所有輸出端，回傳資料筆數。
+    單一輸出端失敗不影響其他輸出端，失敗者會放棄輸出並從 sinks 中移除；
+    走訪資料本身拋出例外（例如爬取被取消）時放棄所有輸出端後重新拋出。
+    """
+    count = 0
+    try:
+        for record in records:
+            count += 1
+            for sink in list(sinks):
+                try:
+                    sink.write(record)
+                except Exception as e:
+                    print(f"寫入 {sink.path} 時發生錯誤: {e}")
+                    sinks.remove(sink)
+                    abort_quietly(sink)
+    except BaseException:
+        for sink in sinks:
+            abort_quietly(sink)
+        sinks.clear()
+        raise
+    for sink in list(sinks):
+        if not close_quietly(sink):
+            sinks.remove(sink)
+            abort_quietly(sink)
+    return count
+
+
+def close_quietly(sink):
+    try:
+        sink.close()
+        return True
+    except Exception as e:
+        print(f"關閉 {sink.path} 時發生錯誤: {e}")
+        return False
+
+
+def abort_quietly(sink):
+    try:
+        sink.abort()
+    except Exception as e:
+        print(f"放棄 {sink.path} 時發生錯誤: {e}")
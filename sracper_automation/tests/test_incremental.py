@@ -0,0 +1,47 @@
+"""增量快照：空的爬取結果不會覆寫上次的快照與索引"""
+import pytest
+
+from src.crawlers.base_crawler import BaseCrawler
+from src.utils.incremental import INDEX_FILE, SNAPSHOT_FILE, IncrementalStore
+
+RECORDS = [
+    {"卡片名稱": "測試卡 A", "詳細頁連結": "https://roo.cash/a"},
+    {"卡片名稱": "測試卡 B", "詳細頁連結": "https://roo.cash/b"},
+]
+
+
+class IncrementalCrawler(BaseCrawler):
+    NAME_FIELD = "卡片名稱"
+
+
+def read_outputs(output_dir):
+    return [(output_dir / name).read_text(encoding="utf-8") for name in (SNAPSHOT_FILE, INDEX_FILE)]
+
+
+def test_apply_refuses_empty_records(tmp_path):
+    store = IncrementalStore(str(tmp_path), "卡片名稱")
+    store.save(store.apply(RECORDS))
+    before = read_outputs(tmp_path)
+
+    store = IncrementalStore(str(tmp_path), "卡片名稱")
+    with pytest.raises(ValueError):
+        store.apply([])
+
+    assert len(store.records) == len(RECORDS)
+    assert read_outputs(tmp_path) == before
+
+
+def test_empty_incremental_crawl_keeps_baseline(tmp_path):
+    crawler = IncrementalCrawler(incremental=True)
+    crawler.output_dir = str(tmp_path)
+    crawler.save_to_file(RECORDS)
+    before = read_outputs(tmp_path)
+    deltas = sorted(tmp_path.glob("delta_*.json"))
+
+    crawler = IncrementalCrawler(incremental=True)
+    crawler.output_dir = str(tmp_path)
+    with pytest.raises(ValueError):
+        crawler.save_to_file([])
+
+    assert read_outputs(tmp_path) == before
+    assert sorted(tmp_path.glob("delta_*.json")) == deltas
@@ -0,0 +1,105 @@
+import time
+
+from src.crawlers.base_crawler import BaseCrawler
+from src.orchestrator import CATEGORIES, register_category, run_crawl
+from src.utils.driver_pool import DriverPool
+
+
+class FakeDriver:
+    def __init__(self):
+        self.quit_called = False
+
+    def execute_script(self, script, *args):
+        return 1
+
+    def implicitly_wait(self, seconds):
+        pass
+
+    def delete_all_cookies(self):
+        pass
+
+    def get(self, url):
+        pass
+
+    def quit(self):
+        self.quit_called = True
+
+
+class SlowCrawler(BaseCrawler):
+    """每一批之間檢查取消旗標，模擬永遠爬不完的類別"""
+    STARTUP_S = 0.0
+    batches = 0
+
+    def __init__(self, extraction_mode="element", driver_pool=None, incremental=False, resume=False,
+                 browser_profile=None):
+        super().__init__(extraction_mode, driver_pool, incremental, resume, browser_profile)
+        time.sleep(self.STARTUP_S)
+        self.driver = driver_pool.acquire()
+
+    def crawl(self):
+        while True:
+            self.check_cancelled()
+            type(self).batches += 1
+            time.sleep(0.05)
+
+
+class SlowStartCrawler(SlowCrawler):
+    STARTUP_S = 1.5
+    batches = 0
+
+
+class SlowSaveCrawler(SlowCrawler):
+    """爬取很快完成，存檔時才逾時"""
+
+    def crawl(self):
+        return [{"名稱": "測試"}]
+
+    def save_to_file(self, data, output_subdir=None):
+        time.sleep(1.0)
+        self.saved_count = len(data)
+        return ()
+
+
+def run_with_pool(category, crawler_cls):
+    drivers = []
+
+    def factory():
+        drivers.append(FakeDriver())
+        return drivers[-1]
+
+    register_category(category, __name__, crawler_cls.__name__, "crawl")
+    pool = DriverPool(size=1, driver_factory=factory)
+    try:
+        runs = run_crawl([category], timeout=0.3, driver_pool=pool, perf_report_dir=None)
+    finally:
+        CATEGORIES.pop(category)
+    return runs[0], pool, drivers
+
+
+def test_timeout_stops_crawler_and_quits_its_driver():
+    run, pool, drivers = run_with_pool("slow", SlowCrawler)
+    batches = SlowCrawler.batches
+    time.sleep(0.3)
+
+    assert run.status == "timeout"
+    assert SlowCrawler.batches <= batches + 1
+    assert [driver.quit_called for driver in drivers] == [True]
+    assert pool._idle.empty()
+
+
+def test_timeout_during_construction_is_an_abort():
+    run, pool, drivers = run_with_pool("slow_start", SlowStartCrawler)
+    time.sleep(1.6)
+
+    assert run.status == "timeout"
+    assert SlowStartCrawler.batches == 0
+    assert [driver.quit_called for driver in drivers] == [True]
+    assert pool._idle.empty()
+
+
+def test_timeout_during_save_is_not_reported_ok():
+    run, pool, drivers = run_with_pool("slow_save", SlowSaveCrawler)
+    time.sleep(1.0)
+
+    assert run.status == "timeout"
+    assert run.count == 0
@@ -0,0 +1,81 @@
+"""save_to_file 以預設輸出格式寫檔，並同時寫入產品歷史資料庫"""
+import json
+import os
+
+import pytest
+
+from src.crawlers.base_crawler import BaseCrawler
+from src.utils.product_store import ProductStore
+
+RECORDS = [
+    {"卡片名稱": "測試卡 A", "詳細頁連結": "https://roo.cash/a", "卡片特色": ["回饋 3%"]},
+    {"卡片名稱": "測試卡 B", "詳細頁連結": "https://roo.cash/b", "卡片特色": []},
+]
+
+
+class StoreCrawler(BaseCrawler):
+    PRODUCT_TYPE = "credit_cards"
+
+
+def make_crawler(tmp_path):
+    crawler = StoreCrawler()
+    crawler.base_output_dir = tmp_path
+    crawler.output_dir = tmp_path / "credit_cards"
+    crawler.product_store = ProductStore(tmp_path / "products.db")
+    return crawler
+
+
+def test_save_to_file_writes_files_and_store(tmp_path):
+    crawler = make_crawler(tmp_path)
+
+    paths = crawler.save_to_file(iter(RECORDS))
+
+    assert crawler.saved_count == len(RECORDS)
+    assert sorted(path.rsplit(".", 1)[1] for path in paths) == ["json", "xlsx"]
+    with open(next(path for path in paths if path.endswith(".json")), encoding="utf-8") as f:
+        assert json.load(f) == RECORDS
+    assert crawler.product_store.latest("credit_cards") == RECORDS
+
+
+def test_save_to_file_times_store_writes(tmp_path):
+    crawler = make_crawler(tmp_path)
+
+    crawler.save_to_file(RECORDS)
+
+    stages = crawler.perf.report()["stages"]
+    # 每筆 write_record 一筆樣本，加上 close 一筆
+    assert stages["write_store"]["count"] == len(RECORDS) + 1
+    assert stages["write"]["count"] == 2 * (len(RECORDS) + 1)
+
+
+def test_empty_crawl_is_not_recorded(tmp_path):
+    store = ProductStore(tmp_path / "products.db")
+    store.insert("credit_cards", RECORDS, crawled_at="2025-01-01T00:00:00")
+
+    store.insert("credit_cards", [], crawled_at="2025-01-02T00:00:00")
+
+    assert store.crawl_times("credit_cards") == ["2025-01-01T00:00:00"]
+    assert store.latest("credit_cards") == RECORDS
+
+
+def test_empty_crawl_keeps_journal(tmp_path):
+    crawler = make_crawler(tmp_path)
+    crawler.journal.append("https://roo.cash/a", RECORDS[0])
+
+    crawler.save_to_file([])
+
+    assert os.path.exists(crawler.journal.path)
+
+
+def test_failed_crawl_discards_partial_output(tmp_path):
+    crawler = make_crawler(tmp_path)
+
+    def records():
+        yield RECORDS[0]
+        raise RuntimeError("頁面載入失敗")
+
+    with pytest.raises(RuntimeError):
+        crawler.save_to_file(records())
+
+    assert not list((tmp_path / "credit_cards").glob("data_*"))
+    assert crawler.product_store.crawl_times("credit_cards") == []
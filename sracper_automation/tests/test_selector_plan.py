@@ -0,0 +1,27 @@
+from src.utils.selector_plan import SelectorPlan
+
+
+def test_keeps_original_order_after_a_match():
+    plan = SelectorPlan()
+    selectors = ["h3.title", "h3", ".name"]
+
+    assert plan.candidates(selectors) == selectors
+    # 先前命中的選擇器不會被提前
+    assert plan.candidates(selectors) == selectors
+
+
+def test_skips_invalid_and_absent_selectors_once_per_page():
+    calls = []
+    page = {"h3": True, ".name": False, "div:contains('x')": None}
+
+    def probe(selectors):
+        calls.append(list(selectors))
+        return [page[selector] for selector in selectors]
+
+    plan = SelectorPlan(probe)
+    selectors = [".name", "div:contains('x')", "h3"]
+
+    assert plan.candidates(selectors) == ["h3"]
+    assert plan.candidates(selectors) == ["h3"]
+    assert calls == [selectors]
+    assert plan.invalid == {"div:contains('x')"}